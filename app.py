@@ -1,648 +1,2010 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, simpledialog
-import docker
-import os
-import requests
-from pathlib import Path
-import subprocess
-import atexit
-from docker.errors import DockerException
-
-
-# Initialize Docker client
-client = docker.from_env()
-client.ping()
-app_directory = os.path.dirname(os.path.abspath(__file__))
-
-# Get the Downloads directory
-def get_downloads_path():
-    return os.path.join(os.path.expanduser("~"), "Downloads")
-
-# Helper function for logging
-def log_message(log_widget, message):
-    log_widget.config(state="normal")
-    log_widget.insert("end", message + "\n")
-    log_widget.yview("end")  # Auto-scroll to the latest log
-    log_widget.config(state="disabled")
-    
-
-
-def create_image(name, size, location):
-    # Ensure the directory exists, create it if it doesn't
-    if not os.path.exists(location):
-        os.makedirs(location)
-    
-    # Construct the command to create the image
-    image_path = os.path.join(location, f"{name}.img")
-    cmd = f"qemu-img create -f qcow2 {image_path} {size}M"
-    
-    try:
-        # Run the command and capture the output
-        result = subprocess.run(cmd, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        # Print or log the output (stdout and stderr)
-        print(result.stdout.decode())  # Command output
-        print(result.stderr.decode())  # Command errors (if any)
-        
-        return image_path
-    except subprocess.CalledProcessError as e:
-        # If the command fails, handle the error
-        print(f"Error creating image: {e}")
-        print(f"stdout: {e.stdout.decode()}")
-        print(f"stderr: {e.stderr.decode()}")
-        raise
-
-
-def boot(ram, cores, imagefile, isofile):
-    cmd = (
-        "qemu-system-x86_64 "
-        f"-m {ram} "
-        "-boot d "
-        "-enable-kvm "
-        f"-smp {cores} "
-        f"-hda {imagefile} "
-        "-cpu host "
-        "-vga virtio "
-        "-display sdl,gl=on"
-    )
-
-    if isofile and isofile.lower() != "iso file (leave blank to skip)":
-        cmd += f" -cdrom {isofile}"
-
-    print(cmd)
-    os.system(cmd)
-
-created_files = [] 
-def create_dockerfile(log_widget):
-    loaded_files = {}  # Dictionary to store file contents: {filename: content}
-    current_file = None  # Track currently displayed file
-    file_labels = []  # List to keep track of file labels
-     
-    def validate_dockerfile(content):
-             required_commands = ['FROM', 'COPY']
-             found_commands = [cmd for cmd in required_commands if cmd in content]
-             if len(found_commands) != len(required_commands):
-                 missing = set(required_commands) - set(found_commands)
-                 messagebox.showwarning("Warning", f"Missing required commands: {', '.join(missing)}")
-                 return False
-             return True
-
-    def load_template(template):
-        if template == "Custom":
-            dockerfile_content = (
-                 "# Custom Dockerfile\n"
-                "FROM <base-image>\n"
-                "WORKDIR /app\n"
-                "COPY . .\n"
-                "# Add your commands here\n"
-                "CMD [\"your-command\"]\n"
-            )
-            additional_files = {}
-           
-        elif template == "Python App":
-            dockerfile_content = (
-                "# Python Dockerfile\n"
-                "FROM python:3.9-slim\n\n"
-                "WORKDIR /app\n"
-                "COPY requirements.txt . \n"
-                "RUN pip install --no-cache-dir -r requirements.txt\n"
-                "COPY . .\n"
-                "CMD [\"python\", \"app.py\"]\n"
-            )
-            additional_files = {
-                "requirements.txt": (
-                    "# Example Python requirements\n"
-                    "flask==2.2.3\n"
-                    "requests==2.31.0\n"
-                    "numpy==1.23.5\n"
-                )
-            }
-        
-        elif template == "Node.js App":
-            dockerfile_content = (
-                "# Node.js Dockerfile\n"
-                "FROM node:16\n\n"
-                "WORKDIR /app\n"
-                "COPY package*.json .\n"
-                "RUN npm install\n"
-                "COPY . .\n"
-                "CMD [\"node\", \"server.js\"]\n"
-            )
-            additional_files = {
-                "package.json": (
-                    "{\n"
-                    "  \"name\": \"node-app\",\n"
-                    "  \"version\": \"1.0.0\",\n"
-                    "  \"description\": \"Example Node.js application\",\n"
-                    "  \"main\": \"server.js\",\n"
-                    "  \"scripts\": {\n"
-                    "    \"start\": \"node server.js\"\n"
-                    "  },\n"
-                    "  \"dependencies\": {\n"
-                    "    \"express\": \"^4.18.2\"\n"
-                    "  }\n"
-                    "}\n"
-                )
-            }
-        elif template == "Java App":
-            dockerfile_content = (
-                "# Java Dockerfile\n"
-                "FROM openjdk:11\n\n"
-                "WORKDIR /app\n"
-                "COPY pom.xml .\n"
-                "COPY src/ ./src/\n"
-                "RUN mvn clean install\n"
-                "COPY target/myapp.jar myapp.jar\n"
-                "CMD [\"java\", \"-jar\", \"myapp.jar\"]\n"
-            )
-            additional_files = {
-                "pom.xml": (
-                    "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
-                    "<project xmlns=\"http://maven.apache.org/POM/4.0.0\"\n"
-                    "         xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\"\n"
-                    "         xsi:schemaLocation=\"http://maven.apache.org/POM/4.0.0 http://maven.apache.org/xsd/maven-4.0.0.xsd\">\n"
-                    "    <modelVersion>4.0.0</modelVersion>\n\n"
-                    "    <groupId>com.example</groupId>\n"
-                    "    <artifactId>myapp</artifactId>\n"
-                    "    <version>1.0-SNAPSHOT</version>\n\n"
-                    "    <dependencies>\n"
-                    "        <dependency>\n"
-                    "            <groupId>org.springframework.boot</groupId>\n"
-                    "            <artifactId>spring-boot-starter</artifactId>\n"
-                    "            <version>2.7.0</version>\n"
-                    "        </dependency>\n"
-                    "    </dependencies>\n\n"
-                    "</project>\n"
-                )
-            }
-        else:
-            dockerfile_content = ""
-            additional_files = {}
-
-        return dockerfile_content, additional_files
-    
-    def add_new_file():
-            filename = simpledialog.askstring("New File", "Enter filename:")
-            if filename and not any(char in filename for char in '<>:"/\\|?*'):
-                loaded_files[filename] = ""
-                update_file_list()
-                show_file(filename)
-            else:
-                messagebox.showerror("Error", "Invalid filename")
-    
-    def update_file_list():
-        files_listbox.delete(0, tk.END)
-        for filename in loaded_files:
-            files_listbox.insert(tk.END, filename)
-
-    def save_file(filename, content):
-        try:
-            file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
-            with open(file_path, "w") as f:
-                f.write(content)
-            if file_path not in created_files:
-                created_files.append(file_path)
-            log_message(log_widget, f"Saved {filename}")
-            messagebox.showinfo("Success", f"Saved {filename}")
-        except Exception as e:
-            log_message(log_widget, f"Error saving {filename}: {e}")
-
-    def show_file(filename):
-            nonlocal current_file
-            current_file = filename
-            additional_text.delete("1.0", "end")
-            additional_text.insert("1.0", loaded_files.get(filename, ""))
-            files_label.config(text=f"Current File: {filename}")
-
-    def save_current_file():
-        if current_file:
-            content = additional_text.get("1.0", "end").strip()
-            loaded_files[current_file] = content
-            save_file(current_file, content)
-
-
-    def update_file_labels():
-        # Clear existing labels
-        for label in file_labels:
-            label.destroy()
-        file_labels.clear()
-        
-        # Create new labels
-        for filename in loaded_files.keys():
-            label = ttk.Label(
-                files_label, 
-                text=filename,
-                cursor="hand2",  # Show hand cursor on hover
-                style="Link.TLabel" if filename == current_file else "TLabel"
-            )
-            label.bind("<Button-1>", lambda e, f=filename: show_file(f))
-            label.pack(anchor="w", padx=5, pady=2)
-            file_labels.append(label)
-    
-    def save_dockerfile():
-        content = dockerfile_text.get("1.0", "end").strip()
-        if content and validate_dockerfile(content):
-            save_file("Dockerfile", content)
-
-        
-    def load_dockerfile():
-        file_path = filedialog.askopenfilename(
-            filetypes=[("Dockerfile", "Dockerfile*"), ("All Files", "*.*")]
-        )
-        if file_path:
-            try:
-                with open(file_path, "r") as file:
-                    content = file.read()
-                dockerfile_text.delete("1.0", "end")
-                dockerfile_text.insert("1.0", content)
-                additional_text.delete("1.0", "end") 
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not load Dockerfile: {e}")
-
-    def load_additional_files():
-        file_paths = filedialog.askopenfilenames(
-            title="Select Additional Files",
-            filetypes=[("All Files", "*.*")]
-        )
-        if file_paths:
-            for file_path in file_paths:
-                try:
-                    with open(file_path, "r") as file:
-                        content = file.read()
-                        filename = file_path.split("/")[-1]
-                        loaded_files[filename] = content
-                except Exception as e:
-                    messagebox.showerror("Error", f"Could not load {file_path}: {e}")
-            
-            # Show the first loaded file
-            if loaded_files and not current_file:
-                show_file(list(loaded_files.keys())[0])
-            else:
-                update_file_labels()
-
-    def on_template_change(*args):
-        selected = template_var.get()
-        dockerfile_content, template_files = load_template(selected)
-        dockerfile_text.delete("1.0", "end")
-        dockerfile_text.insert("1.0", dockerfile_content)
-        loaded_files.clear()
-        loaded_files.update(template_files)
-        additional_text.delete("1.0", "end")
-
-        update_file_list()
-
-
-    popup = tk.Toplevel()
-    popup.title("Create or Edit Dockerfile")
-    popup.geometry("1000x600")
-
-    # Create a style for the "selected" label
-    style = ttk.Style()
-    style.configure("Link.TLabel", foreground="blue", font=("TkDefaultFont", 10, "underline"))
-
-    # Template selection
-    template_var = tk.StringVar(value="Custom")
-    templates = ["Custom","Python App", "Node.js App", "Java App", "Load Existing Dockerfile"]
-    ttk.Label(popup, text="Template:").pack(anchor="w", padx=10, pady=5)
-    ttk.Combobox(popup, textvariable=template_var, values=templates, state="readonly").pack(anchor="w", padx=10)
-
-
-    # Split layout
-    frame = ttk.Frame(popup)
-    frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-    # Dockerfile editor
-    dockerfile_frame = ttk.LabelFrame(frame, text="Dockerfile")
-    dockerfile_frame.pack(side="left", fill="both", expand=True, padx=5, pady=5)
-
-    dockerfile_text = tk.Text(dockerfile_frame, wrap="word")
-    dockerfile_text.pack(fill="both", expand=True, padx=5, pady=5)
-    # Define save_dockerfile function
-   
-    
-
-    dockerfile_buttons_frame = ttk.Frame(dockerfile_frame)
-    dockerfile_buttons_frame.pack(fill="x", padx=5, pady=5)
-
-    load_dockerfile_button = ttk.Button(dockerfile_buttons_frame, text="Upload Dockerfile", command=load_dockerfile)
-    load_dockerfile_button.pack(side="left", padx=5)
-    
-    ttk.Button(dockerfile_buttons_frame, text="Save Dockerfile", command=save_dockerfile).pack(side="left", padx=5)
-
-    # Additional files editor
-    additional_frame = ttk.LabelFrame(frame, text="Additional Files")
-    additional_frame.pack(side="right", fill="both", expand=True, padx=5, pady=5)
-    
-    files_listbox = tk.Listbox(additional_frame, height=5)
-    files_listbox.pack(fill="x", padx=5, pady=5)
-    files_listbox.bind('<<ListboxSelect>>', 
-        lambda e: show_file(files_listbox.get(files_listbox.curselection())) if files_listbox.curselection() else None)
-
-    # Frame for file labels
-    files_label = ttk.Label(additional_frame, text="Files")
-    files_label.pack(fill="x", padx=5, pady=5)
-
-    additional_text = tk.Text(additional_frame, wrap="word")
-    additional_text.pack(fill="both", expand=True, padx=5, pady=5)
-
-    # Buttons frame for additional files
-    additional_buttons_frame = ttk.Frame(additional_frame)
-    additional_buttons_frame.pack(fill="x", padx=5, pady=5)
-
-    load_additional_button = ttk.Button(additional_buttons_frame, text="Upload Additional Files", command=load_additional_files)
-    load_additional_button.pack(side="left", padx=5)
-    
-    ttk.Button(additional_buttons_frame, text="Add New File", command=add_new_file).pack(side="left", padx=5)
-    ttk.Button(additional_buttons_frame, text="Save Current File", command=save_current_file).pack(side="left", padx=5)
-    # Initialize with default template
-    on_template_change(None)
-    template_var.trace("w", on_template_change)
-
-def cleanup_files(log_widget):
-        if not created_files:
-            log_message(log_widget, "No files to clean up.")
-            return 
-        
-        for file_path in created_files[:]:
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    log_message(log_widget, f"Deleted {file_path}")
-                else:
-                    log_message(log_widget, f"File {file_path} does not exist.")
-            except Exception as e:
-                log_message(log_widget, f"Error deleting {file_path}: {e}") 
-    
-def clear_files_and_exit(window, log_widget):
-        log_message(log_widget, "Clearing files and exiting.")
-        cleanup_files(log_widget)
-        window.quit()
-
-def keep_files_and_exit(window):
-     window.quit()
-    
-def on_close(window, log_widget):
-        response = messagebox.askquestion("Exit", "Do you want to clear the files before exiting?", icon='warning')
-        if response == "yes":
-            clear_files_and_exit(window, log_widget)
-        else:
-            keep_files_and_exit(window)
-
-def build_docker_image(self):
-    app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)))
-    
-    # Ensure app directory exists
-    if not os.path.exists(app_dir):
-        messagebox.showerror("Error", "directory not found")
-        return
-        
-    dockerfile_path = filedialog.askopenfilename(
-        initialdir=app_dir,
-        title="Select Dockerfile",
-        filetypes=[("Dockerfile", "Dockerfile")],
-    )
-    
-    if not dockerfile_path:
-        return
-        
-    # Validate file is within app directory
-    if not os.path.commonpath([app_dir]) == os.path.commonpath([app_dir, dockerfile_path]):
-        messagebox.showerror("Error", "Please select a Dockerfile from the app directory")
-        return
-
-    image_tag = simpledialog.askstring(
-        "Image Name/Tag", "Enter image name and tag (e.g., myimage:latest):"
-    )
-    if not image_tag:
-        return
-
-    try:
-        cmd = ["docker", "build", "-t", image_tag, "-f", dockerfile_path, app_dir]
-        process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-        stdout, stderr = process.communicate()
-
-        if process.returncode == 0:
-            messagebox.showinfo("Success", f"Image built successfully: {image_tag}")
-        else:
-            messagebox.showerror("Build Failed", f"Error:\n{stderr}")
-
-    except Exception as e:
-        messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-
-def pull_docker_image(log_widget):
-    # Step 1: Get the image name from the user
-    image_name = simpledialog.askstring("Input", "Enter image name to download (e.g., 'ubuntu:latest'):")
-
-    if not image_name:
-        log_message(log_widget, "Operation canceled: No image name provided.")
-        return
-
-    try:
-        # Step 2: Run the docker pull command
-        cmd = f"docker pull {image_name}"
-
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-        stdout, stderr = process.communicate()
-
-        if process.returncode == 0:
-            # Step 3: Process and display results
-            output = stdout.decode('utf-8')
-            log_message(log_widget, f"Image '{image_name}' pulled successfully:\n{output}")
-            messagebox.showinfo("Success", f"Image '{image_name}' pulled successfully.")
-        else:
-            # Handle errors if the pull fails
-            error_message = stderr.decode('utf-8')
-            log_message(log_widget, f"Error pulling image: {error_message}")
-            messagebox.showerror("Error", f"Failed to pull image: {error_message}")
-
-    except Exception as e:
-        log_message(log_widget, f"Unexpected error: {str(e)}")
-        messagebox.showerror("Error", f"Unexpected error: {str(e)}")
-
-def start_container(image_name, container_name):
-    """
-    Start a Docker container using the given image name and container name.
-    
-    """
-    try:
-        # Run the container with the given image name and container name
-        container = client.containers.run(
-            image_name,
-            name=container_name,
-            detach=True  # Run container in detached mode
-        )
-        print(f"Container {container_name} using {image_name} started successfully.")
-        messagebox.showinfo("Success", f"Container {container_name} started successfully.")
-    except DockerException as e:
-        print(f"Error starting container {container_name} with image {image_name}: {e}")
-        messagebox.showerror("Error", f"Error starting container: {e}")
-
-def search_local_image(log_widget):
-    # Step 1: Get the search term from the user
-    image_name = simpledialog.askstring("Input", "Enter image name or tag to search:")
-    
-    if not image_name:
-        log_message(log_widget, "Operation canceled: No image name provided.")
-        return
-
-    try:
-        # Step 2: Run the docker images command with FINDSTR (Windows) or grep (Linux/Mac)
-        cmd = f"docker images | FINDSTR {image_name}"  # Windows command
-        # For Linux or Mac, you can use `grep` instead of `FINDSTR`:
-        # cmd = f"docker images | grep {image_name}"
-        
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-        stdout, stderr = process.communicate()
-
-        if process.returncode == 0:
-            # Step 3: Process and display results
-            output = stdout.decode('utf-8')
-            if output:
-                log_message(log_widget, f"Search Results for '{image_name}':\n{output}")
-                messagebox.showinfo("Success", f"Search completed. Results displayed in log.")
-            else:
-                log_message(log_widget, f"No local images found matching '{image_name}'.")
-                messagebox.showinfo("No Results", f"No images found matching '{image_name}'.")
-        else:
-            # Handle errors if the search fails
-            log_message(log_widget, f"Error: {stderr.decode('utf-8')}")
-            messagebox.showerror("Error", f"Search failed: {stderr.decode('utf-8')}")
-    except Exception as e:
-        log_message(log_widget, f"Unexpected error: {str(e)}")
-        messagebox.showerror("Error", f"Unexpected error: {e}")
-
-def search_dockerhub_image(log_widget):
-    # Step 1: Get the search term from the user
-    image_name = simpledialog.askstring("Input", "Enter image name to search on Docker Hub:")
-    
-    if not image_name:
-        log_message(log_widget, "Operation canceled: No image name provided.")
-        return
-
-    try:
-        # Step 2: Run the docker search command
-        cmd = f"docker search {image_name}"
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-        stdout, stderr = process.communicate()
-
-        if process.returncode == 0:
-            # Step 3: Process and display results
-            output = stdout.decode('utf-8')
-            log_message(log_widget, f"Search Results for '{image_name}':\n{output}")
-            messagebox.showinfo("Success", f"Search completed. Results displayed in log.")
-        else:
-            # Handle errors if the search fails
-            log_message(log_widget, f"Error: {stderr.decode('utf-8')}")
-            messagebox.showerror("Error", f"Search failed: {stderr.decode('utf-8')}")
-    except Exception as e:
-        log_message(log_widget, f"Unexpected error while searching DockerHub: {e}")
-        messagebox.showerror("Error", f"Unexpected error: {e}")
-
-def list_docker_images(log_widget):
-    log_message(log_widget, "Listing Docker images...")
-    images = client.images.list()
-    output = "\n".join(f"{image.id[:12]}: {', '.join(image.tags)}" for image in images)
-    log_message(log_widget, output if output else "No images found.")
-
-def search_docker_container(log_widget):
-    """Search for a specific Docker container."""
-    query = simpledialog.askstring("Search Container", "Enter container name or ID to search:")
-    if not query:
-        return
-    try:
-        containers = client.containers.list(all=True)
-        found = False
-        for container in containers:
-            if query in container.name or query in container.id:
-                log_message(log_widget, f"Found Container: {container.name} | Status: {container.status}")
-                found = True
-        if not found:
-            log_message(log_widget, f"No containers found matching: {query}")
-    except Exception as e:
-        log_message(log_widget, f"Error: {e}")
-        messagebox.showerror("Error", f"Could not search Docker containers: {e}")
-
-def list_running_containers(log_widget):
-    log_message(log_widget, "Listing running containers...")
-    containers = client.containers.list()
-    output = "\n".join(f"{container.id[:12]}: {container.name}" for container in containers)
-    log_message(log_widget, output if output else "No running containers found.")
-
-def stop_container(log_widget):
-    container_nm =  simpledialog.askstring("Stop Container", "Enter container name:")
-    if container_nm:
-        try:
-            log_message(log_widget, f"Stopping container {container_nm}...")
-            # Get the container by name and stop it
-            container = client.containers.get(container_nm)
-            container.stop()
-            log_message(log_widget, f"Container {container_nm} stopped.")
-            messagebox.showinfo("Success", f"Container {container_nm} stopped.")
-        except docker.errors.NotFound:
-            log_message(log_widget, f"Error: Container {container_nm} not found.")
-            messagebox.showerror("Error", f"Container {container_nm} not found.")
-        except Exception as e:
-            log_message(log_widget, f"Error: Failed to stop container: {str(e)}")
-            messagebox.showerror("Error", f"Failed to stop container: {str(e)}")
-
-def simple_input_popup(title, prompt):
-    popup = tk.Toplevel()
-    popup.title(title)
-    ttk.Label(popup, text=prompt).pack(pady=10)
-    entry = ttk.Entry(popup)
-    entry.pack(pady=10, padx=10)
-
-    def submit():
-        popup.result = entry.get().strip()
-        popup.destroy()
-
-    ttk.Button(popup, text="Submit", command=submit).pack(pady=10)
-    popup.mainloop()
-    return getattr(popup, 'result', None)
-
-# Main GUI
-def main():
-    
-    root = tk.Tk()
-    root.title("Cloud Management System")
-    root.geometry("600x600")
-
-    ttk.Label(root, text="Cloud Management System", font=("Times new roman", 16, "bold")).pack(pady=10)
-    ttk.Label(root, text="Manage your cloud system with ease.").pack(pady=5)
-
-    button_frame = ttk.Frame(root)
-    button_frame.pack(fill="both", expand=True, padx=20, pady=10)
-
-    ttk.Label(root, text="Log Output:").pack(pady=5)
-    log_widget = tk.Text(root, wrap="word", width=70, height=15, state="disabled", bg="#f4f4f4")
-    log_widget.pack(padx=10, pady=10, fill="both", expand=True)
-
-    ttk.Button(button_frame, text="Create Dockerfile", command=lambda: create_dockerfile(log_widget)).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="Build Docker Image", command=lambda: build_docker_image(log_widget)).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="List Docker Images", command=lambda: list_docker_images(log_widget)).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="Start a container", command=lambda: start_container(simpledialog.askstring("Image Name", "Enter image name:"),
-        simpledialog.askstring("Container name", "Enter container name: "))).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="List Running Containers", command=lambda: list_running_containers(log_widget)).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="Stop a Container", command=lambda: stop_container(log_widget)).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="Search Local Image", command=lambda: search_local_image(log_widget)).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="Search DockerHub Image", command=lambda: search_dockerhub_image(log_widget)).pack(fill="x", pady=5)  
-    ttk.Button(button_frame, text="Pull Docker Image", command=lambda: pull_docker_image(log_widget)).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="Create QEMU Image", command=lambda: create_image(
-        simpledialog.askstring("Image Name", "Enter image name:"),
-        simpledialog.askinteger("Size (MB)", "Enter image size in MB:"),
-        filedialog.askdirectory(title="Select Save Location")
-    )).pack(fill="x", pady=5)
-    ttk.Button(button_frame, text="Boot QEMU Image", command=lambda: boot(
-        simpledialog.askinteger("RAM (MB)", "Enter RAM size in MB:"),
-        simpledialog.askinteger("CPU Cores", "Enter number of cores:"),
-        filedialog.askopenfilename(title="Select QEMU Image File"),
-        filedialog.askopenfilename(title="Select ISO File (optional)")
-    )).pack(fill="x", pady=5)
-
-    root.protocol("WM_DELETE_WINDOW",  lambda:on_close(root, log_widget))
-    root.mainloop()
-
-if __name__ == "__main__":
+import time
+# Measured from here so the startup budget covers our own imports
+_startup_started = time.perf_counter()
+
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox, simpledialog
+import fnmatch
+import os
+import re
+from docker_stream import format_bytes
+from build_queue import BuildTarget, dependency_graph, format_summary as format_build_summary
+from bulk_pull import format_summary, parse_manifest
+from container_stats import StatsCollector
+from dockerfile_lint import estimate_layers, format_findings, lint as lint_dockerfile, parse_dockerfile
+from dockerfile_templates import TEMPLATE_NAMES, load_template, write_template
+from container_batch import ACTIONS, run_batch, summarize as summarize_batch
+from launch_spec import (RESTART_POLICIES, LaunchSpec, delete_template, load_templates, parse_mapping,
+                         parse_ulimits, save_template)
+import qemu_images
+from qemu_images import PREALLOCATION_MODES
+from reclaim import format_usage
+from qemu_profiles import PROFILES, get_profile, parse_cpu_list
+from state_store import KINDS as ARTIFACT_KINDS
+from hub_search import sort_results
+from image_query import SORT_KEYS, days_ago, image_rows, parse_size, query_images
+from jobs import JobExecutor
+from container_logs import DEFAULT_BUFFER_LINES, format_line, parse_time
+from log_stream import LogPipeline, get_log_pipeline
+from telemetry import format_snapshot, start_metrics_server, telemetry
+from virtual_table import Column, VirtualTable
+import vmms
+from vmms import get_inventory, get_supervisor
+
+
+app_directory = os.path.dirname(os.path.abspath(__file__))
+
+# The window should be up within this many seconds, daemon or not
+STARTUP_BUDGET = float(os.environ.get("VMMS_STARTUP_BUDGET", "1.0"))
+
+# Background jobs (pulls, builds, VMs) run here so the Tk mainloop never blocks
+executor = JobExecutor(max_workers=8)
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+IMAGE_COLUMNS = (
+    Column("repository", "Repository", 260),
+    Column("tag", "Tag", 110),
+    Column("short_id", "ID", 110),
+    Column("created", "Created", 130, format_time),
+    Column("size", "Size", 90, format_bytes, "e"),
+)
+
+CONTAINER_COLUMNS = (
+    Column("name", "Name", 200),
+    Column("short_id", "ID", 110),
+    Column("image", "Image", 200),
+    Column("state", "State", 80),
+    Column("status", "Status", 150),
+    Column("created", "Created", 130, format_time),
+)
+
+# Get the Downloads directory
+def get_downloads_path():
+    return os.path.join(os.path.expanduser("~"), "Downloads")
+
+# Helper function for logging
+# Safe to call from background jobs: lines are batched and flushed on the Tk thread
+def log_message(log_widget, message):
+    get_log_pipeline(log_widget).write(message)
+    
+
+
+def boot(ram, cores, imagefile, isofile, job=None, name=None, profile="desktop", cpu_pinning=None):
+    if not isofile or isofile.lower() == "iso file (leave blank to skip)":
+        isofile = None
+    vm = vmms.boot(ram, cores, imagefile, isofile, name=name, profile=profile, cpu_pinning=cpu_pinning)
+    name = vm["name"]
+    print(" ".join(vm["cmd"]))
+    if job:
+        # Cancelling the job shuts the VM down gracefully, off the Tk thread
+        job.on_cancel(lambda: executor.submit(f"Stop VM {name}", lambda j: vmms.stop_vm(name)))
+        vnc = f", VNC {vm['vnc']}" if vm.get("vnc") else ""
+        job.set_progress(None, f"Running (PID {vm['pid']}{vnc})")
+    return vmms.wait_vm(name)
+
+def create_dockerfile(log_widget):
+    loaded_files = {}  # Dictionary to store file contents: {filename: content}
+    current_file = None  # Track currently displayed file
+    file_labels = []  # List to keep track of file labels
+     
+    def validate_dockerfile(content):
+             findings = lint_dockerfile(content)
+             report = format_findings(findings, estimate_layers(parse_dockerfile(content)))
+             log_message(log_widget, f"Dockerfile check:\n{report}")
+             errors = [f for f in findings if f.severity == "error"]
+             if errors:
+                 messagebox.showerror("Error", "\n".join(f"Line {f.line}: {f.message}" for f in errors))
+                 return False
+             warnings = [f for f in findings if f.severity == "warning"]
+             if warnings:
+                 details = "\n".join(f"Line {f.line}: {f.message}" for f in warnings)
+                 return messagebox.askyesno("Warning", f"{details}\n\nSave anyway?")
+             return True
+
+    def check_dockerfile():
+        content = dockerfile_text.get("1.0", "end").strip()
+        findings = lint_dockerfile(content)
+        log_message(log_widget, f"Dockerfile check:\n{format_findings(findings, estimate_layers(parse_dockerfile(content)))}")
+        # Highlight the lines with findings in the editor
+        dockerfile_text.tag_remove("lint", "1.0", "end")
+        for finding in findings:
+            dockerfile_text.tag_add("lint", f"{finding.line}.0", f"{finding.line}.end")
+        dockerfile_text.tag_config("lint", background="#fff3c4")
+
+    
+    def add_new_file():
+            filename = simpledialog.askstring("New File", "Enter filename:")
+            if filename and not any(char in filename for char in '<>:"/\\|?*'):
+                loaded_files[filename] = ""
+                update_file_list()
+                show_file(filename)
+            else:
+                messagebox.showerror("Error", "Invalid filename")
+    
+    def update_file_list():
+        files_listbox.delete(0, tk.END)
+        for filename in loaded_files:
+            files_listbox.insert(tk.END, filename)
+
+    def save_file(filename, content):
+        try:
+            file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+            with open(file_path, "w") as f:
+                f.write(content)
+            vmms.record_file(file_path, tag="dockerfile")
+            log_message(log_widget, f"Saved {filename}")
+            messagebox.showinfo("Success", f"Saved {filename}")
+        except Exception as e:
+            log_message(log_widget, f"Error saving {filename}: {e}")
+
+    def show_file(filename):
+            nonlocal current_file
+            current_file = filename
+            additional_text.delete("1.0", "end")
+            additional_text.insert("1.0", loaded_files.get(filename, ""))
+            files_label.config(text=f"Current File: {filename}")
+
+    def save_current_file():
+        if current_file:
+            content = additional_text.get("1.0", "end").strip()
+            loaded_files[current_file] = content
+            save_file(current_file, content)
+
+
+    def update_file_labels():
+        # Clear existing labels
+        for label in file_labels:
+            label.destroy()
+        file_labels.clear()
+        
+        # Create new labels
+        for filename in loaded_files.keys():
+            label = ttk.Label(
+                files_label, 
+                text=filename,
+                cursor="hand2",  # Show hand cursor on hover
+                style="Link.TLabel" if filename == current_file else "TLabel"
+            )
+            label.bind("<Button-1>", lambda e, f=filename: show_file(f))
+            label.pack(anchor="w", padx=5, pady=2)
+            file_labels.append(label)
+    
+    def save_dockerfile():
+        content = dockerfile_text.get("1.0", "end").strip()
+        if content and validate_dockerfile(content):
+            save_file("Dockerfile", content)
+
+        
+    def load_dockerfile():
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Dockerfile", "Dockerfile*"), ("All Files", "*.*")]
+        )
+        if file_path:
+            try:
+                with open(file_path, "r") as file:
+                    content = file.read()
+                dockerfile_text.delete("1.0", "end")
+                dockerfile_text.insert("1.0", content)
+                additional_text.delete("1.0", "end") 
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not load Dockerfile: {e}")
+
+    def load_additional_files():
+        file_paths = filedialog.askopenfilenames(
+            title="Select Additional Files",
+            filetypes=[("All Files", "*.*")]
+        )
+        if file_paths:
+            for file_path in file_paths:
+                try:
+                    with open(file_path, "r") as file:
+                        content = file.read()
+                        filename = file_path.split("/")[-1]
+                        loaded_files[filename] = content
+                except Exception as e:
+                    messagebox.showerror("Error", f"Could not load {file_path}: {e}")
+            
+            # Show the first loaded file
+            if loaded_files and not current_file:
+                show_file(list(loaded_files.keys())[0])
+            else:
+                update_file_labels()
+
+    def on_template_change(*args):
+        selected = template_var.get()
+        dockerfile_content, template_files = load_template(selected)
+        dockerfile_text.delete("1.0", "end")
+        dockerfile_text.insert("1.0", dockerfile_content)
+        loaded_files.clear()
+        loaded_files.update(template_files)
+        additional_text.delete("1.0", "end")
+
+        update_file_list()
+
+
+    popup = tk.Toplevel()
+    popup.title("Create or Edit Dockerfile")
+    popup.geometry("1000x600")
+
+    # Create a style for the "selected" label
+    style = ttk.Style()
+    style.configure("Link.TLabel", foreground="blue", font=("TkDefaultFont", 10, "underline"))
+
+    # Template selection
+    template_var = tk.StringVar(value="Custom")
+    templates = TEMPLATE_NAMES + ["Load Existing Dockerfile"]
+    ttk.Label(popup, text="Template:").pack(anchor="w", padx=10, pady=5)
+    ttk.Combobox(popup, textvariable=template_var, values=templates, state="readonly").pack(anchor="w", padx=10)
+
+
+    # Split layout
+    frame = ttk.Frame(popup)
+    frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+    # Dockerfile editor
+    dockerfile_frame = ttk.LabelFrame(frame, text="Dockerfile")
+    dockerfile_frame.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+
+    dockerfile_text = tk.Text(dockerfile_frame, wrap="word")
+    dockerfile_text.pack(fill="both", expand=True, padx=5, pady=5)
+    # Define save_dockerfile function
+   
+    
+
+    dockerfile_buttons_frame = ttk.Frame(dockerfile_frame)
+    dockerfile_buttons_frame.pack(fill="x", padx=5, pady=5)
+
+    load_dockerfile_button = ttk.Button(dockerfile_buttons_frame, text="Upload Dockerfile", command=load_dockerfile)
+    load_dockerfile_button.pack(side="left", padx=5)
+    
+    ttk.Button(dockerfile_buttons_frame, text="Save Dockerfile", command=save_dockerfile).pack(side="left", padx=5)
+    ttk.Button(dockerfile_buttons_frame, text="Check Dockerfile", command=check_dockerfile).pack(side="left", padx=5)
+
+    # Additional files editor
+    additional_frame = ttk.LabelFrame(frame, text="Additional Files")
+    additional_frame.pack(side="right", fill="both", expand=True, padx=5, pady=5)
+    
+    files_listbox = tk.Listbox(additional_frame, height=5)
+    files_listbox.pack(fill="x", padx=5, pady=5)
+    files_listbox.bind('<<ListboxSelect>>', 
+        lambda e: show_file(files_listbox.get(files_listbox.curselection())) if files_listbox.curselection() else None)
+
+    # Frame for file labels
+    files_label = ttk.Label(additional_frame, text="Files")
+    files_label.pack(fill="x", padx=5, pady=5)
+
+    additional_text = tk.Text(additional_frame, wrap="word")
+    additional_text.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # Buttons frame for additional files
+    additional_buttons_frame = ttk.Frame(additional_frame)
+    additional_buttons_frame.pack(fill="x", padx=5, pady=5)
+
+    load_additional_button = ttk.Button(additional_buttons_frame, text="Upload Additional Files", command=load_additional_files)
+    load_additional_button.pack(side="left", padx=5)
+    
+    ttk.Button(additional_buttons_frame, text="Add New File", command=add_new_file).pack(side="left", padx=5)
+    ttk.Button(additional_buttons_frame, text="Save Current File", command=save_current_file).pack(side="left", padx=5)
+    # Initialize with default template
+    on_template_change(None)
+    template_var.trace("w", on_template_change)
+
+def cleanup_files(log_widget):
+        # Every file the editor or build queue wrote is removed in one batch
+        result = vmms.cleanup_artifacts(kind="file")
+        if not result["removed"] and not result["errors"]:
+            log_message(log_widget, "No files to clean up.")
+            return 
+        log_message(log_widget, f"Deleted {result['removed']} file(s)")
+        for error in result["errors"]:
+            log_message(log_widget, f"Error deleting {error['ref']}: {error['error']}") 
+
+def show_reclaim_window(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("Reclaim Disk Space")
+
+    report = tk.Text(popup, height=14, width=80, font=("Courier", 9))
+    report.pack(fill="both", expand=True, padx=10, pady=5)
+
+    options = ttk.Frame(popup)
+    options.pack(fill="x", padx=10, pady=5)
+    target_vars = {}
+    for target in vmms.RECLAIM_TARGETS:
+        target_vars[target] = tk.BooleanVar(value=target in vmms.RECLAIM_DEFAULT_TARGETS)
+        ttk.Checkbutton(options, text=target.replace("_", " ").capitalize(),
+                        variable=target_vars[target]).pack(side="left", padx=5)
+
+    filters = ttk.Frame(popup)
+    filters.pack(fill="x", padx=10, pady=5)
+    all_images_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(filters, text="Unused images too (not just dangling)", variable=all_images_var).pack(side="left")
+    ttk.Label(filters, text="Older than:").pack(side="left", padx=(15, 0))
+    until_var = tk.StringVar(value="24h")
+    ttk.Entry(filters, textvariable=until_var, width=8).pack(side="left", padx=5)
+
+    def show_report(text):
+        if popup.winfo_exists():
+            report.delete("1.0", "end")
+            report.insert("1.0", text)
+
+    def analyze():
+        show_report("Measuring...")
+
+        def on_done(usage):
+            text = format_usage(usage["docker"] or {}, usage["qcow2"])
+            for error in usage["errors"]:
+                text += f"\n{error['target']}: {error['error']}"
+            show_report(text)
+
+        executor.submit("Measure reclaimable space", lambda job: vmms.disk_usage(all_images=all_images_var.get()),
+                        on_done=on_done, on_error=lambda e: show_report(f"Could not measure disk usage: {e}"))
+
+    def run_reclaim():
+        targets = [target for target, var in target_vars.items() if var.get()]
+        if not targets or not messagebox.askyesno("Reclaim", f"Prune/compact: {', '.join(targets)}?"):
+            return
+
+        def on_done(result):
+            log_message(log_widget, f"Reclaimed {format_bytes(result['total'])} in total")
+            for error in result["errors"]:
+                log_message(log_widget, f"  {error['target']}: {error['error']}")
+            analyze()
+
+        executor.submit(
+            "Reclaim disk space",
+            lambda job: vmms.reclaim_space(targets, until=until_var.get().strip() or None,
+                                           all_images=all_images_var.get(),
+                                           on_line=lambda line: log_message(log_widget, line), job=job),
+            on_done=on_done, on_error=lambda e: log_message(log_widget, f"Reclaim failed: {e}"),
+        )
+
+    buttons = ttk.Frame(popup)
+    buttons.pack(fill="x", padx=10, pady=5)
+    ttk.Button(buttons, text="Analyze", command=analyze).pack(side="left", padx=5)
+    ttk.Button(buttons, text="Reclaim", command=run_reclaim).pack(side="right", padx=5)
+    analyze()
+
+def show_artifacts_window(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("Created Artifacts")
+    popup.geometry("800x450")
+
+    filter_frame = ttk.Frame(popup)
+    filter_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Label(filter_frame, text="Type:").pack(side="left")
+    kind_var = tk.StringVar(value="all")
+    ttk.Combobox(filter_frame, textvariable=kind_var, values=["all", *ARTIFACT_KINDS], state="readonly",
+                 width=12).pack(side="left", padx=5)
+    ttk.Label(filter_frame, text="Tag:").pack(side="left")
+    tag_var = tk.StringVar()
+    ttk.Entry(filter_frame, textvariable=tag_var, width=15).pack(side="left", padx=5)
+    ttk.Label(filter_frame, text="Older than (days):").pack(side="left")
+    age_var = tk.StringVar()
+    ttk.Entry(filter_frame, textvariable=age_var, width=6).pack(side="left", padx=5)
+
+    columns = ("kind", "ref", "tag", "created")
+    tree = ttk.Treeview(popup, columns=columns, show="headings")
+    for column, width in zip(columns, (90, 450, 100, 140)):
+        tree.heading(column, text=column.capitalize())
+        tree.column(column, width=width, anchor="w")
+    tree.pack(fill="both", expand=True, padx=10, pady=5)
+    summary_var = tk.StringVar()
+    ttk.Label(popup, textvariable=summary_var).pack(anchor="w", padx=10)
+
+    def current_filters():
+        age = age_var.get().strip()
+        return {
+            "kind": None if kind_var.get() == "all" else kind_var.get(),
+            "tag": tag_var.get().strip() or None,
+            "older_than_days": float(age) if age else None,
+        }
+
+    def refresh():
+        try:
+            filters = current_filters()
+        except ValueError:
+            messagebox.showerror("Error", "Age must be a number of days")
+            return
+        artifacts = vmms.list_artifacts(limit=5000, **filters)
+        tree.delete(*tree.get_children())
+        for artifact in artifacts:
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(artifact["created"]))
+            tree.insert("", "end", values=(artifact["kind"], artifact["ref"], artifact["tag"] or "", created))
+        counts = vmms.artifact_counts()
+        summary_var.set("Recorded: " + (", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())) or "nothing"))
+
+    def cleanup():
+        try:
+            filters = current_filters()
+        except ValueError:
+            messagebox.showerror("Error", "Age must be a number of days")
+            return
+        count = len(tree.get_children())
+        if not count or not messagebox.askyesno("Clean Up", f"Remove the {count} artifact(s) listed?"):
+            return
+
+        def on_done(result):
+            log_message(log_widget, f"Cleaned up {result['removed']} artifact(s): {result['by_kind']}")
+            for error in result["errors"]:
+                log_message(log_widget, f"  could not remove {error['kind']} {error['ref']}: {error['error']}")
+            if popup.winfo_exists():
+                refresh()
+
+        executor.submit("Clean up artifacts", lambda job: vmms.cleanup_artifacts(job=job, **filters),
+                        on_done=on_done, on_error=lambda e: log_message(log_widget, f"Cleanup failed: {e}"))
+
+    ttk.Button(filter_frame, text="Show", command=refresh).pack(side="left", padx=5)
+    ttk.Button(filter_frame, text="Remove Listed", command=cleanup).pack(side="right", padx=5)
+    refresh()
+    
+def clear_files_and_exit(window, log_widget):
+        log_message(log_widget, "Clearing files and exiting.")
+        cleanup_files(log_widget)
+        window.quit()
+
+def keep_files_and_exit(window):
+     window.quit()
+    
+def on_close(window, log_widget):
+        response = messagebox.askquestion("Exit", "Do you want to clear the files before exiting?", icon='warning')
+        # Stop any running pulls and builds; VMs keep running and are reattached next time
+        executor.shutdown()
+        vmms.shutdown()
+        if response == "yes":
+            clear_files_and_exit(window, log_widget)
+        else:
+            keep_files_and_exit(window)
+
+def build_docker_image(log_widget):
+    app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)))
+    
+    # Ensure app directory exists
+    if not os.path.exists(app_dir):
+        messagebox.showerror("Error", "directory not found")
+        return
+        
+    dockerfile_path = filedialog.askopenfilename(
+        initialdir=app_dir,
+        title="Select Dockerfile",
+        filetypes=[("Dockerfile", "Dockerfile")],
+    )
+    
+    if not dockerfile_path:
+        return
+        
+    # Validate file is within app directory
+    if not os.path.commonpath([app_dir]) == os.path.commonpath([app_dir, dockerfile_path]):
+        messagebox.showerror("Error", "Please select a Dockerfile from the app directory")
+        return
+
+    image_tag = simpledialog.askstring(
+        "Image Name/Tag", "Enter image name and tag (e.g., myimage:latest):"
+    )
+    if not image_tag:
+        return
+
+    log_message(log_widget, f"Building image {image_tag}...")
+
+    def run_build(job):
+        # Build output is streamed into the log as the daemon produces it
+        return vmms.build_docker_image(dockerfile_path, image_tag, context_dir=app_dir,
+                                       on_line=lambda line: log_message(log_widget, line), job=job)
+
+    def on_done(result):
+        log_message(log_widget, f"Built {image_tag} with the {result['builder']} builder in {result['seconds']:.1f}s")
+        messagebox.showinfo("Success", f"Image built successfully: {image_tag}")
+
+    def on_error(e):
+        from docker.errors import BuildError
+
+        if isinstance(e, BuildError):
+            log_message(log_widget, f"Build failed: {e.msg}")
+            messagebox.showerror("Build Failed", f"Error:\n{e.msg}")
+        else:
+            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+
+    executor.submit(f"Build {image_tag}", run_build, on_done=on_done, on_error=on_error)
+
+def show_build_queue_window(root, log_widget):
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    popup = tk.Toplevel(root)
+    popup.title("Build Queue")
+    popup.geometry("800x450")
+
+    columns = ("tag", "dockerfile", "depends", "status", "time")
+    headings = ("Tag", "Dockerfile", "Depends on", "Status", "Time")
+    tree = ttk.Treeview(popup, columns=columns, show="headings", selectmode="extended")
+    for column, heading, width in zip(columns, headings, (170, 260, 170, 80, 70)):
+        tree.heading(column, text=heading)
+        tree.column(column, width=width, anchor="w")
+    tree.pack(fill="both", expand=True, padx=10, pady=5)
+
+    targets = {}  # tag -> BuildTarget
+
+    def show_targets():
+        try:
+            graph = dependency_graph(list(targets.values()))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        tree.delete(*tree.get_children())
+        for tag, target in targets.items():
+            tree.insert("", "end", iid=tag, values=(
+                tag, os.path.relpath(target.dockerfile, app_dir), ", ".join(sorted(graph[tag])) or "-", "queued", ""
+            ))
+
+    def add_target(dockerfile, tag):
+        if tag in targets:
+            messagebox.showerror("Error", f"{tag} is already in the queue")
+            return
+        targets[tag] = BuildTarget(dockerfile, tag)
+        show_targets()
+
+    def add_dockerfiles():
+        paths = filedialog.askopenfilenames(initialdir=app_dir, title="Select Dockerfiles",
+                                            filetypes=[("Dockerfile", "Dockerfile*"), ("All Files", "*.*")])
+        for path in paths:
+            tag = simpledialog.askstring("Image Tag", f"Tag for {os.path.relpath(path, app_dir)}:", parent=popup)
+            if tag:
+                add_target(path, tag)
+
+    def add_from_template():
+        template = simpledialog.askstring("Template", f"Template ({', '.join(TEMPLATE_NAMES)}):",
+                                          initialvalue="Python App", parent=popup)
+        if template not in TEMPLATE_NAMES:
+            return
+        tag = simpledialog.askstring("Image Tag", "Tag for the new image:", parent=popup)
+        if not tag:
+            return
+        # Each template gets its own context directory so builds don't share files
+        directory = os.path.join(app_dir, "builds", re.sub(r"[^\w.-]+", "_", tag))
+        paths = write_template(template, directory)
+        for path in paths:
+            vmms.record_file(path, tag="build-queue")
+        log_message(log_widget, f"Wrote {template} template to {directory}")
+        add_target(paths[0], tag)
+
+    def remove_selected():
+        for tag in tree.selection():
+            targets.pop(tag, None)
+        show_targets()
+
+    def build_all():
+        if not targets:
+            messagebox.showinfo("Build Queue", "Add Dockerfiles to the queue first.")
+            return
+        concurrency = concurrency_var.get()
+        queued = list(targets.values())
+        log_message(log_widget, f"Building {len(queued)} images, {concurrency} at a time...")
+
+        def update_row(result):
+            if tree.exists(result["tag"]):
+                tree.set(result["tag"], "status", result["status"])
+                tree.set(result["tag"], "time", f"{result['seconds']:.1f}s")
+
+        def run_queue(job):
+            started = time.monotonic()
+            results = vmms.build_docker_images(
+                queued, concurrency=concurrency, on_line=lambda line: log_message(log_widget, line),
+                on_result=lambda result: executor.call_in_ui(update_row, result), job=job,
+            )
+            return results, time.monotonic() - started
+
+        def on_done(result):
+            results, wall_seconds = result
+            log_message(log_widget, format_build_summary(results, wall_seconds))
+
+        executor.submit(f"Build queue ({len(queued)} images)", run_queue, on_done=on_done,
+                        on_error=lambda e: log_message(log_widget, f"Build queue failed: {e}"))
+
+    buttons = ttk.Frame(popup)
+    buttons.pack(fill="x", padx=10, pady=5)
+    ttk.Button(buttons, text="Add Dockerfiles", command=add_dockerfiles).pack(side="left", padx=5)
+    ttk.Button(buttons, text="Add from Template", command=add_from_template).pack(side="left", padx=5)
+    ttk.Button(buttons, text="Remove Selected", command=remove_selected).pack(side="left", padx=5)
+    ttk.Label(buttons, text="Parallel:").pack(side="left", padx=(15, 0))
+    concurrency_var = tk.IntVar(value=2)
+    ttk.Spinbox(buttons, from_=1, to=16, textvariable=concurrency_var, width=4).pack(side="left", padx=5)
+    ttk.Button(buttons, text="Build All", command=build_all).pack(side="right", padx=5)
+
+def pull_docker_image(log_widget):
+    # Step 1: Get the image name from the user
+    image_name = simpledialog.askstring("Input", "Enter image name to download (e.g., 'ubuntu:latest'):")
+
+    if not image_name:
+        log_message(log_widget, "Operation canceled: No image name provided.")
+        return
+
+    def run_pull(job):
+        # Step 2: Pull through the Engine API; layer progress goes to the progress bar
+        return vmms.pull_docker_image(image_name, on_line=lambda line: log_message(log_widget, line), job=job)
+
+    def on_done(result):
+        # Step 3: Display results
+        log_message(log_widget, f"Image '{image_name}' pulled successfully.")
+        messagebox.showinfo("Success", f"Image '{image_name}' pulled successfully.")
+
+    def on_error(e):
+        # Handle errors if the pull fails
+        log_message(log_widget, f"Error pulling image: {str(e)}")
+        messagebox.showerror("Error", f"Failed to pull image: {str(e)}")
+
+    log_message(log_widget, f"Pulling image '{image_name}'...")
+    executor.submit(f"Pull {image_name}", run_pull, on_done=on_done, on_error=on_error)
+
+def bulk_pull_docker_images(log_widget):
+    manifest_path = filedialog.askopenfilename(
+        title="Select Image Manifest",
+        filetypes=[("Manifest", "*.txt *.yml *.yaml"), ("All Files", "*.*")],
+    )
+    if not manifest_path:
+        return
+    concurrency = simpledialog.askinteger(
+        "Concurrency", "How many images to pull at once?", initialvalue=4, minvalue=1, maxvalue=32
+    )
+    if not concurrency:
+        return
+
+    try:
+        refs = parse_manifest(manifest_path)
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not read manifest: {e}")
+        return
+    if not refs:
+        log_message(log_widget, "Manifest contains no images.")
+        return
+
+    log_message(log_widget, f"Pulling {len(refs)} images from {os.path.basename(manifest_path)} ({concurrency} at a time)...")
+
+    def run_bulk_pull(job):
+        started = time.monotonic()
+        results = vmms.bulk_pull_images(refs, concurrency=concurrency,
+                                        on_line=lambda line: log_message(log_widget, line), job=job)
+        return results, time.monotonic() - started
+
+    def on_done(result):
+        results, wall_seconds = result
+        log_message(log_widget, format_summary(results, wall_seconds))
+        failed = [r for r in results if r["status"] == "failed"]
+        if failed:
+            messagebox.showwarning("Bulk Pull", f"{len(failed)} of {len(results)} images failed. See log for details.")
+        else:
+            messagebox.showinfo("Bulk Pull", f"All {len(results)} images are up to date.")
+
+    def on_error(e):
+        log_message(log_widget, f"Bulk pull failed: {e}")
+        messagebox.showerror("Error", f"Bulk pull failed: {e}")
+
+    executor.submit(f"Bulk pull ({len(refs)} images)", run_bulk_pull, on_done=on_done, on_error=on_error)
+
+def start_container(image_name, container_name):
+    """
+    Start a Docker container using the given image name and container name.
+    
+    """
+    if not image_name:
+        return
+
+    def run_container(job):
+        # Run the container (detached) with the given image name and container name
+        return vmms.start_container(image_name, container_name)
+
+    def on_done(container):
+        print(f"Container {container_name} using {image_name} started successfully.")
+        messagebox.showinfo("Success", f"Container {container_name} started successfully.")
+
+    def on_error(e):
+        print(f"Error starting container {container_name} with image {image_name}: {e}")
+        messagebox.showerror("Error", f"Error starting container: {e}")
+
+    executor.submit(f"Start container {container_name or image_name}", run_container,
+                    on_done=on_done, on_error=on_error)
+
+def show_launch_window(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("Launch Containers")
+
+    templates = load_templates()
+    form = ttk.Frame(popup)
+    form.pack(fill="both", expand=True, padx=10, pady=10)
+
+    # (spec field, label, hint)
+    field_specs = [
+        ("image", "Image", "nginx:1.25"),
+        ("name", "Name", "replicas get -1, -2, ..."),
+        ("command", "Command", ""),
+        ("cpu_quota", "CPU quota (us / 100ms)", "50000 = half a CPU"),
+        ("cpuset_cpus", "CPU set", "0-3"),
+        ("mem_limit", "Memory limit", "512m"),
+        ("shm_size", "Shared memory", "64m"),
+        ("ulimits", "Ulimits", "nofile=1024:4096"),
+        ("tmpfs", "tmpfs mounts", "/tmp=size=64m"),
+        ("network_mode", "Network", "bridge, host, none, or a network name"),
+        ("volumes", "Volumes", "/host/data:/data:ro, ..."),
+        ("environment", "Environment", "KEY=value, ..."),
+        ("labels", "Labels", "team=ci, ..."),
+    ]
+    variables = {}
+    for row, (field_name, label, hint) in enumerate(field_specs):
+        ttk.Label(form, text=f"{label}:").grid(row=row, column=0, sticky="w", pady=2)
+        variables[field_name] = tk.StringVar()
+        ttk.Entry(form, textvariable=variables[field_name], width=40).grid(row=row, column=1, padx=5, pady=2)
+        ttk.Label(form, text=hint, foreground="gray").grid(row=row, column=2, sticky="w")
+
+    row = len(field_specs)
+    ttk.Label(form, text="Restart policy:").grid(row=row, column=0, sticky="w", pady=2)
+    restart_var = tk.StringVar(value="no")
+    ttk.Combobox(form, textvariable=restart_var, values=RESTART_POLICIES, state="readonly",
+                 width=15).grid(row=row, column=1, sticky="w", padx=5)
+    ttk.Label(form, text="Replicas:").grid(row=row + 1, column=0, sticky="w", pady=2)
+    replicas_var = tk.IntVar(value=1)
+    ttk.Spinbox(form, from_=1, to=500, textvariable=replicas_var, width=6).grid(row=row + 1, column=1, sticky="w", padx=5)
+
+    def spec_from_form():
+        values = {name: var.get().strip() for name, var in variables.items()}
+        return LaunchSpec(
+            image=values["image"],
+            name=values["name"],
+            command=values["command"],
+            cpu_quota=int(values["cpu_quota"] or 0),
+            cpuset_cpus=values["cpuset_cpus"],
+            mem_limit=values["mem_limit"],
+            shm_size=values["shm_size"],
+            ulimits=parse_ulimits(values["ulimits"]),
+            tmpfs=parse_mapping(values["tmpfs"]),
+            network_mode=values["network_mode"],
+            volumes=[v.strip() for v in values["volumes"].split(",") if v.strip()],
+            restart_policy=restart_var.get(),
+            environment=parse_mapping(values["environment"]),
+            labels=parse_mapping(values["labels"]),
+        ).validate()
+
+    def fill_form(spec):
+        for name, var in variables.items():
+            value = getattr(spec, name)
+            if name == "ulimits":
+                value = ", ".join(f"{k}={soft}:{hard}" for k, (soft, hard) in value.items())
+            elif isinstance(value, dict):
+                value = ", ".join(f"{k}={v}" for k, v in value.items())
+            elif isinstance(value, list):
+                value = ", ".join(value)
+            elif name == "cpu_quota":
+                value = value or ""
+            var.set(value)
+        restart_var.set(spec.restart_policy)
+
+    template_frame = ttk.Frame(popup)
+    template_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Label(template_frame, text="Template:").pack(side="left")
+    template_var = tk.StringVar()
+    template_box = ttk.Combobox(template_frame, textvariable=template_var, values=sorted(templates), width=25)
+    template_box.pack(side="left", padx=5)
+
+    def load_selected_template(*args):
+        if template_var.get() in templates:
+            fill_form(templates[template_var.get()])
+
+    def save_current_template():
+        name = template_var.get().strip()
+        if not name:
+            messagebox.showerror("Error", "Enter a template name to save.")
+            return
+        try:
+            save_template(name, spec_from_form())
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid launch spec: {e}")
+            return
+        templates.clear()
+        templates.update(load_templates())
+        template_box.config(values=sorted(templates))
+        log_message(log_widget, f"Saved launch template {name}")
+
+    def delete_current_template():
+        name = template_var.get().strip()
+        if name in templates and messagebox.askyesno("Delete", f"Delete template {name}?"):
+            delete_template(name)
+            templates.pop(name)
+            template_box.config(values=sorted(templates))
+            template_var.set("")
+
+    template_box.bind("<<ComboboxSelected>>", load_selected_template)
+    ttk.Button(template_frame, text="Save Template", command=save_current_template).pack(side="left", padx=5)
+    ttk.Button(template_frame, text="Delete Template", command=delete_current_template).pack(side="left", padx=5)
+
+    def launch_containers():
+        try:
+            spec = spec_from_form()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid launch spec: {e}")
+            return
+        replicas = replicas_var.get()
+        log_message(log_widget, f"Launching {replicas} x {spec.image}...")
+
+        def report(result):
+            detail = f": {result['error']}" if result["error"] else ""
+            log_message(log_widget, f"  {result['name'] or '(unnamed)'}: {result['status']}{detail}")
+
+        def on_done(results):
+            started = sum(1 for result in results if result["status"] == "started")
+            log_message(log_widget, f"Launched {started} of {len(results)} container(s) from {spec.image}")
+
+        executor.submit(f"Launch {replicas} x {spec.image}",
+                        lambda job: vmms.launch_containers(spec, replicas=replicas, on_result=report, job=job),
+                        on_done=on_done,
+                        on_error=lambda e: log_message(log_widget, f"Launch failed: {e}"))
+
+    ttk.Button(popup, text="Launch", command=launch_containers).pack(pady=10)
+
+def search_local_image(log_widget):
+    popup = tk.Toplevel()
+    popup.title("Search Local Images")
+    popup.geometry("800x450")
+
+    # Filters
+    filters_frame = ttk.Frame(popup)
+    filters_frame.pack(fill="x", padx=10, pady=5)
+
+    pattern_var = tk.StringVar()
+    tag_var = tk.StringVar()
+    regex_var = tk.BooleanVar(value=False)
+    dangling_var = tk.StringVar(value="Any")
+    min_size_var = tk.StringVar()
+    max_size_var = tk.StringVar()
+    days_var = tk.StringVar()
+    sort_var = tk.StringVar(value="created")
+    descending_var = tk.BooleanVar(value=True)
+
+    ttk.Label(filters_frame, text="Repository:").grid(row=0, column=0, sticky="w")
+    pattern_entry = ttk.Entry(filters_frame, textvariable=pattern_var, width=25)
+    pattern_entry.grid(row=0, column=1, padx=5)
+    ttk.Label(filters_frame, text="Tag:").grid(row=0, column=2, sticky="w")
+    ttk.Entry(filters_frame, textvariable=tag_var, width=12).grid(row=0, column=3, padx=5)
+    ttk.Checkbutton(filters_frame, text="Regex", variable=regex_var).grid(row=0, column=4, padx=5)
+    ttk.Label(filters_frame, text="Dangling:").grid(row=0, column=5, sticky="w")
+    ttk.Combobox(filters_frame, textvariable=dangling_var, values=["Any", "Yes", "No"],
+                 state="readonly", width=5).grid(row=0, column=6, padx=5)
+
+    ttk.Label(filters_frame, text="Min size:").grid(row=1, column=0, sticky="w")
+    ttk.Entry(filters_frame, textvariable=min_size_var, width=10).grid(row=1, column=1, sticky="w", padx=5)
+    ttk.Label(filters_frame, text="Max size:").grid(row=1, column=2, sticky="w")
+    ttk.Entry(filters_frame, textvariable=max_size_var, width=12).grid(row=1, column=3, padx=5)
+    ttk.Label(filters_frame, text="Created in last (days):").grid(row=1, column=4, sticky="w")
+    ttk.Entry(filters_frame, textvariable=days_var, width=5).grid(row=1, column=5, padx=5)
+    ttk.Label(filters_frame, text="Sort:").grid(row=2, column=0, sticky="w")
+    ttk.Combobox(filters_frame, textvariable=sort_var, values=SORT_KEYS,
+                 state="readonly", width=10).grid(row=2, column=1, sticky="w", padx=5)
+    ttk.Checkbutton(filters_frame, text="Descending", variable=descending_var).grid(row=2, column=2, sticky="w")
+
+    # Rows arrive already filtered and sorted by query_images
+    table = VirtualTable(popup, IMAGE_COLUMNS, key=lambda row: (row["id"], row["repository"], row["tag"]))
+    table.pack(fill="both", expand=True, padx=10, pady=5)
+    status_label = ttk.Label(popup, text="Loading images...")
+    status_label.pack(anchor="w", padx=10, pady=5)
+
+    rows = []
+    pending = [None]
+
+    def run_query():
+        pending[0] = None
+        try:
+            days = days_var.get().strip()
+            results = query_images(
+                rows,
+                pattern=pattern_var.get().strip(),
+                tag=tag_var.get().strip(),
+                regex=regex_var.get(),
+                min_size=parse_size(min_size_var.get()),
+                max_size=parse_size(max_size_var.get()),
+                created_after=days_ago(float(days)) if days else None,
+                dangling={"Any": None, "Yes": True, "No": False}[dangling_var.get()],
+                sort_by=sort_var.get(),
+                descending=descending_var.get(),
+            )
+        except (ValueError, re.error) as e:
+            status_label.config(text=f"Invalid filter: {e}")
+            return
+        table.set_rows([row._asdict() for row in results])
+        status_label.config(text=f"{len(results)} of {len(rows)} images match")
+
+    def schedule_query(*args):
+        # Debounce so typing quickly only runs one query
+        if pending[0] is not None:
+            popup.after_cancel(pending[0])
+        pending[0] = popup.after(150, run_query)
+
+    for var in (pattern_var, tag_var, regex_var, dangling_var, min_size_var, max_size_var,
+                days_var, sort_var, descending_var):
+        var.trace_add("write", schedule_query)
+
+    def on_loaded(images):
+        rows[:] = image_rows(images)
+        run_query()
+
+    def on_error(e):
+        log_message(log_widget, f"Error loading local images: {e}")
+        status_label.config(text=f"Error: {e}")
+
+    executor.submit("Load local images", lambda job: get_inventory().images(),
+                    on_done=on_loaded, on_error=on_error)
+    pattern_entry.focus_set()
+
+def search_dockerhub_image(root, log_widget):
+    # Step 1: Get the search term from the user
+    image_name = simpledialog.askstring("Input", "Enter image name to search on Docker Hub:")
+    
+    if not image_name:
+        log_message(log_widget, "Operation canceled: No image name provided.")
+        return
+
+    popup = tk.Toplevel(root)
+    popup.title(f"Docker Hub: {image_name}")
+    popup.geometry("850x450")
+
+    columns = ("name", "stars", "pulls", "official", "description")
+    tree = ttk.Treeview(popup, columns=columns, show="headings")
+    for column, width, anchor in zip(columns, (220, 70, 100, 70, 360), ("w", "e", "e", "center", "w")):
+        tree.column(column, width=width, anchor=anchor)
+    tree.pack(fill="both", expand=True, padx=10, pady=5)
+
+    page_size = 25
+    state = {"page": 1, "count": 0, "rows": [], "sort_by": None, "descending": True}
+    status_var = tk.StringVar()
+
+    def show_rows():
+        rows = state["rows"]
+        if state["sort_by"]:
+            rows = sort_results(rows, state["sort_by"], state["descending"])
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", "end", values=(
+                row["name"], row["stars"], f"{row['pulls']:,}", "[OK]" if row["official"] else "",
+                row["description"][:80],
+            ))
+        pages = max(1, -(-state["count"] // page_size))
+        status_var.set(f"Page {state['page']} of {pages} ({state['count']} repositories)")
+
+    def sort_by(column):
+        if column == "description":
+            return
+        if state["sort_by"] == column:
+            state["descending"] = not state["descending"]
+        else:
+            state["sort_by"], state["descending"] = column, column != "name"
+        show_rows()
+
+    for column in columns:
+        tree.heading(column, text=column.capitalize(), command=lambda c=column: sort_by(c))
+
+    def load_page(page):
+        def on_done(data):
+            # Step 3: Show this page of results in the table
+            state.update(page=page, count=data["count"], rows=data["results"])
+            if popup.winfo_exists():
+                show_rows()
+            source = "cache" if data["cached"] else "Docker Hub"
+            log_message(log_widget, f"Docker Hub search '{image_name}' page {page}: {len(data['results'])} results from {source}")
+
+        def on_error(e):
+            log_message(log_widget, f"Unexpected error while searching DockerHub: {e}")
+            messagebox.showerror("Error", f"Unexpected error: {e}")
+
+        # Step 2: Search Docker Hub directly (cached and rate-limited)
+        executor.submit(f"Search Docker Hub for {image_name}",
+                        lambda job: vmms.search_dockerhub_page(image_name, page=page, page_size=page_size),
+                        on_done=on_done, on_error=on_error)
+
+    def change_page(step):
+        page = state["page"] + step
+        if page >= 1 and (page - 1) * page_size < state["count"]:
+            load_page(page)
+
+    def pull_selected():
+        for item in tree.selection():
+            name = tree.item(item, "values")[0]
+            executor.submit(f"Pull {name}",
+                            lambda job, n=name: vmms.pull_docker_image(n, on_line=lambda line: log_message(log_widget, line), job=job),
+                            on_done=lambda result: log_message(log_widget, f"Image '{result['image']}' pulled successfully."),
+                            on_error=lambda e: log_message(log_widget, f"Pull failed: {e}"))
+
+    controls = ttk.Frame(popup)
+    controls.pack(fill="x", padx=10, pady=5)
+    ttk.Button(controls, text="< Previous", command=lambda: change_page(-1)).pack(side="left", padx=5)
+    ttk.Button(controls, text="Next >", command=lambda: change_page(1)).pack(side="left", padx=5)
+    ttk.Label(controls, textvariable=status_var).pack(side="left", padx=10)
+    ttk.Button(controls, text="Pull Selected", command=pull_selected).pack(side="right", padx=5)
+    load_page(1)
+
+def show_inventory_table(title, kind, columns, key, load_rows, log_widget, sort_by=None):
+    """
+    Window with a filterable VirtualTable over the Docker inventory. load_rows(inventory)
+    is re-run and diffed against the table whenever the inventory reports a change to
+    kind ('images' or 'containers'). Returns (popup, table, refresh).
+    """
+    popup = tk.Toplevel()
+    popup.title(title)
+    popup.geometry("850x500")
+
+    filter_frame = ttk.Frame(popup)
+    filter_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Label(filter_frame, text="Filter:").pack(side="left")
+    filter_var = tk.StringVar()
+    filter_entry = ttk.Entry(filter_frame, textvariable=filter_var, width=40)
+    filter_entry.pack(side="left", padx=5)
+
+    table = VirtualTable(popup, columns, key)
+    table.pack(fill="both", expand=True, padx=10, pady=5)
+    if sort_by:
+        table.sort(*sort_by)
+    status_label = ttk.Label(popup, text=f"Loading {kind}...")
+    status_label.pack(anchor="w", padx=10, pady=5)
+    state = {"inventory": None, "filter": None, "refresh": None}
+
+    def update_status(event=None):
+        if state["inventory"] is None:
+            return
+        first, last, total = table.visible_range()
+        filtered = f" (filtered from {len(table.model):,})" if total != len(table.model) else ""
+        status_label.config(text=f"Rows {first:,}-{last:,} of {total:,}{filtered}")
+
+    table.bind("<<VirtualTableChanged>>", update_status)
+
+    def apply_filter():
+        state["filter"] = None
+        table.set_filter(filter_var.get())
+
+    def schedule_filter(*args):
+        # Debounce so typing quickly only filters once
+        if state["filter"] is not None:
+            popup.after_cancel(state["filter"])
+        state["filter"] = popup.after(150, apply_filter)
+
+    filter_var.trace_add("write", schedule_filter)
+
+    def refresh():
+        state["refresh"] = None
+        if state["inventory"] is not None and popup.winfo_exists():
+            table.set_rows(load_rows(state["inventory"]))
+
+    def schedule_refresh():
+        # Coalesce a burst of events (e.g. a batch stop) into one diff
+        if state["refresh"] is None and popup.winfo_exists():
+            state["refresh"] = popup.after(250, refresh)
+
+    def on_inventory_change(changed):
+        # Called on the inventory's events thread
+        if changed == kind:
+            executor.call_in_ui(schedule_refresh)
+
+    def on_loaded(inventory):
+        if not popup.winfo_exists():
+            return
+        state["inventory"] = inventory
+        inventory.add_listener(on_inventory_change)
+        refresh()
+
+    def on_error(e):
+        log_message(log_widget, f"Error loading {kind}: {e}")
+        status_label.config(text=f"Error: {e}")
+
+    def on_popup_close():
+        if state["inventory"] is not None:
+            state["inventory"].remove_listener(on_inventory_change)
+        popup.destroy()
+
+    popup.protocol("WM_DELETE_WINDOW", on_popup_close)
+    executor.submit(f"Load {kind}", lambda job: get_inventory(), on_done=on_loaded, on_error=on_error)
+    filter_entry.focus_set()
+    return popup, table, refresh
+
+def list_docker_images(log_widget):
+    show_inventory_table(
+        "Docker Images", "images", IMAGE_COLUMNS,
+        key=lambda row: (row["id"], row["repository"], row["tag"]),
+        load_rows=lambda inventory: [row._asdict() for row in image_rows(inventory.images())],
+        log_widget=log_widget, sort_by=("created", True),
+    )
+
+def search_docker_container(log_widget):
+    """Search for a specific Docker container."""
+    query = simpledialog.askstring("Search Container", "Enter container name or ID to search:")
+    if not query:
+        return
+
+    def run_search(job):
+        matches = get_inventory().search_containers(query)
+        return sorted((container["name"], container["state"]) for container in matches)
+
+    def on_done(matches):
+        for name, status in matches:
+            log_message(log_widget, f"Found Container: {name} | Status: {status}")
+        if not matches:
+            log_message(log_widget, f"No containers found matching: {query}")
+
+    def on_error(e):
+        log_message(log_widget, f"Error: {e}")
+        messagebox.showerror("Error", f"Could not search Docker containers: {e}")
+
+    executor.submit(f"Search containers for {query}", run_search, on_done=on_done, on_error=on_error)
+
+def list_running_containers(log_widget):
+    show_all = tk.BooleanVar(value=False)
+    popup, table, refresh = show_inventory_table(
+        "Containers", "containers", CONTAINER_COLUMNS,
+        key=lambda row: row["id"],
+        load_rows=lambda inventory: inventory.containers(running_only=not show_all.get()),
+        log_widget=log_widget, sort_by=("name", False),
+    )
+    show_all.trace_add("write", lambda *args: refresh())
+    ttk.Checkbutton(popup, text="Show stopped containers", variable=show_all).pack(anchor="w", padx=10, pady=5)
+
+def show_stats_dashboard(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("Container Resource Dashboard")
+    popup.geometry("900x400")
+
+    columns = ("name", "cpu", "cpu_avg", "memory", "net_rx", "net_tx", "block_read", "block_write")
+    headings = ("Name", "CPU %", "CPU avg %", "Memory", "Net RX/s", "Net TX/s", "Block R/s", "Block W/s")
+    tree = ttk.Treeview(popup, columns=columns, show="headings")
+    for column, heading in zip(columns, headings):
+        tree.heading(column, text=heading)
+        tree.column(column, width=180 if column == "name" else 90, anchor="w")
+    tree.pack(fill="both", expand=True, padx=10, pady=10)
+    status_label = ttk.Label(popup, text="Loading containers...")
+    status_label.pack(anchor="w", padx=10, pady=5)
+
+    state = {"inventory": None, "collector": None, "after": None}
+
+    def refresh():
+        inv, collector = state["inventory"], state["collector"]
+        collector.sync(inv.containers(running_only=True))
+        # Busiest containers first so the noisy neighbour is at the top
+        rows = sorted(collector.snapshot(), key=lambda row: row["cpu"], reverse=True)
+        tree.delete(*tree.get_children())
+        for row in rows:
+            memory = format_bytes(row["memory"])
+            if row["memory_limit"]:
+                memory += f" ({row['memory'] / row['memory_limit']:.0%})"
+            tree.insert("", "end", values=(
+                row["name"], f"{row['cpu']:.1f}", f"{row['cpu_avg']:.1f}", memory,
+                format_bytes(row["net_rx"]), format_bytes(row["net_tx"]),
+                format_bytes(row["block_read"]), format_bytes(row["block_write"]),
+            ))
+        status_label.config(text=f"{len(rows)} running containers, 60 sample window")
+        state["after"] = popup.after(1000, refresh)
+
+    def on_loaded(result):
+        client, inv = result
+        if not popup.winfo_exists():
+            return
+        state["inventory"], state["collector"] = inv, StatsCollector(client, window=60)
+        refresh()
+
+    def on_error(e):
+        log_message(log_widget, f"Error loading containers: {e}")
+        status_label.config(text=f"Error: {e}")
+
+    def on_popup_close():
+        if state["after"] is not None:
+            popup.after_cancel(state["after"])
+        if state["collector"] is not None:
+            state["collector"].stop()
+        popup.destroy()
+
+    popup.protocol("WM_DELETE_WINDOW", on_popup_close)
+    # Connecting retries with backoff when the daemon is down, so it never runs on the Tk thread
+    executor.submit("Load containers", lambda job: (vmms.get_client(), get_inventory()),
+                    on_done=on_loaded, on_error=on_error)
+
+def show_batch_containers_window(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("Batch Container Actions")
+    popup.geometry("750x450")
+
+    selector_frame = ttk.Frame(popup)
+    selector_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Label(selector_frame, text="Select by name glob or label (label=key=value):").pack(side="left")
+    selector_var = tk.StringVar()
+    ttk.Entry(selector_frame, textvariable=selector_var, width=30).pack(side="left", padx=5)
+
+    columns = ("name", "state", "image")
+    tree = ttk.Treeview(popup, columns=columns, show="headings", selectmode="extended")
+    for column, width in zip(columns, (250, 100, 330)):
+        tree.heading(column, text=column.capitalize())
+        tree.column(column, width=width, anchor="w")
+    tree.pack(fill="both", expand=True, padx=10, pady=5)
+
+    containers = {}
+
+    def show_containers(rows):
+        containers.clear()
+        tree.delete(*tree.get_children())
+        for row in sorted(rows, key=lambda row: row["name"]):
+            containers[row["id"]] = row
+            tree.insert("", "end", iid=row["id"], values=(row["name"], row["state"], row["image"]))
+
+    def refresh():
+        executor.submit("List containers", lambda job: vmms.list_containers(all=True), on_done=show_containers,
+                        on_error=lambda e: log_message(log_widget, f"Error listing containers: {e}"))
+
+    def select_matching():
+        selector = selector_var.get().strip()
+        if not selector:
+            return
+        if selector.startswith("label="):
+            key, _, value = selector[len("label="):].partition("=")
+            matches = [cid for cid, row in containers.items()
+                       if key in row["labels"] and (not value or row["labels"][key] == value)]
+        else:
+            matches = [cid for cid, row in containers.items() if fnmatch.fnmatchcase(row["name"], selector)]
+        tree.selection_set(matches)
+
+    ttk.Button(selector_frame, text="Select Matching", command=select_matching).pack(side="left", padx=5)
+
+    options_frame = ttk.Frame(popup)
+    options_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Label(options_frame, text="Stop timeout (s):").pack(side="left")
+    timeout_var = tk.IntVar(value=10)
+    ttk.Spinbox(options_frame, from_=0, to=300, textvariable=timeout_var, width=5).pack(side="left", padx=5)
+    ttk.Label(options_frame, text="Parallel:").pack(side="left")
+    workers_var = tk.IntVar(value=16)
+    ttk.Spinbox(options_frame, from_=1, to=64, textvariable=workers_var, width=5).pack(side="left", padx=5)
+
+    def run_action(action):
+        selected = [containers[iid] for iid in tree.selection() if iid in containers]
+        if not selected:
+            messagebox.showinfo("Batch", "Select one or more containers first.")
+            return
+        if action == "remove" and not messagebox.askyesno("Remove", f"Remove {len(selected)} container(s)?"):
+            return
+        timeout, workers = timeout_var.get(), workers_var.get()
+        log_message(log_widget, f"{action.capitalize()} {len(selected)} container(s), {workers} at a time...")
+
+        def report(result):
+            detail = f": {result['error']}" if result["error"] else ""
+            log_message(log_widget, f"  {result['name']}: {result['status']} ({result['seconds']:.1f}s){detail}")
+
+        def on_done(results):
+            log_message(log_widget, f"{action.capitalize()} finished: {summarize_batch(results)}")
+            refresh()
+
+        executor.submit(
+            f"{action.capitalize()} {len(selected)} containers",
+            lambda job: run_batch(vmms.get_client(), action, selected, max_workers=workers, timeout=timeout,
+                                  force=True, on_result=report, job=job),
+            on_done=on_done,
+            on_error=lambda e: log_message(log_widget, f"Batch {action} failed: {e}"),
+        )
+
+    actions_frame = ttk.Frame(popup)
+    actions_frame.pack(fill="x", padx=10, pady=5)
+    for action in ACTIONS:
+        ttk.Button(actions_frame, text=action.capitalize(), command=lambda a=action: run_action(a)).pack(side="left", padx=5)
+    ttk.Button(actions_frame, text="Refresh", command=refresh).pack(side="right", padx=5)
+    refresh()
+
+def stop_container(log_widget):
+    container_nm =  simpledialog.askstring("Stop Container", "Enter container name:")
+    if not container_nm:
+        return
+
+    def run_stop(job):
+        # Get the container by name and stop it
+        return vmms.stop_container(container_nm)
+
+    def on_done(result):
+        log_message(log_widget, f"Container {container_nm} stopped.")
+        messagebox.showinfo("Success", f"Container {container_nm} stopped.")
+
+    def on_error(e):
+        from docker.errors import NotFound
+
+        if isinstance(e, NotFound):
+            log_message(log_widget, f"Error: Container {container_nm} not found.")
+            messagebox.showerror("Error", f"Container {container_nm} not found.")
+        else:
+            log_message(log_widget, f"Error: Failed to stop container: {str(e)}")
+            messagebox.showerror("Error", f"Failed to stop container: {str(e)}")
+
+    log_message(log_widget, f"Stopping container {container_nm}...")
+    executor.submit(f"Stop {container_nm}", run_stop, on_done=on_done, on_error=on_error)
+
+def show_container_logs_window(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("Container Logs")
+    popup.geometry("1100x600")
+    view_lines = 5000
+
+    # Containers and follow options
+    side = ttk.Frame(popup)
+    side.pack(side="left", fill="y", padx=10, pady=10)
+    ttk.Label(side, text="Containers:").pack(anchor="w")
+    container_list = tk.Listbox(side, selectmode="extended", width=30, exportselection=False)
+    container_list.pack(fill="y", expand=True)
+    options = ttk.Frame(side)
+    options.pack(fill="x", pady=5)
+    tail_var = tk.StringVar(value="100")
+    buffer_var = tk.StringVar(value=str(DEFAULT_BUFFER_LINES))
+    ttk.Label(options, text="Tail lines:").grid(row=0, column=0, sticky="w")
+    ttk.Entry(options, textvariable=tail_var, width=8).grid(row=0, column=1, sticky="w", padx=5)
+    ttk.Label(options, text="Keep per container:").grid(row=1, column=0, sticky="w")
+    ttk.Entry(options, textvariable=buffer_var, width=8).grid(row=1, column=1, sticky="w", padx=5)
+
+    # Filters and the merged log view
+    main_frame = ttk.Frame(popup)
+    main_frame.pack(side="left", fill="both", expand=True, padx=(0, 10), pady=10)
+    filters = ttk.Frame(main_frame)
+    filters.pack(fill="x")
+    since_var = tk.StringVar()
+    until_var = tk.StringVar()
+    pattern_var = tk.StringVar()
+    ttk.Label(filters, text="Since:").pack(side="left")
+    ttk.Entry(filters, textvariable=since_var, width=18).pack(side="left", padx=5)
+    ttk.Label(filters, text="Until:").pack(side="left")
+    ttk.Entry(filters, textvariable=until_var, width=18).pack(side="left", padx=5)
+    ttk.Label(filters, text="Search (regex):").pack(side="left")
+    ttk.Entry(filters, textvariable=pattern_var, width=30).pack(side="left", padx=5)
+
+    text_frame = ttk.Frame(main_frame)
+    text_frame.pack(fill="both", expand=True, pady=5)
+    text = tk.Text(text_frame, wrap="none", state="disabled", font=("Courier", 9), bg="#f4f4f4")
+    scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=text.yview)
+    text.config(yscrollcommand=scrollbar.set)
+    text.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="left", fill="y")
+    status_label = ttk.Label(main_frame, text="Select containers and press Follow.")
+    status_label.pack(anchor="w")
+
+    pipeline = LogPipeline(text, max_lines=view_lines)
+    state = {"follower": None, "starting": None, "names": [], "filter": (None, None, None), "pending": None,
+             "after": None}
+
+    def matches(line):
+        since, until, regex = state["filter"]
+        return ((since is None or line.time >= since) and (until is None or line.time <= until)
+                and (regex is None or regex.search(line.text) is not None))
+
+    def on_line(line):
+        # Called on the follower threads; the pipeline batches lines onto the Tk thread
+        if matches(line):
+            pipeline.write(format_line(line))
+
+    def on_end(container, error):
+        executor.call_in_ui(log_message, log_widget,
+                            f"Stopped following {container}" + (f": {error}" if error else ""))
+
+    def apply_filter():
+        state["pending"] = None
+        try:
+            pattern = pattern_var.get().strip()
+            state["filter"] = (parse_time(since_var.get()), parse_time(until_var.get()),
+                               re.compile(pattern, re.IGNORECASE) if pattern else None)
+        except (ValueError, re.error) as e:
+            status_label.config(text=f"Invalid filter: {e}")
+            return
+        # Redraw from the buffers; the view only ever holds the newest view_lines matches
+        since, until, regex = state["filter"]
+        lines = state["follower"].lines(since=since, until=until, pattern=regex) if state["follower"] else []
+        pipeline.clear()
+        pipeline.write_lines([format_line(line) for line in lines[-view_lines:]])
+        update_status()
+
+    def schedule_filter(*args):
+        # Debounce so typing a regex only searches once
+        if state["pending"] is not None:
+            popup.after_cancel(state["pending"])
+        state["pending"] = popup.after(200, apply_filter)
+
+    for var in (since_var, until_var, pattern_var):
+        var.trace_add("write", schedule_filter)
+
+    def update_status():
+        follower = state["follower"]
+        if follower is None:
+            return
+        stats = follower.stats()
+        buffered = sum(row["buffered"] for row in stats.values())
+        dropped = sum(row["dropped"] for row in stats.values())
+        status_label.config(text=f"Following {len(follower.following())} of {len(stats)} container(s); "
+                                 f"{buffered:,} lines buffered, {dropped:,} older lines dropped")
+
+    def poll_status():
+        update_status()
+        state["after"] = popup.after(1000, poll_status)
+
+    def selected_names():
+        return [state["names"][index] for index in container_list.curselection()]
+
+    def follow_selected():
+        names = selected_names()
+        try:
+            tail, buffer_lines = int(tail_var.get()), int(buffer_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Tail lines and lines kept per container must be numbers.")
+            return
+        if not names:
+            return
+        follower = state["follower"]
+        if follower is not None:
+            # Applies to streams started from now on
+            follower.tail, follower.buffer_lines = tail, buffer_lines
+            for name in names:
+                follower.follow(name)
+            return
+        if state["starting"] is not None:
+            # The follower is still being created; it picks these up once it exists
+            starting = state["starting"]
+            starting.update(names=starting["names"] + names, tail=tail, buffer_lines=buffer_lines)
+            starting["stopped"] = [name for name in starting["stopped"] if name not in names]
+            return
+        state["starting"] = {"names": [], "stopped": [], "tail": tail, "buffer_lines": buffer_lines}
+
+        def on_done(follower):
+            starting, state["starting"] = state["starting"], None
+            state["follower"] = follower
+            if not popup.winfo_exists():
+                follower.stop()
+                return
+            follower.tail, follower.buffer_lines = starting["tail"], starting["buffer_lines"]
+            for name in starting["stopped"]:
+                follower.stop(name)
+            for name in starting["names"]:
+                follower.follow(name)
+
+        def on_error(e):
+            state["starting"] = None
+            log_message(log_widget, f"Error following logs: {e}")
+
+        executor.submit("Follow container logs",
+                        lambda job: vmms.follow_container_logs(names, tail=tail, buffer_lines=buffer_lines,
+                                                               on_line=on_line, on_end=on_end),
+                        on_done=on_done, on_error=on_error)
+
+    def stop_selected():
+        names = selected_names()
+        if state["starting"] is not None:
+            starting = state["starting"]
+            starting["names"] = [name for name in starting["names"] if name not in names]
+            starting["stopped"] += names
+        if state["follower"] is not None:
+            for name in names:
+                state["follower"].stop(name)
+
+    def export_selected():
+        for name in selected_names():
+            path = filedialog.asksaveasfilename(parent=popup, title=f"Export logs of {name}",
+                                                initialfile=f"{name}.log", defaultextension=".log")
+            if not path:
+                continue
+            executor.submit(f"Export logs of {name}",
+                            lambda job, n=name, p=path: vmms.export_container_logs(
+                                n, p, since=since_var.get(), until=until_var.get(), job=job),
+                            on_done=lambda result: log_message(
+                                log_widget, f"Saved logs of {result['container']} to {result['path']} "
+                                            f"({format_bytes(result['bytes'])})"),
+                            on_error=lambda e: log_message(log_widget, f"Error exporting logs: {e}"))
+
+    def load_containers():
+        def on_done(containers):
+            rows = sorted(containers, key=lambda row: row["name"])
+            state["names"] = [row["name"] for row in rows]
+            container_list.delete(0, tk.END)
+            for row in rows:
+                container_list.insert(tk.END, f"{row['name']} ({row['state']})")
+
+        executor.submit("Load containers", lambda job: get_inventory().containers(), on_done=on_done,
+                        on_error=lambda e: log_message(log_widget, f"Error loading containers: {e}"))
+
+    def on_popup_close():
+        if state["follower"] is not None:
+            state["follower"].stop()
+        if state["after"] is not None:
+            popup.after_cancel(state["after"])
+        pipeline.close()
+        popup.destroy()
+
+    buttons_frame = ttk.Frame(side)
+    buttons_frame.pack(fill="x")
+    for label, command in (("Follow Selected", follow_selected), ("Stop Selected", stop_selected),
+                           ("Export Selected...", export_selected), ("Clear View", pipeline.clear),
+                           ("Refresh List", load_containers)):
+        ttk.Button(buttons_frame, text=label, command=command).pack(fill="x", pady=2)
+    popup.protocol("WM_DELETE_WINDOW", on_popup_close)
+    load_containers()
+    poll_status()
+
+def create_image_dialog(log_widget):
+    name = simpledialog.askstring("Image Name", "Enter image name:")
+    size = simpledialog.askinteger("Size (MB)", "Enter image size in MB:")
+    location = filedialog.askdirectory(title="Select Save Location")
+    if not name or not size or not location:
+        log_message(log_widget, "Operation canceled: missing image name, size or location.")
+        return
+    preallocation = simpledialog.askstring(
+        "Preallocation", f"Preallocation ({', '.join(PREALLOCATION_MODES)}):", initialvalue="off"
+    )
+    if preallocation not in PREALLOCATION_MODES:
+        messagebox.showerror("Error", f"Preallocation must be one of {', '.join(PREALLOCATION_MODES)}")
+        return
+    cluster_size = simpledialog.askstring("Cluster Size", "Cluster size (e.g. 64K, 2M), blank for default:") or None
+
+    executor.submit(f"Create image {name}",
+                    lambda job: vmms.create_image(name, size, location, preallocation=preallocation,
+                                                  cluster_size=cluster_size),
+                    on_done=lambda path: log_message(log_widget, f"Created QEMU image {path}"),
+                    on_error=lambda e: log_message(log_widget, f"Error creating image: {e}"))
+
+def clone_image_dialog(log_widget):
+    base_image = filedialog.askopenfilename(title="Select Base Image")
+    if not base_image:
+        return
+    name = simpledialog.askstring("Clone Name", "Enter name for the clone(s):")
+    count = simpledialog.askinteger("Clones", "How many clones?", initialvalue=1, minvalue=1, maxvalue=500)
+    if not name or not count:
+        return
+    location = filedialog.askdirectory(title="Select Save Location") or os.path.dirname(base_image)
+
+    def on_done(paths):
+        for path in paths:
+            log_message(log_widget, f"Created overlay {path}")
+        log_message(log_widget, f"Cloned {os.path.basename(base_image)} {len(paths)} time(s); "
+                                f"the base image is shared read-only, don't modify it directly.")
+
+    executor.submit(f"Clone {os.path.basename(base_image)} x{count}",
+                    lambda job: vmms.clone_image(base_image, name, location, count=count),
+                    on_done=on_done,
+                    on_error=lambda e: log_message(log_widget, f"Error cloning image: {e}"))
+
+def manage_image_dialog(root, log_widget):
+    image = filedialog.askopenfilename(title="Select QEMU Image File")
+    if not image:
+        return
+
+    popup = tk.Toplevel(root)
+    popup.title(f"Manage {os.path.basename(image)}")
+    ttk.Label(popup, text=image).pack(anchor="w", padx=10, pady=10)
+
+    def in_use():
+        # Rewriting a disk under a running VM corrupts it
+        running = [vm["name"] for vm in get_supervisor().vms.values()
+                   if vm.get("image") and os.path.abspath(vm["image"]) == os.path.abspath(image)]
+        if running:
+            messagebox.showerror("Error", f"Image is in use by running VM(s): {', '.join(running)}")
+        return bool(running)
+
+    def run(label, fn, describe):
+        executor.submit(f"{label} {os.path.basename(image)}", lambda job: fn(),
+                        on_done=lambda result: log_message(log_widget, describe(result)),
+                        on_error=lambda e: log_message(log_widget, f"{label} failed: {e}"))
+
+    def show_info():
+        def describe(chain):
+            lines = [f"Backing chain for {image}:"]
+            for entry in chain:
+                lines.append(
+                    f"  {entry['filename']} ({entry.get('format')}): virtual "
+                    f"{format_bytes(entry.get('virtual-size', 0))}, on disk {format_bytes(entry.get('actual-size', 0))}"
+                )
+            return "\n".join(lines)
+        run("Info", lambda: qemu_images.info(image, backing_chain=True), describe)
+
+    def commit_image():
+        # vmms also refuses when the base is in use or backs other overlays
+        if not in_use() and messagebox.askyesno("Commit", "Merge this overlay's changes into its base image?"):
+            run("Commit", lambda: vmms.commit_image(image),
+                lambda result: f"Committed {image} into {result['backing_file']}")
+
+    def rebase_image():
+        if in_use():
+            return
+        new_base = filedialog.askopenfilename(title="Select New Base Image (cancel to flatten)")
+        run("Rebase", lambda: qemu_images.rebase(image, new_base or None),
+            lambda result: f"Rebased {image} onto {new_base or 'nothing (flattened)'}")
+
+    def convert_image():
+        destination = filedialog.asksaveasfilename(title="Convert To", defaultextension=".img")
+        if destination:
+            compress = messagebox.askyesno("Convert", "Compress the converted image?")
+            run("Convert", lambda: qemu_images.convert(image, destination, compress=compress),
+                lambda result: f"Converted {image} to {result}")
+
+    def compact_image():
+        if not in_use():
+            run("Compact", lambda: qemu_images.compact(image),
+                lambda saved: f"Compacted {image}, saved {format_bytes(saved)}")
+
+    for label, command in (("Info", show_info), ("Commit", commit_image), ("Rebase", rebase_image),
+                           ("Convert", convert_image), ("Compact", compact_image)):
+        ttk.Button(popup, text=label, command=command).pack(fill="x", padx=10, pady=3)
+
+def boot_dialog(log_widget):
+    ram = simpledialog.askinteger("RAM (MB)", "Enter RAM size in MB:")
+    cores = simpledialog.askinteger("CPU Cores", "Enter number of cores:")
+    imagefile = filedialog.askopenfilename(title="Select QEMU Image File")
+    isofile = filedialog.askopenfilename(title="Select ISO File (optional)")
+    if not ram or not cores or not imagefile:
+        log_message(log_widget, "Operation canceled: missing RAM, cores or image file.")
+        return
+    profile = simpledialog.askstring(
+        "Boot Profile", f"Boot profile ({', '.join(PROFILES)}):", initialvalue="desktop"
+    )
+    if not profile:
+        return
+    pinning = simpledialog.askstring("CPU Pinning", "Host CPUs to pin vCPUs to (e.g. 2-5), blank for none:") or ""
+    try:
+        cpu_pinning = parse_cpu_list(pinning)
+        get_profile(profile.strip(), cpu_pinning=cpu_pinning).validate()
+    except ValueError as e:
+        messagebox.showerror("Error", f"Invalid boot settings: {e}")
+        return
+
+    name = os.path.basename(imagefile)
+    log_message(log_widget, f"Booting {name}...")
+    # A running VM holds its thread until it exits, so it gets a dedicated one
+    executor.submit(f"VM {name}", lambda job: boot(ram, cores, imagefile, isofile, job=job,
+                                                   profile=profile.strip(), cpu_pinning=cpu_pinning),
+                    dedicated=True,
+                    on_done=lambda code: log_message(log_widget, f"VM {name} exited with code {code}"),
+                    on_error=lambda e: log_message(log_widget, f"Error booting {name}: {e}"))
+
+def show_vms_window(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("Virtual Machines")
+    popup.geometry("750x300")
+
+    columns = ("name", "pid", "status", "profile", "ram", "cores", "image")
+    tree = ttk.Treeview(popup, columns=columns, show="headings")
+    for column, width in zip(columns, (120, 70, 80, 110, 70, 60, 240)):
+        tree.heading(column, text=column.upper() if column in ("pid", "ram") else column.capitalize())
+        tree.column(column, width=width, anchor="w")
+    tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def show_vms(vms):
+        tree.delete(*tree.get_children())
+        for vm in vms:
+            tree.insert("", "end", iid=vm["name"], values=(
+                vm["name"], vm["pid"], vm["status"], vm.get("profile", {}).get("name", ""), vm.get("ram", ""), vm.get("cores", ""), vm.get("image") or "",
+            ))
+
+    def refresh():
+        executor.submit("List VMs", lambda job: get_supervisor().list(), on_done=show_vms,
+                        on_error=lambda e: log_message(log_widget, f"Error listing VMs: {e}"))
+
+    def run_action(label, action):
+        for name in tree.selection():
+            def on_done(result, name=name):
+                log_message(log_widget, f"{label} {name}: {result or 'ok'}")
+                refresh()
+
+            def on_error(e, name=name):
+                log_message(log_widget, f"{label} {name} failed: {e}")
+                messagebox.showerror("Error", f"{label} {name} failed: {e}")
+
+            executor.submit(f"{label} {name}", lambda job, name=name: action(name),
+                            on_done=on_done, on_error=on_error)
+
+    def reset_selected():
+        if tree.selection() and messagebox.askyesno(
+                "Reset", "Power off the selected VMs, discard their disk changes and boot them again?"):
+            run_action("Reset", lambda name: f"clean again in {vmms.reset_vm(name)['seconds']}s")
+
+    buttons_frame = ttk.Frame(popup)
+    buttons_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Button(buttons_frame, text="Pause", command=lambda: run_action("Pause", get_supervisor().pause)).pack(side="left", padx=5)
+    ttk.Button(buttons_frame, text="Resume", command=lambda: run_action("Resume", get_supervisor().resume)).pack(side="left", padx=5)
+    ttk.Button(buttons_frame, text="Shut Down", command=lambda: run_action("Shut down", get_supervisor().stop)).pack(side="left", padx=5)
+    ttk.Button(buttons_frame, text="Force Stop", command=lambda: run_action(
+        "Force stop", lambda name: get_supervisor().stop(name, force=True))).pack(side="left", padx=5)
+    ttk.Button(buttons_frame, text="Reset to Clean Disk", command=reset_selected).pack(side="left", padx=5)
+    ttk.Button(buttons_frame, text="Refresh", command=refresh).pack(side="left", padx=5)
+    refresh()
+
+def show_snapshots_window(root, log_widget):
+    popup = tk.Toplevel(root)
+    popup.title("QEMU Snapshots")
+    popup.geometry("900x450")
+
+    location_frame = ttk.Frame(popup)
+    location_frame.pack(fill="x", padx=10, pady=5)
+    location_var = tk.StringVar()
+    ttk.Label(location_frame, text="Folder (blank = images created here):").pack(side="left")
+    ttk.Entry(location_frame, textvariable=location_var, width=50).pack(side="left", padx=5)
+
+    def browse():
+        folder = filedialog.askdirectory(parent=popup, title="Select Image Folder")
+        if folder:
+            location_var.set(folder)
+            refresh()
+
+    ttk.Button(location_frame, text="Browse...", command=browse).pack(side="left")
+
+    # Images nest under their backing file; internal snapshots nest under their image
+    columns = ("kind", "size", "created", "vm")
+    tree = ttk.Treeview(popup, columns=columns, show="tree headings")
+    tree.heading("#0", text="Image / snapshot")
+    tree.column("#0", width=380, anchor="w")
+    for column, heading, width in zip(columns, ("Type", "Size", "Created", "VM"), (120, 100, 140, 120)):
+        tree.heading(column, text=heading)
+        tree.column(column, width=width, anchor="w")
+    tree.pack(fill="both", expand=True, padx=10, pady=5)
+    items = {}  # tree item -> (image path, snapshot name or None)
+
+    def show_tree(roots):
+        tree.delete(*tree.get_children())
+        items.clear()
+
+        def add(parent, node):
+            kind = "overlay" if node["backing"] else "base image"
+            item = tree.insert(parent, "end", text=os.path.basename(node["path"]), open=True, values=(
+                node["error"] and "error" or kind, format_bytes(node["actual-size"]), "", node.get("vm") or "",
+            ))
+            items[item] = (node["path"], None)
+            for snapshot in node["snapshots"]:
+                live = " + RAM" if snapshot.get("vm-state-size") else ""
+                created = format_time(snapshot["date-sec"]) if snapshot.get("date-sec") else ""
+                child = tree.insert(item, "end", text=snapshot["name"], values=(
+                    f"snapshot{live}", format_bytes(snapshot.get("vm-state-size", 0)) if live else "", created, "",
+                ))
+                items[child] = (node["path"], snapshot["name"])
+            for overlay in node["children"]:
+                add(item, overlay)
+
+        for root_node in roots:
+            add("", root_node)
+
+    def refresh():
+        location = location_var.get().strip() or None
+        executor.submit("List snapshots", lambda job: vmms.snapshot_tree(location=location), on_done=show_tree,
+                        on_error=lambda e: log_message(log_widget, f"Error listing snapshots: {e}"))
+
+    def selected():
+        selection = tree.selection()
+        return items.get(selection[0]) if selection else None
+
+    def run(label, fn, describe):
+        def on_error(e):
+            log_message(log_widget, f"{label} failed: {e}")
+            messagebox.showerror("Error", f"{label} failed: {e}")
+
+        executor.submit(label, lambda job: fn(),
+                        on_done=lambda result: (log_message(log_widget, describe(result)), refresh()),
+                        on_error=on_error)
+
+    def take_snapshot(external):
+        choice = selected()
+        if not choice:
+            return
+        name = simpledialog.askstring("Snapshot", "Snapshot name:", parent=popup)
+        if name:
+            image = choice[0]
+            run(f"Snapshot {os.path.basename(image)}", lambda: vmms.create_snapshot(image, name, external=external),
+                lambda result: f"Created {result['type']} snapshot {name} of {image}"
+                               + (f" (live, VM {result['vm']})" if result["vm"] else "")
+                               + (f"; the disk is now {result['active']}" if external else ""))
+
+    def restore():
+        choice = selected()
+        if not choice or not choice[1]:
+            messagebox.showinfo("Restore", "Select a snapshot to restore.")
+            return
+        image, name = choice
+        if messagebox.askyesno("Restore", f"Revert {os.path.basename(image)} to {name}? Later changes are lost."):
+            run(f"Restore {name}", lambda: vmms.restore_snapshot(image, name),
+                lambda result: f"Restored {image} to {name} with {result['method']} in {result['seconds']}s")
+
+    def delete():
+        choice = selected()
+        if choice and choice[1] and messagebox.askyesno("Delete", f"Delete snapshot {choice[1]}?"):
+            image, name = choice
+            run(f"Delete snapshot {name}", lambda: vmms.delete_snapshot(image, name),
+                lambda result: f"Deleted snapshot {name} of {image}")
+
+    def reset():
+        choice = selected()
+        if choice and not choice[1] and messagebox.askyesno(
+                "Reset", f"Discard everything written to {os.path.basename(choice[0])} since it was created?"):
+            image = choice[0]
+            run(f"Reset {os.path.basename(image)}", lambda: vmms.reset_image(image),
+                lambda result: f"Reset {image} onto {result['backing_file']} in {result['seconds']}s")
+
+    buttons_frame = ttk.Frame(popup)
+    buttons_frame.pack(fill="x", padx=10, pady=5)
+    for label, command in (("Take Snapshot", lambda: take_snapshot(False)),
+                           ("External Snapshot", lambda: take_snapshot(True)),
+                           ("Restore", restore), ("Delete Snapshot", delete), ("Reset Overlay", reset),
+                           ("Refresh", refresh)):
+        ttk.Button(buttons_frame, text=label, command=command).pack(side="left", padx=5)
+    refresh()
+
+def show_jobs_window(root):
+    popup = tk.Toplevel(root)
+    popup.title("Background Jobs")
+    popup.geometry("700x300")
+
+    columns = ("name", "status", "progress", "message")
+    tree = ttk.Treeview(popup, columns=columns, show="headings")
+    for column, width in zip(columns, (220, 80, 80, 300)):
+        tree.heading(column, text=column.capitalize())
+        tree.column(column, width=width, anchor="w")
+    tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def row_values(job):
+        progress = "" if job.progress is None else f"{job.progress:.0%}"
+        return (job.name, job.status, progress, job.message)
+
+    def update_job(job):
+        iid = str(job.id)
+        if tree.exists(iid):
+            tree.item(iid, values=row_values(job))
+        else:
+            tree.insert("", "end", iid=iid, values=row_values(job))
+
+    def cancel_selected():
+        selected = {int(iid) for iid in tree.selection()}
+        for job in executor.jobs:
+            if job.id in selected:
+                job.cancel()
+
+    def clear_finished():
+        executor.clear_finished()
+        remaining = {str(job.id) for job in executor.jobs}
+        for iid in tree.get_children():
+            if iid not in remaining:
+                tree.delete(iid)
+
+    def on_popup_close():
+        executor.remove_listener(update_job)
+        popup.destroy()
+
+    for job in executor.jobs:
+        update_job(job)
+    executor.add_listener(update_job)
+
+    buttons_frame = ttk.Frame(popup)
+    buttons_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Button(buttons_frame, text="Cancel Selected", command=cancel_selected).pack(side="left", padx=5)
+    ttk.Button(buttons_frame, text="Clear Finished", command=clear_finished).pack(side="left", padx=5)
+    ttk.Button(buttons_frame, text="Operation Metrics", command=lambda: show_metrics_window(root)).pack(side="left", padx=5)
+    popup.protocol("WM_DELETE_WINDOW", on_popup_close)
+
+def show_metrics_window(root):
+    popup = tk.Toplevel(root)
+    popup.title("Operation Metrics")
+    popup.geometry("820x400")
+
+    text = tk.Text(popup, wrap="none", font=("Courier", 9))
+    text.pack(fill="both", expand=True, padx=10, pady=10)
+
+    def refresh():
+        text.config(state="normal")
+        text.delete("1.0", tk.END)
+        text.insert(tk.END, format_snapshot(telemetry.snapshot()))
+        text.config(state="disabled")
+
+    ttk.Button(popup, text="Refresh", command=refresh).pack(pady=5)
+    refresh()
+
+def simple_input_popup(title, prompt):
+    popup = tk.Toplevel()
+    popup.title(title)
+    ttk.Label(popup, text=prompt).pack(pady=10)
+    entry = ttk.Entry(popup)
+    entry.pack(pady=10, padx=10)
+
+    def submit():
+        popup.result = entry.get().strip()
+        popup.destroy()
+
+    ttk.Button(popup, text="Submit", command=submit).pack(pady=10)
+    popup.mainloop()
+    return getattr(popup, 'result', None)
+
+# Main GUI
+def main():
+    
+    root = tk.Tk()
+    root.title("Cloud Management System")
+    root.geometry("600x750")
+
+    ttk.Label(root, text="Cloud Management System", font=("Times new roman", 16, "bold")).pack(pady=10)
+    ttk.Label(root, text="Manage your cloud system with ease.").pack(pady=5)
+
+    button_frame = ttk.Frame(root)
+    button_frame.pack(fill="x", padx=20, pady=10)
+
+    ttk.Label(root, text="Log Output:").pack(pady=5)
+    log_widget = tk.Text(root, wrap="word", width=70, height=15, state="disabled", bg="#f4f4f4")
+    log_widget.pack(padx=10, pady=10, fill="both", expand=True)
+    # Create the log pipeline on the Tk thread before any job can write to it
+    get_log_pipeline(log_widget, max_lines=5000)
+
+    # Grouped into two columns; a single column of buttons no longer fits the window
+    sections = (
+        ("Docker Images", (
+            ("Create Dockerfile", lambda: create_dockerfile(log_widget)),
+            ("Build Docker Image", lambda: build_docker_image(log_widget)),
+            ("Build Queue", lambda: show_build_queue_window(root, log_widget)),
+            ("List Docker Images", lambda: list_docker_images(log_widget)),
+            ("Search Local Image", lambda: search_local_image(log_widget)),
+            ("Search DockerHub Image", lambda: search_dockerhub_image(root, log_widget)),
+            ("Pull Docker Image", lambda: pull_docker_image(log_widget)),
+            ("Bulk Pull from Manifest", lambda: bulk_pull_docker_images(log_widget)),
+        )),
+        ("Containers", (
+            ("Start a container", lambda: start_container(simpledialog.askstring("Image Name", "Enter image name:"),
+                                                          simpledialog.askstring("Container name", "Enter container name: "))),
+            ("Launch Containers", lambda: show_launch_window(root, log_widget)),
+            ("List Running Containers", lambda: list_running_containers(log_widget)),
+            ("Resource Dashboard", lambda: show_stats_dashboard(root, log_widget)),
+            ("Batch Container Actions", lambda: show_batch_containers_window(root, log_widget)),
+            ("Stop a Container", lambda: stop_container(log_widget)),
+            ("Container Logs", lambda: show_container_logs_window(root, log_widget)),
+        )),
+        ("QEMU", (
+            ("Create QEMU Image", lambda: create_image_dialog(log_widget)),
+            ("Clone QEMU Image", lambda: clone_image_dialog(log_widget)),
+            ("Manage QEMU Image", lambda: manage_image_dialog(root, log_widget)),
+            ("Boot QEMU Image", lambda: boot_dialog(log_widget)),
+            ("Virtual Machines", lambda: show_vms_window(root, log_widget)),
+            ("Snapshots", lambda: show_snapshots_window(root, log_widget)),
+        )),
+        ("Housekeeping", (
+            ("Reclaim Disk Space", lambda: show_reclaim_window(root, log_widget)),
+            ("Created Artifacts", lambda: show_artifacts_window(root, log_widget)),
+            ("Background Jobs", lambda: show_jobs_window(root)),
+        )),
+    )
+    for index, (heading, buttons) in enumerate(sections):
+        section = ttk.LabelFrame(button_frame, text=heading)
+        section.grid(row=index // 2, column=index % 2, sticky="nsew", padx=5, pady=5)
+        for text, command in buttons:
+            ttk.Button(section, text=text, command=command).pack(fill="x", padx=5, pady=2)
+    button_frame.columnconfigure((0, 1), weight=1)
+
+    # Aggregate progress of the running jobs
+    progress_frame = ttk.Frame(root)
+    progress_frame.pack(fill="x", padx=10, pady=5)
+    progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=1.0)
+    progress_bar.pack(fill="x")
+    progress_label = ttk.Label(progress_frame, text="Idle")
+    progress_label.pack(anchor="w")
+
+    def update_progress(job):
+        active = executor.active_jobs()
+        measured = [j.progress for j in active if j.progress is not None]
+        progress_bar["value"] = sum(measured) / len(measured) if measured else 0
+        if not active:
+            progress_label.config(text="Idle")
+        elif job in active and job.message:
+            progress_label.config(text=f"{job.name}: {job.message}")
+        else:
+            progress_label.config(text=f"{len(active)} job(s) running")
+
+    executor.add_listener(update_progress)
+    executor.attach(root)
+
+    def report_startup():
+        elapsed = time.perf_counter() - _startup_started
+        log_message(log_widget, f"Started in {elapsed * 1000:.0f} ms")
+        if elapsed > STARTUP_BUDGET:
+            log_message(log_widget, f"Warning: startup exceeded the {STARTUP_BUDGET:.1f}s budget")
+    root.after_idle(report_startup)
+    try:
+        server = start_metrics_server()
+        if server:
+            log_message(log_widget, f"Serving metrics on http://127.0.0.1:{server.server_address[1]}/metrics")
+    except OSError as e:
+        log_message(log_widget, f"Could not start the metrics endpoint: {e}")
+    # Warm the image/container cache in the background; the window works without Docker
+    executor.submit("Load Docker inventory", lambda job: get_inventory(),
+                    on_error=lambda e: log_message(log_widget, f"Docker is not available: {e}"))
+
+    reattached = get_supervisor().vms
+    if reattached:
+        log_message(log_widget, f"Reattached to {len(reattached)} running VM(s): {', '.join(reattached)}")
+    root.protocol("WM_DELETE_WINDOW",  lambda:on_close(root, log_widget))
+    root.mainloop()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,431 @@
+"""
+A stand-in Docker Engine API server for benchmarks.
+
+Serves synthetic images and containers at any scale over plain HTTP, so the
+docker SDK can talk to it with DOCKER_HOST=tcp://127.0.0.1:<port>. Container
+start/stop/create and image pulls update the state and are broadcast on
+/events like the real daemon. Only the endpoints this tool uses are served.
+"""
+import hashlib
+import json
+import queue
+import re
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+API_VERSION = "1.43"
+VERSION_PREFIX = re.compile(r"^/v\d+\.\d+")
+
+
+def _digest(text):
+    return "sha256:" + hashlib.sha256(text.encode()).hexdigest()
+
+
+class EngineState:
+    def __init__(self, images=10, containers=10, pull_layers=3, layer_size=1024 * 1024,
+                 log_lines=1000, log_interval=0.01):
+        self.lock = threading.Lock()
+        self.pull_layers = pull_layers
+        self.layer_size = layer_size
+        self.log_lines = log_lines  # history every container has, one line per second up to now
+        self.log_interval = log_interval  # seconds between lines when following
+        self.subscribers = []
+        self.history = deque(maxlen=256)  # recent events, replayed to subscribers that pass since
+        self.events_lock = threading.Lock()
+        now = int(time.time())
+        self.images = {}
+        for index in range(images):
+            image_id = _digest(f"image-{index}")
+            self.images[image_id] = {
+                "Id": image_id,
+                "RepoTags": [f"bench/app{index}:1.{index % 10}"] if index % 20 else None,
+                "RepoDigests": [],
+                "Created": now - index * 60,
+                "Size": 5_000_000 + index * 1000,
+                "SharedSize": -1,
+                "Labels": {"bench": "true"},
+                "Containers": -1,
+            }
+        image_ids = list(self.images) or [_digest("image-0")]
+        self.containers = {}
+        for index in range(containers):
+            container_id = hashlib.sha256(f"container-{index}".encode()).hexdigest()
+            running = index % 3 != 0
+            self.containers[container_id] = self._container(
+                container_id, f"bench-{index}", image_ids[index % len(image_ids)], running, now - index
+            )
+
+    @staticmethod
+    def _container(container_id, name, image, running, created):
+        return {
+            "Id": container_id,
+            "Names": [f"/{name}"],
+            "Image": image,
+            "ImageID": image,
+            "Command": "sleep infinity",
+            "Created": created,
+            "State": "running" if running else "exited",
+            "Status": "Up 5 minutes" if running else "Exited (0) 5 minutes ago",
+            "Labels": {"bench": "true", "group": f"g{int(created) % 5}"},
+        }
+
+    def find_container(self, ref):
+        if ref in self.containers:
+            return self.containers[ref]
+        for container in self.containers.values():
+            if container["Names"][0] == f"/{ref}" or container["Id"].startswith(ref):
+                return container
+        return None
+
+    def find_image(self, ref):
+        if ref in self.images:
+            return self.images[ref]
+        wanted = ref if ":" in ref.rsplit("/", 1)[-1] else f"{ref}:latest"
+        for image in self.images.values():
+            if (wanted in (image["RepoTags"] or []) or ref in (image["RepoDigests"] or [])
+                    or image["Id"].startswith(f"sha256:{ref}")):
+                return image
+        return None
+
+    def publish(self, event_type, action, actor_id, attributes=None):
+        event = {
+            "Type": event_type, "Action": action, "status": action, "id": actor_id,
+            "Actor": {"ID": actor_id, "Attributes": attributes or {}},
+            "time": int(time.time()), "timeNano": time.time_ns(),
+        }
+        with self.events_lock:
+            self.history.append(event)
+            for subscriber in self.subscribers:
+                subscriber.put(event)
+
+
+class EngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None  # set on the server-specific subclass
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without this, Nagle plus
+        # delayed ACKs add ~40ms to every small response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    # Response helpers
+
+    def _json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Api-Version", API_VERSION)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _empty(self, status=204):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _error(self, message, status=404):
+        self._json({"message": message}, status)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data):
+        payload = (json.dumps(data) + "\r\n").encode()
+        self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _route(self):
+        url = urlparse(self.path)
+        path = VERSION_PREFIX.sub("", unquote(url.path))
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        return path, query, body
+
+    # Endpoints
+
+    def do_HEAD(self):
+        self._empty(200)
+
+    def do_GET(self):
+        path, query, _ = self._route()
+        state = self.state
+        if path == "/_ping":
+            body = b"OK"
+            self.send_response(200)
+            self.send_header("Api-Version", API_VERSION)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == "/version":
+            self._json({"Version": "24.0.0-fake", "ApiVersion": API_VERSION, "MinAPIVersion": "1.24",
+                        "Os": "linux", "Arch": "amd64"})
+        elif path == "/images/json":
+            with state.lock:
+                self._json(list(state.images.values()))
+        elif path == "/containers/json":
+            self._list_containers(query)
+        elif path == "/events":
+            self._events(query)
+        elif path == "/system/df":
+            with state.lock:
+                self._json({"Images": list(state.images.values()), "Containers": list(state.containers.values()),
+                            "Volumes": [], "BuildCache": []})
+        elif path.startswith("/containers/") and path.endswith("/logs"):
+            self._logs(path[len("/containers/"):-len("/logs")], query)
+        elif path.startswith("/containers/") and path.endswith("/json"):
+            with state.lock:
+                container = state.find_container(path[len("/containers/"):-len("/json")])
+                if container is None:
+                    return self._error("No such container")
+                self._json({**container, "Name": container["Names"][0],
+                            "State": {"Status": container["State"], "Running": container["State"] == "running"},
+                            "Config": {"Image": container["Image"], "Labels": container["Labels"], "Tty": False}})
+        elif path.startswith("/images/") and path.endswith("/json"):
+            with state.lock:
+                image = state.find_image(path[len("/images/"):-len("/json")])
+                if image is None:
+                    return self._error("No such image")
+                self._json(image)
+        else:
+            self._error(f"Not implemented: GET {path}")
+
+    def do_POST(self):
+        path, query, body = self._route()
+        state = self.state
+        if path == "/images/create":
+            return self._pull(query)
+        if path == "/containers/create":
+            with state.lock:
+                image = state.find_image(body.get("Image", ""))
+                if image is None:
+                    return self._error(f"No such image: {body.get('Image')}")
+                container_id = hashlib.sha256(f"{time.time_ns()}-{query.get('name')}".encode()).hexdigest()
+                name = query.get("name") or f"bench-new-{container_id[:8]}"
+                state.containers[container_id] = state._container(
+                    container_id, name, image["Id"], False, int(time.time())
+                )
+            state.publish("container", "create", container_id, {"name": name})
+            return self._json({"Id": container_id, "Warnings": []}, 201)
+
+        match = re.match(r"^/containers/([^/]+)/(start|stop|restart|kill)$", path)
+        if match:
+            with state.lock:
+                container = state.find_container(match.group(1))
+                if container is None:
+                    return self._error("No such container")
+                running = match.group(2) in ("start", "restart")
+                container["State"] = "running" if running else "exited"
+                container["Status"] = "Up 1 second" if running else "Exited (0) 1 second ago"
+            state.publish("container", match.group(2), container["Id"], {"name": container["Names"][0][1:]})
+            return self._empty()
+        self._error(f"Not implemented: POST {path}")
+
+    def do_DELETE(self):
+        path, _, _ = self._route()
+        state = self.state
+        match = re.match(r"^/containers/([^/]+)$", path)
+        if match:
+            with state.lock:
+                container = state.find_container(match.group(1))
+                if container is None:
+                    return self._error("No such container")
+                del state.containers[container["Id"]]
+            state.publish("container", "destroy", container["Id"], {"name": container["Names"][0][1:]})
+            return self._empty()
+        self._error(f"Not implemented: DELETE {path}")
+
+    def _list_containers(self, query):
+        filters = json.loads(query.get("filters") or "{}")
+        with self.state.lock:
+            rows = list(self.state.containers.values())
+        if query.get("all") not in ("1", "true", "True"):
+            rows = [row for row in rows if row["State"] == "running"]
+        if "id" in filters:
+            ids = filters["id"] if isinstance(filters["id"], list) else list(filters["id"])
+            rows = [row for row in rows if any(row["Id"].startswith(i) for i in ids)]
+        if "status" in filters:
+            statuses = filters["status"] if isinstance(filters["status"], list) else list(filters["status"])
+            rows = [row for row in rows if row["State"] in statuses]
+        if "label" in filters:
+            labels = filters["label"] if isinstance(filters["label"], list) else list(filters["label"])
+            for label in labels:
+                key, _, value = label.partition("=")
+                rows = [row for row in rows if key in row["Labels"] and (not value or row["Labels"][key] == value)]
+        self._json(rows)
+
+    def _pull(self, query):
+        state = self.state
+        repository, tag = query.get("fromImage", ""), query.get("tag") or "latest"
+        pinned = tag.startswith("sha256:")
+        reference = f"{repository}@{tag}" if pinned else f"{repository}:{tag}"
+        self._start_stream()
+        self._chunk({"status": f"Pulling from {repository}", "id": tag})
+        step = max(state.layer_size // 4, 1)
+        for layer in range(state.pull_layers):
+            layer_id = f"{layer:012x}"
+            self._chunk({"status": "Pulling fs layer", "id": layer_id, "progressDetail": {}})
+            for current in range(step, state.layer_size + 1, step):
+                self._chunk({"status": "Downloading", "id": layer_id,
+                             "progressDetail": {"current": current, "total": state.layer_size}})
+            self._chunk({"status": "Pull complete", "id": layer_id, "progressDetail": {}})
+        image_id = _digest(reference)
+        digest = tag if pinned else _digest(reference + "d")
+        with state.lock:
+            state.images[image_id] = {
+                "Id": image_id, "RepoTags": [] if pinned else [reference], "RepoDigests": [f"{repository}@{digest}"],
+                "Created": int(time.time()), "Size": state.pull_layers * state.layer_size, "SharedSize": -1,
+                "Labels": {}, "Containers": -1,
+            }
+        self._chunk({"status": f"Digest: {digest}"})
+        self._chunk({"status": f"Status: Downloaded newer image for {reference}"})
+        self._end_stream()
+        state.publish("image", "pull", reference, {"name": reference})
+
+    def _logs(self, ref, query):
+        with self.state.lock:
+            container = self.state.find_container(ref)
+        if container is None:
+            return self._error("No such container")
+        name = container["Names"][0].lstrip("/")
+        timestamps = query.get("timestamps") in ("1", "true", "True")
+
+        def frame(number, when):
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(when)) + f".{int(when % 1 * 1e9):09d}Z "
+            payload = f"{stamp if timestamps else ''}{name} request {number} handled in {number % 97}ms\n".encode()
+            # Multiplexed stream: stream type 1 (stdout), three zero bytes, payload length
+            return struct.pack(">BxxxL", 1, len(payload)) + payload
+
+        headers_sent = []
+
+        def send_headers():
+            # Like dockerd, the headers go out with the first log output, not before
+            if not headers_sent:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/vnd.docker.multiplexed-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                headers_sent.append(True)
+
+        def write(data):
+            send_headers()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        now = time.time()
+        history = range(self.state.log_lines)
+        tail = query.get("tail", "all")
+        if tail != "all":
+            history = history[max(0, len(history) - int(tail)):]
+        since = float(query.get("since", 0) or 0)
+        until = float(query.get("until", 0) or 0)
+        try:
+            batch = []
+            for number in history:
+                when = now - (self.state.log_lines - number)
+                if when >= since and (not until or when <= until):
+                    batch.append(frame(number, when))
+                if len(batch) == 256:
+                    write(b"".join(batch))
+                    batch = []
+            if batch:
+                write(b"".join(batch))
+            number = self.state.log_lines
+            while query.get("follow") in ("1", "true", "True") and not self.server.stopping.is_set():
+                time.sleep(self.state.log_interval)
+                write(frame(number, time.time()))
+                number += 1
+            send_headers()
+            self._end_stream()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _events(self, query):
+        subscriber = queue.Queue()
+        since = query.get("since")
+        with self.state.events_lock:
+            if since:
+                for event in self.state.history:
+                    if event["time"] >= float(since):
+                        subscriber.put(event)
+            self.state.subscribers.append(subscriber)
+        self._start_stream()
+        try:
+            while not self.server.stopping.is_set():
+                try:
+                    event = subscriber.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                self._chunk(event)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self.state.events_lock:
+                self.state.subscribers.remove(subscriber)
+
+
+class FakeEngine:
+    """Run the fake daemon on a background thread: with FakeEngine(images=1000) as engine: engine.url"""
+
+    def __init__(self, images=10, containers=10, host="127.0.0.1", port=0, **state_options):
+        self.state = EngineState(images=images, containers=containers, **state_options)
+        handler = type("Handler", (EngineHandler,), {"state": self.state})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.server.stopping = threading.Event()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"tcp://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a fake Docker Engine API")
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--containers", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=2375)
+    args = parser.parse_args()
+    engine = FakeEngine(images=args.images, containers=args.containers, port=args.port).start()
+    print(f"export DOCKER_HOST={engine.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        engine.stop()
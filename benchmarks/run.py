@@ -0,0 +1,191 @@
+"""
+Benchmark the tool's Docker and QEMU operations against a fake daemon and stub
+QEMU binaries, at several inventory sizes.
+
+    python benchmarks/run.py                         # scales 10, 1000, 10000
+    python benchmarks/run.py --scales 10,1000 --repeat 50
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+
+Results are written to benchmarks/results/<timestamp>.json. With --compare, the
+median latency of each operation is checked against an earlier results file.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+# Keep the run's state out of the user's ~/.vmms; must be set before vmms is imported
+WORK_DIR = tempfile.mkdtemp(prefix="vmms-bench-")
+os.environ["VMMS_STATE_DB"] = os.path.join(WORK_DIR, "state.db")
+os.environ["PATH"] = os.path.join(BENCH_DIR, "stubs") + os.pathsep + os.environ.get("PATH", "")
+
+import vmms  # noqa: E402
+from docker_connection import DockerConnection  # noqa: E402
+from fake_engine import FakeEngine  # noqa: E402
+from vm_supervisor import VMSupervisor  # noqa: E402
+
+
+DEFAULT_SCALES = (10, 1000, 10000)
+
+
+def summarize(latencies, wall_seconds):
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "min_ms": ordered[0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_sec": len(ordered) / wall_seconds if wall_seconds else 0.0,
+    }
+
+
+def measure(fn, repeat, warmup=1):
+    """Call fn(i) repeat times after warmup calls; returns the latency summary."""
+    for index in range(warmup):
+        fn(-1 - index)
+    latencies = []
+    started = time.perf_counter()
+    for index in range(repeat):
+        call_started = time.perf_counter()
+        fn(index)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def connect_to(engine):
+    """Point vmms at engine with a fresh connection and no cached inventory."""
+    vmms.shutdown()
+    vmms._inventory = None
+    os.environ["DOCKER_HOST"] = engine.url
+    vmms.connection = DockerConnection(retries=1)
+
+
+def run_scale(scale, repeat):
+    results = {}
+    with FakeEngine(images=scale, containers=scale) as engine:
+        connect_to(engine)
+        names = [f"bench-{(index * 7919) % scale}" for index in range(max(repeat, 1) + 2)]
+
+        results["list_docker_images"] = measure(lambda i: vmms.list_docker_images(), repeat)
+        results["search_docker_container"] = measure(
+            lambda i: vmms.search_docker_containers(names[i]), repeat
+        )
+
+        inventory = vmms.get_inventory()
+        inventory.loaded.wait(120)
+        results["list_docker_images[inventory]"] = measure(lambda i: vmms.list_docker_images(), repeat)
+        results["search_docker_container[inventory]"] = measure(
+            lambda i: vmms.search_docker_containers(names[i]), repeat
+        )
+        vmms.shutdown()
+        vmms._inventory = None
+
+        results["container_logs"] = measure(lambda i: vmms.container_logs(names[i], tail=100), repeat)
+        results["pull_docker_image"] = measure(
+            lambda i: vmms.pull_docker_image(f"bench/pulled{i + 10}:{scale}"), repeat
+        )
+        image = "bench/app1:1.1"
+        results["start_container"] = measure(
+            lambda i: vmms.start_container(image, f"bench-run-{scale}-{i + 10}"), repeat
+        )
+        results["stop_container"] = measure(
+            lambda i: vmms.stop_container(f"bench-run-{scale}-{i + 10}", timeout=0), repeat
+        )
+
+    image_dir = os.path.join(WORK_DIR, f"images-{scale}")
+    results["create_image"] = measure(
+        lambda i: vmms.create_image(f"disk{i + 10}", 1024, image_dir), repeat
+    )
+    base = vmms.create_image("base", 1024, image_dir)
+
+    def boot_and_stop(i):
+        vm = vmms.boot(512, 1, base, name=f"bench-vm-{i + 10}", profile="headless")
+        vmms.stop_vm(vm["name"], timeout=5)
+
+    results["boot_vm+stop_vm"] = measure(boot_and_stop, max(1, repeat // 5))
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Lines comparing p50 latency per scale and operation; returns (lines, regressions)."""
+    lines, regressions = [], 0
+    for scale, operations in current["results"].items():
+        for name, stats in operations.items():
+            before = baseline.get("results", {}).get(scale, {}).get(name)
+            if not before or not before["p50_ms"]:
+                continue
+            change = (stats["p50_ms"] - before["p50_ms"]) / before["p50_ms"]
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            lines.append(f"{scale:>6} {name:<38} {before['p50_ms']:>9.2f} -> {stats['p50_ms']:>9.2f} ms "
+                         f"({change:+.0%}){flag}")
+    return lines, regressions
+
+
+def format_results(results):
+    lines = [f"{'SCALE':>6} {'OPERATION':<38} {'P50 ms':>9} {'P95 ms':>9} {'OPS/S':>9}"]
+    for scale, operations in results.items():
+        for name, stats in operations.items():
+            lines.append(f"{scale:>6} {name:<38} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                         f"{stats['ops_per_sec']:>9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=",".join(str(scale) for scale in DEFAULT_SCALES),
+                        help="Comma-separated number of images and containers the fake daemon serves")
+    parser.add_argument("--repeat", type=int, default=20, help="Measured calls per operation")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results"), help="Directory for results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    vmms._supervisor = VMSupervisor(state_dir=os.path.join(WORK_DIR, "vms"))
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+    results = {}
+    for scale in scales:
+        print(f"Benchmarking at {scale} images/containers...", file=sys.stderr)
+        results[str(scale)] = run_scale(scale, args.repeat)
+    vmms.shutdown()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(format_results(results))
+    print(f"Saved {path}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(report, baseline, args.threshold)
+        print(f"\nCompared with {args.compare}:")
+        print("\n".join(lines))
+        if regressions:
+            print(f"{regressions} operation(s) slowed down by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from bulk_pull import normalize_reference
+
+
+ARG_PATTERN = re.compile(r"^ARG\s+(\w+)(?:=(\S*))?", re.IGNORECASE)
+FROM_PATTERN = re.compile(r"^FROM\s+(?:--platform=\S+\s+)?(\S+)(?:\s+AS\s+(\S+))?", re.IGNORECASE)
+VARIABLE_PATTERN = re.compile(r"\$\{?(\w+)\}?")
+
+
+@dataclass
+class BuildTarget:
+    dockerfile: str
+    tag: str
+    context_dir: str = ""
+
+    def __post_init__(self):
+        self.dockerfile = os.path.abspath(self.dockerfile)
+        self.context_dir = self.context_dir or os.path.dirname(self.dockerfile)
+
+
+def base_images(content):
+    """
+    Return the external images a Dockerfile builds FROM, in order.
+
+    Global ARG defaults are substituted; earlier stages referenced by name and
+    'scratch' are not images and are left out.
+    """
+    args, stages, images = {}, set(), []
+    for line in content.splitlines():
+        line = line.strip()
+        match = ARG_PATTERN.match(line)
+        if match and not stages:
+            args[match.group(1)] = match.group(2) or ""
+            continue
+        match = FROM_PATTERN.match(line)
+        if not match:
+            continue
+        image = VARIABLE_PATTERN.sub(lambda m: args.get(m.group(1), m.group(0)), match.group(1))
+        if image.lower() != "scratch" and image not in stages and image not in images:
+            images.append(image)
+        if match.group(2):
+            stages.add(match.group(2))
+    return images
+
+
+def dependency_graph(targets):
+    """Map each target tag to the tags of other targets it builds FROM."""
+    by_reference = {normalize_reference(target.tag): target.tag for target in targets}
+    if len(by_reference) != len(targets):
+        raise ValueError("Two build targets have the same tag")
+    graph = {}
+    for target in targets:
+        with open(target.dockerfile, "r") as f:
+            bases = base_images(f.read())
+        graph[target.tag] = {
+            by_reference[normalize_reference(base)] for base in bases
+            if normalize_reference(base) in by_reference
+        } - {target.tag}
+    return graph
+
+
+def build_order(graph):
+    """Topological order of the graph's tags; raises ValueError on a cycle."""
+    remaining = {tag: set(deps) for tag, deps in graph.items()}
+    order = []
+    while remaining:
+        ready = sorted(tag for tag, deps in remaining.items() if not deps)
+        if not ready:
+            raise ValueError(f"Dockerfiles depend on each other in a cycle: {', '.join(sorted(remaining))}")
+        for tag in ready:
+            order.append(tag)
+            del remaining[tag]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+def run_queue(build, targets, concurrency=2, on_result=None, job=None):
+    """
+    Build every target with build(target), at most `concurrency` at a time.
+
+    A target starts as soon as all targets it builds FROM have finished, so
+    independent images build in parallel and dependent ones wait. When a build
+    fails, everything that depends on it is skipped. Returns one result dict per
+    target in completion order.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, not {concurrency}")
+    graph = dependency_graph(targets)
+    build_order(graph)  # reject cycles before starting anything
+    by_tag = {target.tag: target for target in targets}
+    waiting = {tag: set(deps) for tag, deps in graph.items()}
+    results = []
+
+    def finish(result):
+        results.append(result)
+        if on_result:
+            on_result(result)
+        if job:
+            job.set_progress(len(results) / len(targets), f"{len(results)}/{len(targets)} images")
+
+    def run_one(target):
+        started = time.monotonic()
+        result = {"tag": target.tag, "dockerfile": target.dockerfile, "depends_on": sorted(graph[target.tag]),
+                  "status": "built", "id": None, "seconds": 0.0, "error": None}
+        try:
+            result["id"] = build(target)
+        except Exception as e:
+            result["status"], result["error"] = "failed", str(e)
+        result["seconds"] = time.monotonic() - started
+        return result
+
+    def skip_dependents(tag):
+        for other, deps in list(waiting.items()):
+            if tag in deps and other in waiting:
+                del waiting[other]
+                finish({"tag": other, "dockerfile": by_tag[other].dockerfile, "depends_on": sorted(graph[other]),
+                        "status": "skipped", "id": None, "seconds": 0.0, "error": f"{tag} did not build"})
+                skip_dependents(other)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(targets)))) as pool:
+        running = {}
+        while waiting or running:
+            for tag in sorted(tag for tag, deps in waiting.items() if not deps):
+                if len(running) >= concurrency:
+                    break
+                del waiting[tag]
+                running[pool.submit(run_one, by_tag[tag])] = tag
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                tag = running.pop(future)
+                result = future.result()
+                finish(result)
+                if result["status"] == "failed":
+                    skip_dependents(tag)
+                else:
+                    for deps in waiting.values():
+                        deps.discard(tag)
+            if job and job.cancelled:
+                # Builds in flight stop through the same job; nothing new starts
+                for tag in list(waiting):
+                    del waiting[tag]
+                    finish({"tag": tag, "dockerfile": by_tag[tag].dockerfile, "depends_on": sorted(graph[tag]),
+                            "status": "skipped", "id": None, "seconds": 0.0, "error": "cancelled"})
+    return results
+
+
+def format_summary(results, wall_seconds):
+    lines = [f"{'IMAGE':<40} {'STATUS':<8} {'TIME':>8}  DEPENDS ON"]
+    for result in results:
+        lines.append(
+            f"{result['tag']:<40} {result['status']:<8} {result['seconds']:>7.1f}s  "
+            f"{', '.join(result['depends_on']) or '-'}"
+        )
+        if result["error"]:
+            lines.append(f"    error: {result['error']}")
+    serial_seconds = sum(result["seconds"] for result in results)
+    built = sum(1 for result in results if result["status"] == "built")
+    footer = f"Built {built} of {len(results)} images in {wall_seconds:.1f}s (serial build time {serial_seconds:.1f}s"
+    if wall_seconds > 0 and serial_seconds > 0:
+        footer += f", {serial_seconds / wall_seconds:.1f}x"
+    lines.append(footer + ")")
+    return "\n".join(lines)
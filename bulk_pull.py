@@ -0,0 +1,153 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from docker_stream import format_bytes, pull_image
+
+
+def parse_manifest(path):
+    """
+    Read image references from a manifest file.
+
+    Plain text files list one reference per line ('#' starts a comment). YAML files
+    may be a list of references or a mapping with an 'images' list.
+    """
+    with open(path, "r") as f:
+        content = f.read()
+
+    if os.path.splitext(path)[1].lower() in (".yml", ".yaml"):
+        try:
+            import yaml
+        except ImportError:
+            yaml = None
+        if yaml is not None:
+            data = yaml.safe_load(content) or []
+            if isinstance(data, dict):
+                data = data.get("images", [])
+            return [str(ref).strip() for ref in data if str(ref).strip()]
+        # Without PyYAML, accept the simple "- image" list form
+        content = "\n".join(
+            line.strip()[1:] for line in content.splitlines() if line.strip().startswith("-")
+        )
+
+    refs = []
+    for line in content.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            refs.append(line)
+    return refs
+
+
+def normalize_reference(ref):
+    """Add the implicit ':latest' tag so 'ubuntu' and 'ubuntu:latest' dedupe together."""
+    from docker.utils import parse_repository_tag
+
+    if "@" in ref:
+        return ref
+    repository, tag = parse_repository_tag(ref)
+    return f"{repository}:{tag or 'latest'}"
+
+
+def dedupe_references(refs):
+    seen = set()
+    unique = []
+    for ref in refs:
+        ref = normalize_reference(ref)
+        if ref not in seen:
+            seen.add(ref)
+            unique.append(ref)
+    return unique
+
+
+def local_digest_matches(client, ref):
+    """True if the local image for ref has the same digest as the registry."""
+    from docker.errors import ImageNotFound
+
+    try:
+        local = client.images.get(ref)
+    except ImageNotFound:
+        return False
+    registry_digest = client.images.get_registry_data(ref).id
+    return any(digest.endswith("@" + registry_digest) for digest in local.attrs.get("RepoDigests", []))
+
+
+class _PullCancel:
+    """Lets a single pull inside a bulk job see the bulk job's cancel flag."""
+
+    def __init__(self, job):
+        self._job = job
+
+    def check_cancelled(self):
+        if self._job:
+            self._job.check_cancelled()
+
+    def set_progress(self, progress=None, message=None):
+        pass
+
+
+def _pull_one(client, ref, job, on_line):
+    import requests
+    from docker.errors import DockerException
+
+    started = time.monotonic()
+    result = {"ref": ref, "status": "pulled", "seconds": 0.0, "size": 0, "error": None}
+    try:
+        if job:
+            job.check_cancelled()
+        if local_digest_matches(client, ref):
+            result["status"] = "skipped"
+            result["size"] = client.images.get(ref).attrs.get("Size", 0)
+        else:
+            image = pull_image(client, ref, job=_PullCancel(job))
+            result["size"] = image.attrs.get("Size", 0)
+    except (DockerException, requests.exceptions.RequestException, ValueError) as e:
+        # A dropped connection or a malformed reference fails this image, not the whole pull
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["seconds"] = time.monotonic() - started
+    if on_line:
+        on_line(f"{ref}: {result['status']} in {result['seconds']:.1f}s")
+    return result
+
+
+def bulk_pull(client, refs, concurrency=4, on_line=None, job=None):
+    """
+    Pull many images with at most `concurrency` pulls in flight.
+
+    Images whose local digest already matches the registry are skipped.
+    Returns one result dict per unique reference, in manifest order.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, not {concurrency}")
+    refs = dedupe_references(refs)
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(_pull_one, client, ref, job, on_line): ref for ref in refs}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if job:
+                job.set_progress(len(results) / len(refs), f"{len(results)}/{len(refs)} images")
+    if job:
+        job.check_cancelled()
+    return [results[ref] for ref in refs]
+
+
+def format_summary(results, wall_seconds=None):
+    lines = [f"{'IMAGE':<45} {'STATUS':<8} {'TIME':>8} {'SIZE':>10}"]
+    for result in results:
+        lines.append(
+            f"{result['ref']:<45} {result['status']:<8} {result['seconds']:>7.1f}s "
+            f"{format_bytes(result['size']):>10}"
+        )
+        if result["error"]:
+            lines.append(f"    error: {result['error']}")
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    totals = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    total_size = sum(result["size"] for result in results if result["status"] == "pulled")
+    footer = f"Total: {len(results)} images ({totals}), {format_bytes(total_size)} pulled"
+    if wall_seconds is not None:
+        footer += f" in {wall_seconds:.1f}s"
+    lines.append(footer)
+    return "\n".join(lines)
@@ -0,0 +1,377 @@
+"""
+Command line interface for the VM Management System.
+
+Every command prints JSON on stdout. Errors print {"error": ...} and exit with 1.
+
+    python cli.py images list
+    python cli.py images pull ubuntu:22.04 nginx:1.25
+    python cli.py containers start nginx --name web
+    python cli.py containers logs web worker --follow --grep error
+    python cli.py qemu create disk1 10240 ./images --preallocation metadata
+    python cli.py batch operations.jsonl
+    python cli.py --metrics batch operations.jsonl
+"""
+import time
+_startup_started = time.perf_counter()
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+
+import vmms
+from container_logs import parse_time
+from telemetry import format_snapshot
+
+# Time allowed from process start until the command starts running
+STARTUP_BUDGET = float(os.environ.get("VMMS_STARTUP_BUDGET", "1.0"))
+
+
+def _print(result):
+    print(json.dumps(result, indent=2, default=str))
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def run_batch(path):
+    """
+    Run one operation per JSON line: {"op": "pull_docker_image", "args": {...}}.
+    Prints one JSON result line per operation and keeps going after failures.
+    """
+    failures = 0
+    source = sys.stdin if path == "-" else open(path, "r")
+    with source:
+        for line_number, line in enumerate(source, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            result = {"line": line_number}
+            try:
+                request = json.loads(line)
+                result["op"] = request["op"]
+                operation = vmms.OPERATIONS[request["op"]]
+            except KeyError as e:
+                result["error"] = f"Unknown operation or missing field: {e}"
+            except (ValueError, TypeError) as e:
+                result["error"] = f"Invalid request: {e}"
+            else:
+                # Errors from the operation itself, KeyErrors included, keep their own message
+                try:
+                    result["result"] = operation(**request.get("args", {}))
+                except Exception as e:
+                    result["error"] = str(e.args[0]) if isinstance(e, KeyError) and e.args else str(e)
+            if "error" in result:
+                failures += 1
+            print(json.dumps(result, default=str), flush=True)
+    return failures
+
+
+def follow_logs(names, tail=100, since=None, pattern=None):
+    """
+    Print each new log line of the containers as a JSON line until every stream
+    ends or Ctrl-C. Returns per-container line counts.
+    """
+    since = parse_time(since)
+    regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+    output_lock = threading.Lock()
+    ended = threading.Semaphore(0)
+
+    def on_line(line):
+        if (since is None or line.time >= since) and (regex is None or regex.search(line.text)):
+            text = json.dumps({"container": line.container, "time": line.time, "line": line.text})
+            with output_lock:
+                print(text, flush=True)
+
+    # Lines are printed as they arrive, so nothing needs to stay buffered
+    follower = vmms.follow_container_logs(names, tail=tail, buffer_lines=1, on_line=on_line,
+                                          on_end=lambda container, error: ended.release())
+    try:
+        for _ in names:
+            ended.acquire()
+    except KeyboardInterrupt:
+        follower.stop()
+    return {name: {"lines": stats["total"], "error": stats["error"]} for name, stats in follower.stats().items()}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="vmms", description="Manage Docker images/containers and QEMU VMs.")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Print per-operation latency (p50/p99) to stderr when done")
+    commands = parser.add_subparsers(dest="group", required=True)
+
+    images = commands.add_parser("images", help="Docker images").add_subparsers(dest="command", required=True)
+    images.add_parser("list", help="List local images")
+    search = images.add_parser("search", help="Search local images")
+    search.add_argument("pattern", nargs="?")
+    search.add_argument("--tag")
+    search.add_argument("--regex", action="store_true")
+    search.add_argument("--dangling", choices=["yes", "no"])
+    search.add_argument("--sort", default="created")
+    search.add_argument("--limit", type=int)
+    pull = images.add_parser("pull", help="Pull one or more images")
+    pull.add_argument("images", nargs="+")
+    pull.add_argument("--concurrency", type=positive_int, default=4)
+    build = images.add_parser("build", help="Build an image from a Dockerfile")
+    build.add_argument("dockerfile")
+    build.add_argument("--tag", required=True)
+    build.add_argument("--context")
+    build.add_argument("--builder", choices=["auto", "buildkit", "classic"], default="auto")
+    build.add_argument("--cache-dir", help="Local BuildKit cache directory (default ~/.vmms/build-cache/<repo>)")
+    build.add_argument("--no-cache", action="store_true")
+    check = images.add_parser("lint", help="Check a Dockerfile for cache and image-size problems")
+    check.add_argument("dockerfile")
+    queue = images.add_parser("build-many", help="Build several images in FROM dependency order")
+    queue.add_argument("targets", nargs="+", metavar="DOCKERFILE=TAG")
+    queue.add_argument("--concurrency", type=positive_int, default=2)
+    queue.add_argument("--builder", choices=["auto", "buildkit", "classic"], default="auto")
+    queue.add_argument("--no-cache", action="store_true")
+    hub = images.add_parser("hub-search", help="Search Docker Hub")
+    hub.add_argument("term")
+    hub.add_argument("--limit", type=int, default=25)
+    hub.add_argument("--sort", choices=["name", "stars", "pulls", "official"])
+    hub.add_argument("--ascending", action="store_true")
+
+    containers = commands.add_parser("containers", help="Docker containers").add_subparsers(dest="command", required=True)
+    listing = containers.add_parser("list", help="List containers")
+    listing.add_argument("--all", action="store_true", help="Include stopped containers")
+    search = containers.add_parser("search", help="Search containers by name or id")
+    search.add_argument("query")
+    start = containers.add_parser("start", help="Run a container from an image")
+    start.add_argument("image")
+    start.add_argument("--name")
+    stop = containers.add_parser("stop", help="Stop a container")
+    stop.add_argument("name")
+    stop.add_argument("--timeout", type=int, default=10)
+    launch = containers.add_parser("launch", help="Run replicas of a launch spec or saved template")
+    launch.add_argument("--template", help="Name of a saved launch template")
+    launch.add_argument("--spec", help="JSON file with a launch spec")
+    launch.add_argument("--image", help="Override the image")
+    launch.add_argument("--name", help="Override the name (replicas get -1, -2, ...)")
+    launch.add_argument("--replicas", type=int, default=1)
+    containers.add_parser("templates", help="List saved launch templates")
+    logs = containers.add_parser("logs", help="Show, follow or export container logs")
+    logs.add_argument("names", nargs="+", metavar="name")
+    logs.add_argument("--tail", type=int, default=100, help="Lines of history per container (default 100)")
+    logs.add_argument("--since", help="Only lines after this, e.g. 10m, 2h or 2024-05-01T12:00")
+    logs.add_argument("--until", help="Only lines before this")
+    logs.add_argument("--grep", help="Only lines matching this regex (case-insensitive)")
+    logs.add_argument("--follow", action="store_true", help="Print new lines as JSON lines until Ctrl-C")
+    logs.add_argument("--output", help="Stream the whole log (within --since/--until) to this file")
+    many = containers.add_parser("batch", help="Start/stop/restart/remove many containers at once")
+    many.add_argument("action", choices=["start", "stop", "restart", "remove"])
+    many.add_argument("--name", action="append", dest="names", help="Container name or id (repeatable)")
+    many.add_argument("--label", action="append", dest="labels", help="Label selector key or key=value (repeatable)")
+    many.add_argument("--pattern", help="Glob on container names, e.g. 'web-*'")
+    many.add_argument("--workers", type=int, default=16)
+    many.add_argument("--timeout", type=int, default=10, help="Stop grace period per container (seconds)")
+    many.add_argument("--force", action="store_true", help="Remove running containers too")
+
+    qemu = commands.add_parser("qemu", help="QEMU images and VMs").add_subparsers(dest="command", required=True)
+    create = qemu.add_parser("create", help="Create a qcow2 image")
+    create.add_argument("name")
+    create.add_argument("size", type=int, help="Size in MB")
+    create.add_argument("location")
+    create.add_argument("--preallocation", default="off")
+    create.add_argument("--cluster-size")
+    create.add_argument("--backing-file")
+    clone = qemu.add_parser("clone", help="Clone an image as overlays on a base")
+    clone.add_argument("base")
+    clone.add_argument("name")
+    clone.add_argument("--location")
+    clone.add_argument("--count", type=int, default=1)
+    boot = qemu.add_parser("boot", help="Boot a VM in the background")
+    boot.add_argument("image")
+    boot.add_argument("--ram", type=int, required=True, help="RAM in MB")
+    boot.add_argument("--cores", type=int, required=True)
+    boot.add_argument("--iso")
+    boot.add_argument("--name")
+    boot.add_argument("--profile", default="desktop")
+    qemu.add_parser("vms", help="List VMs")
+    tree = qemu.add_parser("snapshots", help="Images and their snapshots as a backing-file tree")
+    tree.add_argument("images", nargs="*", help="Images to show (default: images this tool created)")
+    tree.add_argument("--location", help="Show every image in this directory")
+    snapshot = qemu.add_parser("snapshot", help="Snapshot an image (live if a VM is running on it)")
+    snapshot.add_argument("image")
+    snapshot.add_argument("name")
+    snapshot.add_argument("--external", action="store_true", help="Freeze the image and continue in a new overlay")
+    for action, help_text in (("restore", "Revert an image to an internal snapshot"),
+                              ("delete-snapshot", "Delete an internal snapshot")):
+        snapshot_command = qemu.add_parser(action, help=help_text)
+        snapshot_command.add_argument("image")
+        snapshot_command.add_argument("name")
+    reset = qemu.add_parser("reset", help="Discard everything written to an overlay")
+    reset.add_argument("image")
+    reset_vm = qemu.add_parser("reset-vm", help="Reboot a VM on a clean overlay, or revert it to a snapshot")
+    reset_vm.add_argument("name")
+    reset_vm.add_argument("--snapshot")
+    for action in ("stop", "pause", "resume"):
+        vm_command = qemu.add_parser(action, help=f"{action.capitalize()} a VM")
+        vm_command.add_argument("name")
+        if action == "stop":
+            vm_command.add_argument("--force", action="store_true")
+
+    state = commands.add_parser("state", help="Artifacts this tool created").add_subparsers(dest="command", required=True)
+    for action in ("list", "cleanup"):
+        state_command = state.add_parser(action, help=f"{action.capitalize()} recorded artifacts")
+        state_command.add_argument("--kind", action="append", choices=["file", "qemu_image", "vm", "container", "image"])
+        state_command.add_argument("--tag")
+        state_command.add_argument("--older-than", type=float, metavar="DAYS")
+    state.add_parser("counts", help="Number of recorded artifacts per type")
+
+    disk = commands.add_parser("disk", help="Reclaim disk space").add_subparsers(dest="command", required=True)
+    for action in ("usage", "reclaim"):
+        disk_command = disk.add_parser(action, help="Show reclaimable space" if action == "usage" else
+                                       "Prune Docker data and compact qcow2 images")
+        disk_command.add_argument("--all-images", action="store_true", help="Count/prune unused images, not just dangling")
+        disk_command.add_argument("--qcow2", action="append", help="qcow2 image (default: images this tool created)")
+        if action == "reclaim":
+            disk_command.add_argument("--target", action="append", dest="targets", choices=vmms.RECLAIM_TARGETS,
+                                      help="What to reclaim (default: everything except volumes)")
+            disk_command.add_argument("--until", help="Only prune objects older than this, e.g. 24h")
+            disk_command.add_argument("--label", action="append", dest="labels")
+
+    batch = commands.add_parser("batch", help="Run operations from a JSON-lines file ('-' for stdin)")
+    batch.add_argument("file")
+    return parser
+
+
+def run(args):
+    if args.group == "images":
+        if args.command == "list":
+            return vmms.list_docker_images()
+        if args.command == "search":
+            dangling = {"yes": True, "no": False}.get(args.dangling)
+            return vmms.search_local_images(args.pattern, tag=args.tag, regex=args.regex, dangling=dangling,
+                                            sort_by=args.sort, limit=args.limit)
+        if args.command == "pull":
+            if len(args.images) == 1:
+                return vmms.pull_docker_image(args.images[0])
+            return vmms.bulk_pull_images(args.images, concurrency=args.concurrency)
+        if args.command == "build":
+            buildkit = {"auto": None, "buildkit": True, "classic": False}[args.builder]
+            return vmms.build_docker_image(args.dockerfile, args.tag, context_dir=args.context, buildkit=buildkit,
+                                           cache_dir=args.cache_dir, no_cache=args.no_cache,
+                                           on_line=lambda line: print(line, file=sys.stderr))
+        if args.command == "lint":
+            return vmms.lint_dockerfile(args.dockerfile)
+        if args.command == "build-many":
+            targets = []
+            for target in args.targets:
+                dockerfile, _, tag = target.partition("=")
+                if not tag:
+                    raise ValueError(f"Expected DOCKERFILE=TAG, got {target}")
+                targets.append({"dockerfile": dockerfile, "tag": tag})
+            buildkit = {"auto": None, "buildkit": True, "classic": False}[args.builder]
+            return vmms.build_docker_images(targets, concurrency=args.concurrency, buildkit=buildkit,
+                                            no_cache=args.no_cache, on_line=lambda line: print(line, file=sys.stderr))
+        if args.command == "hub-search":
+            return vmms.search_dockerhub_images(args.term, limit=args.limit, sort_by=args.sort,
+                                                descending=not args.ascending)
+
+    if args.group == "containers":
+        if args.command == "list":
+            return vmms.list_containers(all=args.all)
+        if args.command == "search":
+            return vmms.search_docker_containers(args.query)
+        if args.command == "start":
+            return vmms.start_container(args.image, args.name)
+        if args.command == "stop":
+            return vmms.stop_container(args.name, timeout=args.timeout)
+        if args.command == "launch":
+            spec = None
+            if args.spec:
+                with open(args.spec, "r") as f:
+                    spec = json.load(f)
+            overrides = {key: value for key, value in (("image", args.image), ("name", args.name)) if value}
+            return vmms.launch_containers(spec, template=args.template, replicas=args.replicas, **overrides)
+        if args.command == "templates":
+            return vmms.list_templates()
+        if args.command == "logs":
+            if args.output:
+                if len(args.names) != 1:
+                    raise ValueError("--output exports one container at a time")
+                return vmms.export_container_logs(args.names[0], args.output, since=args.since, until=args.until)
+            if args.follow:
+                return follow_logs(args.names, tail=args.tail, since=args.since, pattern=args.grep)
+            return vmms.container_logs(args.names, tail=args.tail, since=args.since, until=args.until,
+                                       pattern=args.grep)
+        if args.command == "batch":
+            return vmms.batch_containers(args.action, names=args.names, labels=args.labels, pattern=args.pattern,
+                                         max_workers=args.workers, timeout=args.timeout, force=args.force)
+
+    if args.group == "qemu":
+        if args.command == "create":
+            return vmms.create_image(args.name, args.size, args.location, preallocation=args.preallocation,
+                                     cluster_size=args.cluster_size, backing_file=args.backing_file)
+        if args.command == "clone":
+            return vmms.clone_image(args.base, args.name, args.location, count=args.count)
+        if args.command == "boot":
+            return vmms.boot(args.ram, args.cores, args.image, args.iso, name=args.name, profile=args.profile)
+        if args.command == "vms":
+            return vmms.list_vms()
+        if args.command == "stop":
+            return vmms.stop_vm(args.name, force=args.force)
+        if args.command == "pause":
+            return vmms.pause_vm(args.name)
+        if args.command == "resume":
+            return vmms.resume_vm(args.name)
+        if args.command == "snapshots":
+            return vmms.snapshot_tree(paths=args.images or None, location=args.location)
+        if args.command == "snapshot":
+            return vmms.create_snapshot(args.image, args.name, external=args.external)
+        if args.command == "restore":
+            return vmms.restore_snapshot(args.image, args.name)
+        if args.command == "delete-snapshot":
+            return vmms.delete_snapshot(args.image, args.name)
+        if args.command == "reset":
+            return vmms.reset_image(args.image)
+        if args.command == "reset-vm":
+            return vmms.reset_vm(args.name, snapshot=args.snapshot)
+
+    if args.group == "state":
+        if args.command == "list":
+            return vmms.list_artifacts(kind=args.kind, tag=args.tag, older_than_days=args.older_than)
+        if args.command == "cleanup":
+            return vmms.cleanup_artifacts(kind=args.kind, tag=args.tag, older_than_days=args.older_than)
+        if args.command == "counts":
+            return vmms.artifact_counts()
+
+    if args.group == "disk":
+        if args.command == "usage":
+            return vmms.disk_usage(qcow2_paths=args.qcow2, all_images=args.all_images)
+        if args.command == "reclaim":
+            return vmms.reclaim_space(targets=args.targets or vmms.RECLAIM_DEFAULT_TARGETS, until=args.until,
+                                      labels=args.labels, all_images=args.all_images, qcow2_paths=args.qcow2,
+                                      on_line=lambda line: print(line, file=sys.stderr))
+
+    raise ValueError(f"Unknown command: {args.group} {getattr(args, 'command', '')}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    startup = time.perf_counter() - _startup_started
+    if startup > STARTUP_BUDGET:
+        print(f"warning: startup took {startup:.2f}s (budget {STARTUP_BUDGET:.1f}s)", file=sys.stderr)
+    try:
+        if args.group == "batch":
+            return 1 if run_batch(args.file) else 0
+        _print(run(args))
+        return 0
+    except Exception as e:
+        _print({"error": str(e)})
+        return 1
+    finally:
+        vmms.shutdown()
+        if args.metrics:
+            print(format_snapshot(vmms.metrics()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
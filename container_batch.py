@@ -0,0 +1,87 @@
+import fnmatch
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from inventory import container_row
+
+
+ACTIONS = ("start", "stop", "restart", "remove")
+
+
+def select_containers(client, names=None, labels=None, pattern=None, running=None):
+    """
+    Pick containers by exact name, label selector ('key' or 'key=value') and/or a
+    glob on the name, with one list call. Criteria are combined with AND.
+    """
+    filters = {}
+    if labels:
+        filters["label"] = list(labels)
+    if running is not None:
+        filters["status"] = ["running"] if running else ["created", "exited", "paused", "dead"]
+    rows = [container_row(summary) for summary in client.api.containers(all=True, filters=filters)]
+    if names:
+        wanted = set(names)
+        rows = [row for row in rows if row["name"] in wanted or row["id"] in wanted or row["short_id"] in wanted]
+    if pattern:
+        rows = [row for row in rows if fnmatch.fnmatchcase(row["name"], pattern)]
+    return rows
+
+
+def _apply(client, action, container, timeout, force):
+    started = time.monotonic()
+    result = {"id": container["id"], "name": container["name"], "action": action,
+              "status": "ok", "seconds": 0.0, "error": None}
+    try:
+        if action == "start":
+            client.api.start(container["id"])
+        elif action == "stop":
+            # The daemon sends SIGKILL once the grace period runs out
+            client.api.stop(container["id"], timeout=timeout)
+        elif action == "restart":
+            client.api.restart(container["id"], timeout=timeout)
+        elif action == "remove":
+            client.api.remove_container(container["id"], force=force)
+        else:
+            raise ValueError(f"Unknown action: {action}")
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+def run_batch(client, action, containers, max_workers=16, timeout=10, force=False, on_result=None, job=None):
+    """
+    Apply action to every container on a bounded thread pool.
+
+    timeout is the per-container stop grace period in seconds. Returns one result
+    dict per container; failures are reported, not raised.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action}. Choose one of {', '.join(ACTIONS)}")
+    results = []
+    if not containers:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(containers)))) as pool:
+        futures = [pool.submit(_apply, client, action, container, timeout, force) for container in containers]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if on_result:
+                    on_result(result)
+                if job:
+                    job.set_progress(len(results) / len(containers), f"{len(results)}/{len(containers)} containers")
+                    job.check_cancelled()
+        except BaseException:
+            # Containers not yet started are skipped; ones in flight finish on their own
+            for future in futures:
+                future.cancel()
+            raise
+    return results
+
+
+def summarize(results):
+    failed = [result for result in results if result["status"] == "failed"]
+    slowest = max((result["seconds"] for result in results), default=0.0)
+    return f"{len(results) - len(failed)} ok, {len(failed)} failed, slowest {slowest:.1f}s"
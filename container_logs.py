@@ -0,0 +1,269 @@
+"""
+Follow container logs into bounded per-container buffers.
+
+Each followed container gets a thread reading `docker logs --follow` and a ring
+buffer of its last N lines, so a chatty service costs at most N lines of memory
+however long it is followed. Filters and searches run over the buffers; full
+exports stream from the daemon straight to a file without buffering.
+"""
+import heapq
+import re
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+
+LogLine = namedtuple("LogLine", "container time text")
+
+DEFAULT_BUFFER_LINES = 10000
+MAX_LINE_LENGTH = 16 * 1024  # longer lines are cut so one runaway line can't exhaust memory
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(text, now=None):
+    """
+    '90s', '10m', '2h' or '1d' ago, an ISO 8601 time, or epoch seconds -> epoch
+    seconds. Returns None for blank input.
+    """
+    if text is None or isinstance(text, (int, float)):
+        return text
+    text = text.strip()
+    if not text:
+        return None
+    match = _DURATION.match(text)
+    if match:
+        return (now if now is not None else time.time()) - float(match.group(1)) * _UNITS[match.group(2)]
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time: {text}. Use e.g. 10m, 2h, 1d or 2024-05-01T12:00") from None
+
+
+@lru_cache(maxsize=256)
+def _whole_seconds(text):
+    return datetime.fromisoformat(text + "+00:00").timestamp()
+
+
+def parse_timestamp(text):
+    """Docker's RFC 3339 timestamps ('2024-05-01T12:00:00.123456789Z') -> epoch seconds."""
+    whole, _, fraction = text.rstrip("Z").partition(".")
+    return _whole_seconds(whole) + (float("0." + fraction) if fraction else 0.0)
+
+
+def parse_line(container, raw):
+    """A line of `docker logs --timestamps` output as a LogLine."""
+    text = raw.decode("utf-8", errors="replace").rstrip("\r")
+    stamp, _, message = text.partition(" ")
+    try:
+        return LogLine(container, parse_timestamp(stamp), message)
+    except ValueError:
+        return LogLine(container, time.time(), text)
+
+
+class LineSplitter:
+    """Reassemble lines from stream chunks, which may split or join lines anywhere."""
+
+    def __init__(self):
+        self._partial = b""
+
+    def feed(self, chunk):
+        data = self._partial + chunk
+        *lines, self._partial = data.split(b"\n")
+        if len(self._partial) > MAX_LINE_LENGTH:
+            lines.append(self._partial[:MAX_LINE_LENGTH])
+            self._partial = b""
+        return [line[:MAX_LINE_LENGTH] for line in lines]
+
+    def flush(self):
+        lines = [self._partial] if self._partial else []
+        self._partial = b""
+        return lines
+
+
+def parse_log(container, data):
+    """All lines of a non-streamed `docker logs --timestamps` result."""
+    splitter = LineSplitter()
+    return [parse_line(container, raw) for raw in splitter.feed(data) + splitter.flush()]
+
+
+def filter_lines(lines, since=None, until=None, pattern=None):
+    """Lines with since <= time <= until whose text matches pattern (a regex string or compiled)."""
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+    for line in lines:
+        if since is not None and line.time < since:
+            continue
+        if until is not None and line.time > until:
+            continue
+        if pattern is not None and not pattern.search(line.text):
+            continue
+        yield line
+
+
+class LogBuffer:
+    """The last maxlen lines of one container; older lines are dropped and counted."""
+
+    def __init__(self, maxlen=DEFAULT_BUFFER_LINES):
+        self._lines = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._lines)
+
+    def append(self, line):
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self.dropped += 1
+            self._lines.append(line)
+            self.total += 1
+
+    def lines(self):
+        with self._lock:
+            return list(self._lines)
+
+
+class LogFollower:
+    """
+    Follow the logs of several containers at once, one daemon thread each.
+
+    on_line(LogLine) is called from the follower threads for every new line and
+    on_end(container, error) when a stream stops (error is None when the
+    container exited or stop() was called). client must have no read timeout
+    (DockerConnection.get_streaming()), or a container that stays quiet that
+    long ends its stream with an error.
+    """
+
+    def __init__(self, client, tail=100, buffer_lines=DEFAULT_BUFFER_LINES, on_line=None, on_end=None):
+        self.client = client
+        self.tail = tail
+        self.buffer_lines = buffer_lines
+        self.on_line = on_line or (lambda line: None)
+        self.on_end = on_end or (lambda container, error: None)
+        self.buffers = {}
+        self._streams = {}
+        self._errors = {}
+        self._stopping = set()
+        self._lock = threading.Lock()
+
+    def follow(self, container):
+        """Start following container (a name or id); does nothing if it is already followed."""
+        with self._lock:
+            if container in self._streams:
+                return
+            self._streams[container] = None
+            self._stopping.discard(container)
+            self._errors.pop(container, None)
+            # Start a fresh buffer: the daemon resends the tail, which would duplicate old lines
+            self.buffers[container] = LogBuffer(self.buffer_lines)
+        threading.Thread(target=self._run, args=(container,), name=f"logs-{container}", daemon=True).start()
+
+    def stop(self, container=None):
+        """Stop following container, or every container. Buffered lines are kept."""
+        with self._lock:
+            names = [container] if container else list(self._streams)
+            streams = []
+            for name in names:
+                if name in self._streams:
+                    self._stopping.add(name)
+                    streams.append(self._streams[name])
+        for stream in streams:
+            if stream is not None:
+                stream.close()
+
+    def following(self):
+        with self._lock:
+            return sorted(self._streams)
+
+    def forget(self, container):
+        """Stop following container and drop its buffer."""
+        self.stop(container)
+        with self._lock:
+            self.buffers.pop(container, None)
+
+    def lines(self, containers=None, since=None, until=None, pattern=None):
+        """Buffered lines of the given containers (default all), merged in time order and filtered."""
+        with self._lock:
+            buffers = [buffer for name, buffer in self.buffers.items() if containers is None or name in containers]
+        merged = heapq.merge(*(buffer.lines() for buffer in buffers), key=lambda line: line.time)
+        return list(filter_lines(merged, since, until, pattern))
+
+    def stats(self):
+        """{container: {"following", "buffered", "dropped", "total", "error"}}"""
+        with self._lock:
+            return {
+                name: {"following": name in self._streams, "buffered": len(buffer), "dropped": buffer.dropped,
+                       "total": buffer.total, "error": self._errors.get(name)}
+                for name, buffer in self.buffers.items()
+            }
+
+    def _run(self, container):
+        with self._lock:
+            buffer = self.buffers[container]
+        splitter = LineSplitter()
+        error = None
+        try:
+            stream = self.client.api.logs(container, stream=True, follow=True, tail=self.tail, timestamps=True)
+            with self._lock:
+                stopping = container in self._stopping
+                self._streams[container] = stream
+            if stopping:
+                stream.close()
+                return
+            for chunk in stream:
+                for raw in splitter.feed(chunk):
+                    self._emit(buffer, parse_line(container, raw))
+            for raw in splitter.flush():
+                self._emit(buffer, parse_line(container, raw))
+        except Exception as e:
+            # Closing the stream from stop() surfaces here as a connection error
+            with self._lock:
+                if container not in self._stopping:
+                    error = str(e)
+                    self._errors[container] = error
+        finally:
+            with self._lock:
+                self._streams.pop(container, None)
+                self._stopping.discard(container)
+            self.on_end(container, error)
+
+    def _emit(self, buffer, line):
+        buffer.append(line)
+        self.on_line(line)
+
+
+def export_logs(client, container, path, since=None, until=None, timestamps=True, job=None):
+    """
+    Stream a container's log (optionally only since..until, epoch seconds) from the
+    daemon straight into path. Nothing is buffered beyond one chunk. Returns the
+    number of bytes written.
+    """
+    stream = client.api.logs(container, stream=True, follow=False, timestamps=timestamps,
+                             since=since, until=until)
+    if job:
+        job.on_cancel(stream.close)
+    written = 0
+    with open(path, "wb") as f:
+        try:
+            for chunk in stream:
+                f.write(chunk)
+                written += len(chunk)
+        finally:
+            stream.close()
+    if job:
+        job.check_cancelled()
+    return written
+
+
+def format_line(line, show_container=True):
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(line.time)) + f".{int(line.time % 1 * 1000):03d}"
+    return f"{stamp} [{line.container}] {line.text}" if show_container else f"{stamp} {line.text}"
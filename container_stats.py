@@ -0,0 +1,188 @@
+import threading
+import time
+from array import array
+
+
+class RollingSeries:
+    """Fixed-size ring buffer of floats backed by a compact array."""
+
+    def __init__(self, size=60):
+        self._values = array("d", [0.0] * size)
+        self._size = size
+        self._count = 0
+        self._next = 0
+
+    def append(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def values(self):
+        """Values in insertion order, oldest first."""
+        if self._count < self._size:
+            return self._values[:self._count].tolist()
+        return (self._values[self._next:] + self._values[:self._next]).tolist()
+
+    @property
+    def latest(self):
+        return self._values[(self._next - 1) % self._size] if self._count else 0.0
+
+    @property
+    def average(self):
+        if not self._count:
+            return 0.0
+        if self._count < self._size:
+            return sum(self._values[:self._count]) / self._count
+        return sum(self._values) / self._size
+
+    @property
+    def peak(self):
+        if not self._count:
+            return 0.0
+        return max(self._values[:self._count] if self._count < self._size else self._values)
+
+
+def cpu_percent(stats):
+    cpu = stats.get("cpu_stats") or {}
+    precpu = stats.get("precpu_stats") or {}
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    if cpu_delta <= 0 or system_delta <= 0:
+        return 0.0
+    return cpu_delta / system_delta * online * 100.0
+
+
+def memory_usage(stats):
+    """(used bytes, limit bytes), excluding the page cache like `docker stats` does."""
+    memory = stats.get("memory_stats") or {}
+    usage = memory.get("usage", 0)
+    details = memory.get("stats") or {}
+    # cgroup v2 reports inactive_file, cgroup v1 reports cache
+    usage -= details.get("inactive_file", details.get("cache", 0))
+    return max(usage, 0), memory.get("limit", 0)
+
+
+def network_bytes(stats):
+    rx = tx = 0
+    for interface in (stats.get("networks") or {}).values():
+        rx += interface.get("rx_bytes", 0)
+        tx += interface.get("tx_bytes", 0)
+    return rx, tx
+
+
+def block_bytes(stats):
+    read = write = 0
+    for entry in (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+        op = entry.get("op", "").lower()
+        if op == "read":
+            read += entry.get("value", 0)
+        elif op == "write":
+            write += entry.get("value", 0)
+    return read, write
+
+
+class ContainerStatsReader:
+    """Follows the stats stream of one container in a daemon thread."""
+
+    def __init__(self, client, container_id, name, window=60):
+        self.client = client
+        self.container_id = container_id
+        self.name = name
+        self.cpu = RollingSeries(window)
+        self.memory = RollingSeries(window)
+        self.net_rx = RollingSeries(window)
+        self.net_tx = RollingSeries(window)
+        self.block_read = RollingSeries(window)
+        self.block_write = RollingSeries(window)
+        self.memory_limit = 0
+        self.error = None
+        self._previous = None  # (time, rx, tx, read, write)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"stats-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    @property
+    def alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        try:
+            stream = self.client.api.stats(self.container_id, stream=True, decode=True)
+            for stats in stream:
+                if self._stopped.is_set():
+                    break
+                self._record(stats)
+        except Exception as e:
+            self.error = str(e)
+
+    def _record(self, stats):
+        now = time.monotonic()
+        used, limit = memory_usage(stats)
+        rx, tx = network_bytes(stats)
+        read, write = block_bytes(stats)
+        self.cpu.append(cpu_percent(stats))
+        self.memory.append(used)
+        self.memory_limit = limit
+        if self._previous is not None:
+            elapsed = max(now - self._previous[0], 1e-6)
+            self.net_rx.append(max(rx - self._previous[1], 0) / elapsed)
+            self.net_tx.append(max(tx - self._previous[2], 0) / elapsed)
+            self.block_read.append(max(read - self._previous[3], 0) / elapsed)
+            self.block_write.append(max(write - self._previous[4], 0) / elapsed)
+        self._previous = (now, rx, tx, read, write)
+
+    def snapshot(self):
+        return {
+            "id": self.container_id,
+            "name": self.name,
+            "cpu": self.cpu.latest,
+            "cpu_avg": self.cpu.average,
+            "cpu_peak": self.cpu.peak,
+            "memory": self.memory.latest,
+            "memory_limit": self.memory_limit,
+            "net_rx": self.net_rx.latest,
+            "net_tx": self.net_tx.latest,
+            "block_read": self.block_read.latest,
+            "block_write": self.block_write.latest,
+            "error": self.error,
+        }
+
+
+class StatsCollector:
+    """Keeps one stats reader per running container."""
+
+    def __init__(self, client, window=60):
+        self.client = client
+        self.window = window
+        self.readers = {}
+        self._lock = threading.Lock()
+
+    def sync(self, containers):
+        """Start readers for new containers and stop readers for ones that went away."""
+        wanted = {container["id"]: container["name"] for container in containers}
+        with self._lock:
+            for container_id in list(self.readers):
+                if container_id not in wanted:
+                    self.readers.pop(container_id).stop()
+            for container_id, name in wanted.items():
+                if container_id not in self.readers:
+                    reader = ContainerStatsReader(self.client, container_id, name, self.window)
+                    self.readers[container_id] = reader
+                    reader.start()
+
+    def snapshot(self):
+        with self._lock:
+            readers = list(self.readers.values())
+        return [reader.snapshot() for reader in readers]
+
+    def stop(self):
+        with self._lock:
+            for reader in self.readers.values():
+                reader.stop()
+            self.readers.clear()
@@ -0,0 +1,214 @@
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+from log_stream import stream_process
+
+
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".vmms", "build-cache")
+BUILDER_NAME = "vmms-builder"
+
+# Written to a build context that has no .dockerignore of its own. Documents,
+# archives and disk images in the app directory are never needed by a build.
+DEFAULT_DOCKERIGNORE = [
+    ".git",
+    "**/__pycache__",
+    "**/*.pyc",
+    "*.docx",
+    "*.pdf",
+    "*.zip",
+    "*.tar",
+    "*.tar.gz",
+    "*.img",
+    "*.qcow2",
+    "*.iso",
+    ".vmms",
+]
+
+LEGACY_STEP = re.compile(r"^Step (\d+)/(\d+) : (.*)")
+BUILDKIT_VERTEX = re.compile(r"^#(\d+) (.*)")
+BUILDKIT_STEP = re.compile(r"\[(?:[\w.-]+ )?(\d+)/(\d+)\]")
+BUILDKIT_DONE = re.compile(r"^DONE (\d+(?:\.\d+)?)s$")
+
+
+def ensure_dockerignore(context_dir, patterns=DEFAULT_DOCKERIGNORE):
+    """Create context_dir/.dockerignore from patterns unless one exists. Returns True if written."""
+    path = os.path.join(context_dir, ".dockerignore")
+    if os.path.exists(path):
+        return False
+    with open(path, "w") as f:
+        f.write("# Generated by the VM Management System; edit freely\n")
+        f.write("\n".join(patterns) + "\n")
+    return True
+
+
+def read_dockerignore(context_dir):
+    path = os.path.join(context_dir, ".dockerignore")
+    try:
+        with open(path, "r") as f:
+            lines = [line.strip() for line in f]
+    except OSError:
+        return []
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def context_size(context_dir, dockerfile=None):
+    """Return (file count, total bytes) that the build would send, honouring .dockerignore."""
+    from docker.utils.build import exclude_paths
+
+    files = total = 0
+    for relative_path in exclude_paths(context_dir, read_dockerignore(context_dir), dockerfile=dockerfile):
+        path = os.path.join(context_dir, relative_path)
+        if os.path.isfile(path) and not os.path.islink(path):
+            files += 1
+            total += os.path.getsize(path)
+    return files, total
+
+
+def cache_dir_for(tag, cache_root=CACHE_ROOT):
+    """Local BuildKit cache directory shared by every build of one repository."""
+    repository = tag.rsplit(":", 1)[0] if ":" in tag.rsplit("/", 1)[-1] else tag
+    return os.path.join(cache_root, re.sub(r"[^\w.-]+", "_", repository))
+
+
+class BuildTimer:
+    """
+    Collect per-step wall time from build output.
+
+    Understands both the classic builder ("Step 2/5 : RUN ...", " ---> Using cache")
+    and BuildKit's plain progress ("#6 [2/5] RUN ...", "#6 CACHED", "#6 DONE 1.2s").
+    """
+
+    def __init__(self):
+        self.steps = {}  # key -> {"name", "seconds", "cached", "started"}
+        self.total = 0
+        self.current = 0
+        self._legacy_step = None
+
+    def feed(self, line):
+        """Feed one output line. Returns (step, total) when a new build step starts, else None."""
+        now = time.monotonic()
+        match = LEGACY_STEP.match(line)
+        if match:
+            self._finish_legacy(now)
+            self.current, self.total = int(match.group(1)), int(match.group(2))
+            self._legacy_step = self.current
+            self.steps[self.current] = {"name": match.group(3), "seconds": None, "cached": False, "started": now}
+            return self.current, self.total
+        if self._legacy_step is not None:
+            if "Using cache" in line:
+                self.steps[self._legacy_step]["cached"] = True
+            elif line.startswith("Successfully built"):
+                self._finish_legacy(now)
+            return None
+
+        match = BUILDKIT_VERTEX.match(line)
+        if not match:
+            return None
+        vertex, text = int(match.group(1)), match.group(2)
+        if vertex not in self.steps:
+            self.steps[vertex] = {"name": text, "seconds": None, "cached": False, "started": now}
+            step = BUILDKIT_STEP.match(text)
+            if step:
+                self.current, self.total = int(step.group(1)), int(step.group(2))
+                return self.current, self.total
+            return None
+        entry = self.steps[vertex]
+        if text == "CACHED":
+            entry["cached"], entry["seconds"] = True, 0.0
+        else:
+            done = BUILDKIT_DONE.match(text)
+            if done:
+                entry["seconds"] = float(done.group(1))
+        return None
+
+    def _finish_legacy(self, now):
+        entry = self.steps.get(self._legacy_step)
+        if entry and entry["seconds"] is None:
+            entry["seconds"] = now - entry["started"]
+
+    def summary(self, limit=10):
+        """Slowest steps first, one line each."""
+        steps = [entry for entry in self.steps.values() if entry["seconds"] is not None]
+        cached = sum(1 for entry in steps if entry["cached"])
+        lines = [f"Build steps: {len(steps)} ({cached} cached), {sum(e['seconds'] for e in steps):.1f}s total"]
+        for entry in sorted(steps, key=lambda e: e["seconds"], reverse=True)[:limit]:
+            status = "CACHED" if entry["cached"] else f"{entry['seconds']:6.1f}s"
+            lines.append(f"  {status:>8}  {entry['name'][:70]}")
+        return "\n".join(lines)
+
+
+def buildkit_available():
+    """True if the docker CLI with the buildx plugin is installed."""
+    if not shutil.which("docker"):
+        return False
+    try:
+        return subprocess.run(["docker", "buildx", "version"], capture_output=True, timeout=10).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def ensure_builder(name=BUILDER_NAME):
+    """
+    Local cache export needs the docker-container driver; the default 'docker'
+    driver can only read inline cache. Create a dedicated builder once.
+    """
+    inspect = subprocess.run(["docker", "buildx", "inspect", name], capture_output=True, text=True)
+    if inspect.returncode != 0:
+        create = subprocess.run(
+            ["docker", "buildx", "create", "--name", name, "--driver", "docker-container"],
+            capture_output=True, text=True,
+        )
+        if create.returncode != 0:
+            raise RuntimeError(f"Could not create buildx builder: {create.stderr.strip()}")
+    return name
+
+
+def buildkit_build(context_dir, dockerfile_path, tag, cache_dir=None, no_cache=False, on_line=None, job=None,
+                   timer=None):
+    """
+    Build with `docker buildx build`, reading and writing layer cache in a local
+    directory so rebuilds reuse every unchanged step. Returns the image id.
+    """
+    cache_dir = cache_dir or cache_dir_for(tag)
+    os.makedirs(cache_dir, exist_ok=True)
+    timer = timer or BuildTimer()
+    iid_fd, iid_path = tempfile.mkstemp(suffix=".iid")
+    os.close(iid_fd)
+
+    cmd = [
+        "docker", "buildx", "build",
+        "--builder", ensure_builder(),
+        "--progress", "plain",
+        "--load",
+        "--iidfile", iid_path,
+        "-t", tag,
+        "-f", dockerfile_path,
+        "--cache-to", f"type=local,dest={cache_dir},mode=max",
+    ]
+    if no_cache:
+        cmd.append("--no-cache")
+    elif os.path.exists(os.path.join(cache_dir, "index.json")):
+        cmd += ["--cache-from", f"type=local,src={cache_dir}"]
+    cmd.append(context_dir)
+
+    def handle_line(line):
+        step = timer.feed(line)
+        if on_line:
+            on_line(line)
+        if step and job:
+            job.set_progress((step[0] - 1) / step[1], f"Step {step[0]}/{step[1]}")
+
+    try:
+        returncode, tail = stream_process(cmd, handle_line, job=job)
+        if job:
+            job.check_cancelled()
+        if returncode != 0:
+            raise RuntimeError(f"docker buildx build failed with exit code {returncode}:\n{tail}")
+        with open(iid_path, "r") as f:
+            return f.read().strip()
+    finally:
+        os.remove(iid_path)
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+from telemetry import instrument_docker_client
+
+
+class DockerUnavailable(Exception):
+    """The Docker daemon could not be reached."""
+
+
+def is_connection_error(error):
+    """True for errors that mean the daemon connection is gone, not that the request failed."""
+    import requests
+
+    while error is not None:
+        if isinstance(error, (requests.exceptions.ConnectionError, ConnectionError)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class DockerConnection:
+    """
+    Creates the Docker client on first use.
+
+    The daemon is probed with a short timeout and a few retries, so a slow or
+    missing dockerd fails fast instead of hanging the caller. The probe also
+    negotiates the API version, which the real client then reuses. Operations
+    that hit a dropped connection can call reset() and get a fresh client.
+    """
+
+    def __init__(self, connect_timeout=None, timeout=60, retries=3, backoff=0.5):
+        self.connect_timeout = connect_timeout or float(os.environ.get("VMMS_DOCKER_CONNECT_TIMEOUT", "3"))
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._client = None
+        self._streaming_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self):
+        return self._client is not None
+
+    def get(self):
+        client = self._client
+        if client is not None:
+            return client
+        with self._lock:
+            if self._client is None:
+                self._client = self._connect()
+            return self._client
+
+    def get_streaming(self):
+        """
+        A second client without a read timeout, for streams that may stay quiet
+        for minutes (followed logs). docker-py only lifts the timeout itself for
+        events, pulls and builds.
+        """
+        version = self.get().api.api_version
+        with self._lock:
+            if self._streaming_client is None:
+                import docker
+
+                self._streaming_client = instrument_docker_client(docker.from_env(version=version, timeout=None))
+            return self._streaming_client
+
+    def reset(self):
+        with self._lock:
+            clients = (self._client, self._streaming_client)
+            self._client = self._streaming_client = None
+        for client in clients:
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+    def _connect(self):
+        # Imported here: docker pulls in requests/urllib3, which dominates startup time
+        import docker
+
+        last_error = None
+        delay = self.backoff
+        for attempt in range(1, self.retries + 1):
+            probe = None
+            try:
+                probe = docker.from_env(timeout=self.connect_timeout)
+                probe.ping()
+                version = probe.api.api_version
+                # Long-running calls (builds, pulls, stop) need the normal timeout
+                return instrument_docker_client(docker.from_env(version=version, timeout=self.timeout))
+            except Exception as e:
+                last_error = e
+                if attempt < self.retries:
+                    time.sleep(delay)
+                    delay *= 2
+            finally:
+                if probe is not None:
+                    probe.close()
+        raise DockerUnavailable(
+            f"Docker daemon not reachable after {self.retries} attempts: {last_error}"
+        ) from last_error
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn(client, ...) and retry once on a fresh client if the connection dropped."""
+        try:
+            return fn(self.get(), *args, **kwargs)
+        except DockerUnavailable:
+            raise
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            self.reset()
+            return fn(self.get(), *args, **kwargs)
@@ -0,0 +1,184 @@
+import collections
+import os
+import re
+import time
+
+from telemetry import span
+
+
+STEP_PATTERN = re.compile(r"^Step (\d+)/(\d+)")
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class PullProgress:
+    """
+    Aggregate the per-layer progress events of a pull into one progress value.
+
+    The daemon downloads several layers at once, so events for different layers
+    arrive interleaved; each layer's byte counts are tracked by layer id.
+    """
+
+    def __init__(self, rate_window=3.0):
+        self.layers = {}  # layer id -> {"current": bytes, "total": bytes, "done": bool}
+        self.rate_window = rate_window
+        self._samples = collections.deque()
+
+    def update(self, event):
+        """Feed one decoded progress event. Returns True if it was a layer event."""
+        layer_id = event.get("id")
+        status = event.get("status", "")
+        if not layer_id or status.startswith(("Pulling from", "Digest", "Status")):
+            return False
+
+        layer = self.layers.setdefault(layer_id, {"current": 0, "total": 0, "done": False})
+        detail = event.get("progressDetail") or {}
+        if status == "Downloading" and detail.get("total"):
+            layer["current"] = detail.get("current", 0)
+            layer["total"] = detail["total"]
+        elif status in ("Download complete", "Verifying Checksum"):
+            layer["current"] = layer["total"]
+        elif status in ("Pull complete", "Already exists"):
+            layer["current"] = layer["total"]
+            layer["done"] = True
+
+        now = time.monotonic()
+        self._samples.append((now, self.bytes_done))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.rate_window:
+            self._samples.popleft()
+        return True
+
+    @property
+    def bytes_done(self):
+        return sum(layer["current"] for layer in self.layers.values())
+
+    @property
+    def bytes_total(self):
+        return sum(layer["total"] for layer in self.layers.values())
+
+    @property
+    def rate(self):
+        """Download speed in bytes/sec over the last few seconds."""
+        if len(self._samples) < 2:
+            return 0.0
+        (start, start_bytes), (end, end_bytes) = self._samples[0], self._samples[-1]
+        if end <= start:
+            return 0.0
+        return max(end_bytes - start_bytes, 0) / (end - start)
+
+    @property
+    def fraction(self):
+        if not self.layers:
+            return None
+        done_layers = sum(1 for layer in self.layers.values() if layer["done"])
+        layer_fraction = done_layers / len(self.layers)
+        if not self.bytes_total:
+            return layer_fraction
+        # Downloads dominate the wall time; extraction is counted by finished layers
+        return 0.9 * (self.bytes_done / self.bytes_total) + 0.1 * layer_fraction
+
+    def summary(self):
+        done_layers = sum(1 for layer in self.layers.values() if layer["done"])
+        return (
+            f"{format_bytes(self.bytes_done)}/{format_bytes(self.bytes_total)} "
+            f"at {format_bytes(self.rate)}/s ({done_layers}/{len(self.layers)} layers)"
+        )
+
+
+def _event_text(event):
+    if "stream" in event:
+        return event["stream"].rstrip("\n")
+    if "status" in event:
+        text = event["status"]
+        if event.get("id"):
+            text = f"{event['id']}: {text}"
+        return text
+    return None
+
+
+def pull_image(client, image_name, on_line=None, job=None):
+    """
+    Pull image_name with the streaming Engine API and report layer progress on job.
+
+    on_line(text) receives non-progress status lines (new layers, digest, result).
+    Returns the pulled Image.
+    """
+    from docker.errors import DockerException
+    from docker.utils import parse_repository_tag
+
+    repository, tag = parse_repository_tag(image_name)
+    tag = tag or "latest"
+    # parse_repository_tag splits 'name@sha256:...' into the name and the digest
+    reference = f"{repository}@{tag}" if tag.startswith("sha256:") else f"{repository}:{tag}"
+    progress = PullProgress()
+
+    with span("pull", "docker", image=reference) as pull_span:
+        for event in client.api.pull(repository, tag=tag, stream=True, decode=True):
+            if job:
+                job.check_cancelled()
+            if "error" in event:
+                raise DockerException(event["error"])
+            is_layer_event = progress.update(event)
+            # Downloading/Extracting ticks are shown on the progress bar rather than logged
+            if on_line and event.get("status") not in ("Downloading", "Extracting"):
+                text = _event_text(event)
+                if text:
+                    on_line(text)
+            if job and is_layer_event:
+                job.set_progress(progress.fraction, progress.summary())
+        pull_span.add_bytes(progress.bytes_done)
+
+    return client.images.get(reference)
+
+
+def build_image(client, context_dir, dockerfile_path, tag, on_line=None, job=None, nocache=False, timer=None):
+    """
+    Build an image with the streaming Engine API, reporting each build step on job.
+
+    timer, if given, is fed every output line (see docker_build.BuildTimer).
+    Returns the built image id.
+    """
+    from docker.errors import BuildError
+
+    dockerfile = os.path.relpath(dockerfile_path, context_dir)
+    image_id = None
+    last_lines = collections.deque(maxlen=50)
+    base_progress = PullProgress()
+
+    with span("build", "docker", tag=tag):
+        stream = client.api.build(path=context_dir, dockerfile=dockerfile, tag=tag, rm=True, nocache=nocache,
+                                  decode=True)
+        for event in stream:
+            if job:
+                job.check_cancelled()
+            if "error" in event:
+                raise BuildError(event["error"], list(last_lines))
+            if "aux" in event and "ID" in event["aux"]:
+                image_id = event["aux"]["ID"]
+
+            # Base image pulls during FROM produce the same layer events as a pull
+            if base_progress.update(event):
+                if job:
+                    job.set_progress(None, f"Pulling base image: {base_progress.summary()}")
+                continue
+
+            text = _event_text(event)
+            if not text:
+                continue
+            last_lines.append(text)
+            if timer:
+                timer.feed(text)
+            if on_line:
+                on_line(text)
+            match = STEP_PATTERN.match(text)
+            if match and job:
+                step, total = int(match.group(1)), int(match.group(2))
+                job.set_progress((step - 1) / total, f"Step {step}/{total}")
+
+    return image_id
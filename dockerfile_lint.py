@@ -0,0 +1,218 @@
+import re
+from collections import namedtuple
+
+
+Instruction = namedtuple("Instruction", "line keyword arguments")
+Finding = namedtuple("Finding", "line severity code message")
+
+SEVERITIES = ("error", "warning", "hint")
+
+KEYWORDS = {
+    "FROM", "RUN", "CMD", "LABEL", "MAINTAINER", "EXPOSE", "ENV", "ADD", "COPY", "ENTRYPOINT",
+    "VOLUME", "USER", "WORKDIR", "ARG", "ONBUILD", "STOPSIGNAL", "HEALTHCHECK", "SHELL",
+}
+# Instructions that add a filesystem layer; the rest only change metadata
+LAYER_KEYWORDS = {"RUN", "COPY", "ADD"}
+MAX_LAYERS = 20
+
+DEPENDENCY_INSTALL = re.compile(
+    r"\b(pip3?\s+install|npm\s+(install|ci)|yarn(\s+install)?\b|pnpm\s+install|mvn\b|gradle\b|"
+    r"bundle\s+install|composer\s+install|go\s+mod\s+download|cargo\s+(build|fetch))"
+)
+BUILD_TOOLS = re.compile(r"\b(mvn|gradle|go\s+build|cargo\s+build|gcc|g\+\+|make|npm\s+run\s+build|dotnet\s+publish)\b")
+PIP_INSTALL = re.compile(r"\bpip3?\s+install\b")
+APT_INSTALL = re.compile(r"\bapt(-get)?\s+(-\S+\s+)*install\b")
+APT_UPDATE = re.compile(r"\bapt(-get)?\s+update\b")
+APK_ADD = re.compile(r"\bapk\s+add\b")
+
+
+def parse_dockerfile(content):
+    """
+    Split a Dockerfile into instructions, joining backslash continuations and
+    dropping comments. Each Instruction records the line it starts on.
+    """
+    instructions = []
+    pending, start = [], None
+    for number, raw in enumerate(content.splitlines(), 1):
+        line = raw.strip()
+        if not pending and (not line or line.startswith("#")):
+            continue
+        if pending and line.startswith("#"):
+            continue  # comments may sit inside a continued instruction
+        if start is None:
+            start = number
+        if line.endswith("\\"):
+            pending.append(line[:-1].strip())
+            continue
+        pending.append(line)
+        text = " ".join(part for part in pending if part)
+        keyword, _, arguments = text.partition(" ")
+        instructions.append(Instruction(start, keyword.upper(), arguments.strip()))
+        pending, start = [], None
+    if pending:
+        text = " ".join(part for part in pending if part)
+        keyword, _, arguments = text.partition(" ")
+        instructions.append(Instruction(start, keyword.upper(), arguments.strip()))
+    return instructions
+
+
+def split_stages(instructions):
+    """Group instructions by build stage; anything before the first FROM (global ARGs) is dropped."""
+    stages = []
+    for instruction in instructions:
+        if instruction.keyword == "FROM":
+            stages.append([instruction])
+        elif stages:
+            stages[-1].append(instruction)
+    return stages
+
+
+def estimate_layers(instructions):
+    """Filesystem layers the final stage adds on top of its base image."""
+    stages = split_stages(instructions)
+    if not stages:
+        return 0
+    return sum(1 for instruction in stages[-1] if instruction.keyword in LAYER_KEYWORDS)
+
+
+def _copy_sources(arguments):
+    parts = [part for part in arguments.split() if not part.startswith("--")]
+    if arguments.lstrip().startswith("["):
+        parts = re.findall(r'"([^"]*)"', arguments)
+    return parts[:-1]
+
+
+def _copies_whole_context(instruction):
+    return instruction.keyword in ("COPY", "ADD") and "--from" not in instruction.arguments and any(
+        source in (".", "./", "*") for source in _copy_sources(instruction.arguments)
+    )
+
+
+def _lint_base(instruction, stage_names, findings):
+    parts = [part for part in instruction.arguments.split() if not part.startswith("--platform")]
+    if not parts:
+        findings.append(Finding(instruction.line, "error", "from-missing-image", "FROM needs an image"))
+        return
+    image = parts[0]
+    if "<" in image:
+        findings.append(Finding(instruction.line, "error", "placeholder-image",
+                                f"Replace the placeholder {image} with a real base image"))
+        return
+    if len(parts) >= 3 and parts[1].upper() == "AS":
+        stage_names.add(parts[2])
+    if image in stage_names or image.lower() == "scratch" or "$" in image or "@" in image:
+        return
+    tag = image.rsplit("/", 1)[-1].partition(":")[2]
+    if not tag or tag == "latest":
+        findings.append(Finding(
+            instruction.line, "warning", "unpinned-base",
+            f"Pin the base image to a version ({image} changes whenever upstream pushes)",
+        ))
+
+
+def _lint_run(instruction, findings):
+    command = instruction.arguments
+    if PIP_INSTALL.search(command) and "--no-cache-dir" not in command:
+        findings.append(Finding(
+            instruction.line, "warning", "pip-cache",
+            "Add --no-cache-dir to pip install; the download cache is dead weight in the image",
+        ))
+    if APT_INSTALL.search(command):
+        if not APT_UPDATE.search(command):
+            findings.append(Finding(
+                instruction.line, "warning", "apt-update-separate",
+                "Run apt-get update in the same RUN as apt-get install, or a cached update layer serves stale package lists",
+            ))
+        if "/var/lib/apt/lists" not in command:
+            findings.append(Finding(
+                instruction.line, "warning", "apt-cleanup",
+                "Finish with 'rm -rf /var/lib/apt/lists/*' in the same RUN to keep package lists out of the layer",
+            ))
+        if "--no-install-recommends" not in command:
+            findings.append(Finding(
+                instruction.line, "hint", "apt-recommends",
+                "Use apt-get install --no-install-recommends to skip optional packages",
+            ))
+    if APK_ADD.search(command) and "--no-cache" not in command:
+        findings.append(Finding(instruction.line, "warning", "apk-cache", "Use apk add --no-cache"))
+
+
+def lint(content):
+    """Return Findings for a Dockerfile's text, ordered by line."""
+    instructions = parse_dockerfile(content)
+    findings = []
+    if not instructions:
+        return [Finding(1, "error", "empty", "The Dockerfile has no instructions")]
+
+    first = next((i for i in instructions if i.keyword != "ARG"), None)
+    if first is None or first.keyword != "FROM":
+        findings.append(Finding(first.line if first else 1, "error", "from-first",
+                                "The first instruction (after ARGs) must be FROM"))
+
+    stage_names = set()
+    previous = None
+    for instruction in instructions:
+        if instruction.keyword not in KEYWORDS:
+            findings.append(Finding(instruction.line, "error", "unknown-instruction",
+                                    f"Unknown instruction {instruction.keyword}"))
+        elif instruction.keyword == "FROM":
+            _lint_base(instruction, stage_names, findings)
+        elif instruction.keyword == "RUN":
+            _lint_run(instruction, findings)
+            if previous is not None and previous.keyword == "RUN":
+                findings.append(Finding(
+                    instruction.line, "hint", "merge-run",
+                    f"Merge with the RUN on line {previous.line} using && to save a layer",
+                ))
+        elif instruction.keyword == "ADD" and not re.search(r"https?://|\.(tar|tgz|tar\.\w+)\b", instruction.arguments):
+            findings.append(Finding(instruction.line, "hint", "prefer-copy",
+                                    "Use COPY for local files; ADD also fetches URLs and unpacks archives"))
+        elif instruction.keyword in ("CMD", "ENTRYPOINT") and not instruction.arguments.startswith("["):
+            findings.append(Finding(
+                instruction.line, "hint", "exec-form",
+                f"Use the JSON form of {instruction.keyword} so the process receives signals directly",
+            ))
+        previous = instruction
+
+    stages = split_stages(instructions)
+    for stage in stages:
+        whole_copy = next((i for i in stage if _copies_whole_context(i)), None)
+        if whole_copy is None:
+            continue
+        install = next(
+            (i for i in stage if i.line > whole_copy.line and i.keyword == "RUN" and DEPENDENCY_INSTALL.search(i.arguments)),
+            None,
+        )
+        if install is not None:
+            findings.append(Finding(
+                whole_copy.line, "warning", "cache-busting-copy",
+                f"Copying the whole context before installing dependencies (line {install.line}) reruns the install "
+                "on every source change; copy only the dependency manifests first",
+            ))
+
+    if len(stages) == 1 and any(i.keyword == "RUN" and BUILD_TOOLS.search(i.arguments) for i in stages[0]):
+        findings.append(Finding(
+            stages[0][0].line, "hint", "multi-stage",
+            "Build in one stage and COPY --from it into a slim runtime stage so compilers and sources stay out of the image",
+        ))
+
+    layers = estimate_layers(instructions)
+    if layers > MAX_LAYERS:
+        findings.append(Finding(
+            instructions[-1].line, "warning", "layer-count",
+            f"The final stage adds {layers} layers; merge RUN/COPY steps to stay under {MAX_LAYERS}",
+        ))
+    if stages and not any(i.keyword in ("CMD", "ENTRYPOINT") for i in stages[-1]):
+        findings.append(Finding(instructions[-1].line, "hint", "no-command",
+                                "No CMD or ENTRYPOINT; containers will run the base image's default command"))
+    return sorted(findings, key=lambda finding: (finding.line, SEVERITIES.index(finding.severity)))
+
+
+def format_findings(findings, layers=None):
+    lines = [f"line {f.line:>3}  {f.severity:<7}  {f.message}  [{f.code}]" for f in findings]
+    counts = {severity: sum(1 for f in findings if f.severity == severity) for severity in SEVERITIES}
+    footer = ", ".join(f"{count} {severity}(s)" for severity, count in counts.items())
+    if layers is not None:
+        footer += f"; about {layers} layer(s) on top of the base image"
+    lines.append(footer)
+    return "\n".join(lines)
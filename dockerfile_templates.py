@@ -0,0 +1,118 @@
+import os
+
+
+TEMPLATE_NAMES = ["Custom", "Python App", "Node.js App", "Java App"]
+
+
+def load_template(template):
+    if template == "Custom":
+        dockerfile_content = (
+             "# Custom Dockerfile\n"
+            "FROM <base-image>\n"
+            "WORKDIR /app\n"
+            "COPY . .\n"
+            "# Add your commands here\n"
+            "CMD [\"your-command\"]\n"
+        )
+        additional_files = {}
+
+    elif template == "Python App":
+        dockerfile_content = (
+            "# Python Dockerfile\n"
+            "FROM python:3.9-slim\n\n"
+            "WORKDIR /app\n"
+            "COPY requirements.txt . \n"
+            "RUN pip install --no-cache-dir -r requirements.txt\n"
+            "COPY . .\n"
+            "CMD [\"python\", \"app.py\"]\n"
+        )
+        additional_files = {
+            "requirements.txt": (
+                "# Example Python requirements\n"
+                "flask==2.2.3\n"
+                "requests==2.31.0\n"
+                "numpy==1.23.5\n"
+            )
+        }
+
+    elif template == "Node.js App":
+        dockerfile_content = (
+            "# Node.js Dockerfile\n"
+            "FROM node:16\n\n"
+            "WORKDIR /app\n"
+            "COPY package*.json .\n"
+            "RUN npm install\n"
+            "COPY . .\n"
+            "CMD [\"node\", \"server.js\"]\n"
+        )
+        additional_files = {
+            "package.json": (
+                "{\n"
+                "  \"name\": \"node-app\",\n"
+                "  \"version\": \"1.0.0\",\n"
+                "  \"description\": \"Example Node.js application\",\n"
+                "  \"main\": \"server.js\",\n"
+                "  \"scripts\": {\n"
+                "    \"start\": \"node server.js\"\n"
+                "  },\n"
+                "  \"dependencies\": {\n"
+                "    \"express\": \"^4.18.2\"\n"
+                "  }\n"
+                "}\n"
+            )
+        }
+    elif template == "Java App":
+        dockerfile_content = (
+            "# Java Dockerfile: build with Maven, run on a slim JRE\n"
+            "FROM maven:3.8-openjdk-11 AS build\n\n"
+            "WORKDIR /app\n"
+            "COPY pom.xml .\n"
+            "RUN mvn -q dependency:go-offline\n"
+            "COPY src/ ./src/\n"
+            "RUN mvn -q package -DskipTests\n\n"
+            "FROM eclipse-temurin:11-jre\n"
+            "WORKDIR /app\n"
+            "COPY --from=build /app/target/myapp-1.0-SNAPSHOT.jar myapp.jar\n"
+            "CMD [\"java\", \"-jar\", \"myapp.jar\"]\n"
+        )
+        additional_files = {
+            "pom.xml": (
+                "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+                "<project xmlns=\"http://maven.apache.org/POM/4.0.0\"\n"
+                "         xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\"\n"
+                "         xsi:schemaLocation=\"http://maven.apache.org/POM/4.0.0 http://maven.apache.org/xsd/maven-4.0.0.xsd\">\n"
+                "    <modelVersion>4.0.0</modelVersion>\n\n"
+                "    <groupId>com.example</groupId>\n"
+                "    <artifactId>myapp</artifactId>\n"
+                "    <version>1.0-SNAPSHOT</version>\n\n"
+                "    <dependencies>\n"
+                "        <dependency>\n"
+                "            <groupId>org.springframework.boot</groupId>\n"
+                "            <artifactId>spring-boot-starter</artifactId>\n"
+                "            <version>2.7.0</version>\n"
+                "        </dependency>\n"
+                "    </dependencies>\n\n"
+                "</project>\n"
+            )
+        }
+    else:
+        dockerfile_content = ""
+        additional_files = {}
+
+    return dockerfile_content, additional_files
+
+
+def write_template(template, directory):
+    """
+    Write the template's Dockerfile and additional files into directory.
+    Returns the paths written, Dockerfile first.
+    """
+    dockerfile_content, additional_files = load_template(template)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for filename, content in [("Dockerfile", dockerfile_content), *additional_files.items()]:
+        path = os.path.join(directory, filename)
+        with open(path, "w") as f:
+            f.write(content)
+        paths.append(path)
+    return paths
@@ -0,0 +1,217 @@
+import collections
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+HUB_URL = os.environ.get("VMMS_HUB_URL", "https://hub.docker.com")
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".vmms", "hub-search-cache.json")
+SORT_KEYS = ("name", "stars", "pulls", "official")
+
+
+class RateLimited(Exception):
+    """The registry kept answering 429 after every retry."""
+
+
+def result_row(item):
+    """Normalize one Hub search result to the fields the table shows."""
+    return {
+        "name": item.get("repo_name") or item.get("name", ""),
+        "description": item.get("short_description") or item.get("description") or "",
+        "stars": item.get("star_count", 0) or 0,
+        "pulls": item.get("pull_count", 0) or 0,
+        "official": bool(item.get("is_official")),
+        "automated": bool(item.get("is_automated")),
+    }
+
+
+def sort_results(rows, sort_by="stars", descending=True):
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort_by}. Choose one of {', '.join(SORT_KEYS)}")
+    return sorted(rows, key=lambda row: row[sort_by], reverse=descending)
+
+
+class SearchCache:
+    """
+    Search responses kept for ttl seconds, at most max_entries of them, least
+    recently used evicted first. The cache is written to disk so it survives
+    restarts of the app and of one-shot CLI calls.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=3600, max_entries=256):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()  # key -> (stored at, data)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, (stored_at, data) in stored:
+            if now - stored_at < self.ttl:
+                self._entries[key] = (stored_at, data)
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump([[key, list(entry)] for key, entry in self._entries.items()], f)
+        os.replace(temp_path, self.path)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, data):
+        with self._lock:
+            self._entries[key] = (time.time(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+
+class RateLimiter:
+    """Token bucket: bursts of up to `burst` requests, refilled at `rate` per second."""
+
+    def __init__(self, rate=0.5, burst=10):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HubSearchClient:
+    """
+    Docker Hub repository search over HTTP, without the daemon.
+
+    Identical queries that are already in flight share one request, answers are
+    cached (see SearchCache) and requests are paced by a RateLimiter, backing off
+    on HTTP 429. base_url can point at any server with Hub's
+    /v2/search/repositories/ API, e.g. a local stand-in.
+    """
+
+    def __init__(self, base_url=None, cache=None, limiter=None, timeout=10, retries=3):
+        self.base_url = (base_url or HUB_URL).rstrip("/")
+        self.cache = cache if cache is not None else SearchCache()
+        self.limiter = limiter or RateLimiter()
+        self.timeout = timeout
+        self.retries = retries
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._session = None
+
+    def search(self, term, page=1, page_size=25):
+        """
+        Return one page: {"term", "page", "page_size", "count", "results", "cached"}.
+        results are result_row() dicts in the registry's order.
+        """
+        key = f"{self.base_url}|{term.lower()}|{page}|{page_size}"
+        data = self.cache.get(key)
+        if data is not None:
+            return {**data, "cached": True}
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return {**future.result(), "cached": True}
+
+        try:
+            data = self._fetch(term, page, page_size)
+            self.cache.put(key, data)
+            future.set_result(data)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return {**data, "cached": False}
+
+    def search_all(self, term, limit=100, page_size=25):
+        """Follow pages until limit results are collected or the registry runs out."""
+        rows, page = [], 1
+        while len(rows) < limit:
+            data = self.search(term, page=page, page_size=page_size)
+            rows.extend(data["results"])
+            if not data["results"] or page * page_size >= data["count"]:
+                break
+            page += 1
+        return rows[:limit]
+
+    def _get_session(self):
+        if self._session is None:
+            # requests comes with the docker SDK; imported on first search only
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    def _fetch(self, term, page, page_size):
+        session = self._get_session()
+        url = f"{self.base_url}/v2/search/repositories/"
+        params = {"query": term, "page": page, "page_size": page_size}
+        delay = 1.0
+        for attempt in range(1, self.retries + 1):
+            self.limiter.acquire()
+            response = session.get(url, params=params, timeout=self.timeout)
+            if response.status_code == 429:
+                if attempt == self.retries:
+                    break
+                retry_after = response.headers.get("Retry-After", "")
+                time.sleep(float(retry_after) if retry_after.isdigit() else delay)
+                delay *= 2
+                continue
+            if response.status_code == 404:
+                # Hub answers 404 for a page past the last one
+                return {"term": term, "page": page, "page_size": page_size, "count": 0, "results": []}
+            response.raise_for_status()
+            body = response.json()
+            return {
+                "term": term,
+                "page": page,
+                "page_size": page_size,
+                "count": body.get("count", 0),
+                "results": [result_row(item) for item in body.get("results", [])],
+            }
+        raise RateLimited(f"Docker Hub rate limit hit searching for {term}; try again later")
@@ -0,0 +1,100 @@
+import fnmatch
+import re
+import time
+from collections import namedtuple
+
+
+ImageRow = namedtuple("ImageRow", "repository tag id short_id created size dangling")
+
+SORT_KEYS = ("repository", "tag", "created", "size")
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}
+
+
+def parse_size(text):
+    """Parse '512MB', '1.5 GB' or a plain byte count. Returns None for blank input."""
+    text = (text or "").strip().upper()
+    if not text:
+        return None
+    match = re.fullmatch(r"([\d.]+)\s*([KMGT]?B?)", text)
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    unit = match.group(2)
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    return int(float(match.group(1)) * _SIZE_UNITS[unit])
+
+
+def image_rows(images):
+    """Expand inventory image entries into one row per repository:tag."""
+    rows = []
+    for image in images:
+        short_id = image["short_id"]
+        if not image["tags"]:
+            rows.append(ImageRow("<none>", "<none>", image["id"], short_id,
+                                 image["created"], image["size"], True))
+            continue
+        for reference in image["tags"]:
+            repository, _, tag = reference.rpartition(":")
+            # A colon inside a registry host:port is not a tag separator
+            if not repository or "/" in tag:
+                repository, tag = reference, "latest"
+            rows.append(ImageRow(repository, tag, image["id"], short_id,
+                                 image["created"], image["size"], False))
+    return rows
+
+
+def compile_pattern(pattern, regex=False):
+    """
+    Compile a search pattern into a case-insensitive regex.
+
+    Glob patterns use *, ? and [...]; a plain word matches anywhere, like grep.
+    """
+    if not pattern:
+        return None
+    if regex:
+        return re.compile(pattern, re.IGNORECASE)
+    if not any(char in pattern for char in "*?["):
+        pattern = f"*{pattern}*"
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+
+
+def query_images(rows, pattern=None, tag=None, regex=False, min_size=None, max_size=None,
+                 created_after=None, created_before=None, dangling=None,
+                 sort_by="created", descending=True, limit=None):
+    """
+    Filter and sort image rows.
+
+    pattern matches 'repository:tag' (or just the repository when tag is given),
+    tag matches the tag alone. Sizes are bytes, dates are epoch seconds.
+    """
+    name_re = compile_pattern(pattern, regex)
+    tag_re = compile_pattern(tag, regex)
+
+    def matches(row):
+        if dangling is not None and row.dangling != dangling:
+            return False
+        if min_size is not None and row.size < min_size:
+            return False
+        if max_size is not None and row.size > max_size:
+            return False
+        if created_after is not None and row.created < created_after:
+            return False
+        if created_before is not None and row.created > created_before:
+            return False
+        if tag_re is not None and not tag_re.search(row.tag):
+            return False
+        if name_re is not None:
+            subject = row.repository if tag_re is not None else f"{row.repository}:{row.tag}"
+            if not (name_re.search(subject) or name_re.match(row.short_id)):
+                return False
+        return True
+
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Cannot sort by {sort_by}; choose one of {', '.join(SORT_KEYS)}")
+    results = sorted(filter(matches, rows), key=lambda row: getattr(row, sort_by), reverse=descending)
+    return results[:limit] if limit else results
+
+
+def days_ago(days):
+    return time.time() - days * 86400
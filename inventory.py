@@ -0,0 +1,275 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+
+# Events are replayed from a little before each load, so changes made while the
+# list calls ran are not missed; this also absorbs clock skew with the daemon.
+# Handling an event twice is harmless: handlers re-read the object.
+EVENT_OVERLAP = 5
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SubstringIndex:
+    """
+    Trigram index over the searchable strings (names, tags, ids) of each item.
+
+    Queries of three or more characters only look at items that share every trigram
+    of the query; shorter queries fall back to a scan of the in-memory keys. Full
+    ids are kept in a sorted list for prefix lookups.
+    """
+
+    def __init__(self):
+        self._keys = {}  # item id -> list of lowercased keys
+        self._grams = defaultdict(set)  # trigram -> item ids
+        self._ids = []  # sorted full ids for prefix search
+
+    def add(self, item_id, keys):
+        self.remove(item_id)
+        keys = [key.lower() for key in keys if key]
+        self._keys[item_id] = keys
+        for key in keys:
+            for gram in _trigrams(key):
+                self._grams[gram].add(item_id)
+        bisect.insort(self._ids, item_id)
+
+    def remove(self, item_id):
+        keys = self._keys.pop(item_id, None)
+        if keys is None:
+            return
+        for key in keys:
+            for gram in _trigrams(key):
+                ids = self._grams.get(gram)
+                if ids:
+                    ids.discard(item_id)
+                    if not ids:
+                        del self._grams[gram]
+        position = bisect.bisect_left(self._ids, item_id)
+        if position < len(self._ids) and self._ids[position] == item_id:
+            del self._ids[position]
+
+    def clear(self):
+        self._keys.clear()
+        self._grams.clear()
+        self._ids.clear()
+
+    def prefix(self, query):
+        """Item ids whose full id starts with query."""
+        query = query.lower()
+        start = bisect.bisect_left(self._ids, query)
+        matches = []
+        for item_id in self._ids[start:]:
+            if not item_id.startswith(query):
+                break
+            matches.append(item_id)
+        return matches
+
+    def search(self, query):
+        """Item ids with a key containing query, plus ids starting with it."""
+        query = query.lower()
+        if len(query) < 3:
+            candidates = self._keys.keys()
+        else:
+            gram_sets = sorted((self._grams.get(gram, set()) for gram in _trigrams(query)), key=len)
+            candidates = set.intersection(*gram_sets) if gram_sets else set()
+        matches = {item_id for item_id in candidates if any(query in key for key in self._keys[item_id])}
+        matches.update(self.prefix(query))
+        return matches
+
+
+def _hex_id(image_id):
+    return image_id.split(":")[-1]
+
+
+def image_row(summary):
+    tags = [tag for tag in (summary.get("RepoTags") or []) if tag != "<none>:<none>"]
+    return {
+        "id": summary["Id"],
+        "short_id": _hex_id(summary["Id"])[:12],
+        "tags": tags,
+        "repo_digests": summary.get("RepoDigests") or [],
+        "created": summary.get("Created", 0),
+        "size": summary.get("Size", 0),
+        "dangling": not tags,
+        "labels": summary.get("Labels") or {},
+    }
+
+
+def container_row(summary):
+    names = [name.lstrip("/") for name in (summary.get("Names") or [])]
+    return {
+        "id": summary["Id"],
+        "short_id": summary["Id"][:12],
+        "name": names[0] if names else summary["Id"][:12],
+        "image": summary.get("Image", ""),
+        "state": summary.get("State", ""),
+        "status": summary.get("Status", ""),
+        "created": summary.get("Created", 0),
+        "labels": summary.get("Labels") or {},
+    }
+
+
+class Inventory:
+    """
+    In-process cache of local images and containers.
+
+    The cache is loaded once from the list endpoints (no per-container inspect) and
+    then kept current from the daemon's event stream instead of being re-queried
+    for every list or search.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._images = {}
+        self._containers = {}
+        self._image_index = SubstringIndex()
+        self._container_index = SubstringIndex()
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._events = None
+        self._since = None  # daemon time to replay events from when (re)subscribing
+        self._thread = None
+        self._stopped = threading.Event()
+        self.loaded = threading.Event()
+
+    def start(self):
+        """Load the inventory and follow daemon events in a background thread."""
+        if self._thread is not None:
+            return
+        self._since = int(time.time()) - EVENT_OVERLAP
+        self.reload()
+        self._thread = threading.Thread(target=self._follow_events, name="inventory-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._events is not None:
+            self._events.close()
+
+    def add_listener(self, callback):
+        """callback(kind) is called from the events thread when 'images' or 'containers' change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def reload(self):
+        self._reload_images()
+        self._reload_containers()
+        self.loaded.set()
+
+    def images(self):
+        with self._lock:
+            return list(self._images.values())
+
+    def containers(self, running_only=False):
+        with self._lock:
+            rows = list(self._containers.values())
+        if running_only:
+            rows = [row for row in rows if row["state"] == "running"]
+        return rows
+
+    def search_images(self, query):
+        with self._lock:
+            return [self._images[image_id] for image_id in self._image_index.search(query)]
+
+    def search_containers(self, query):
+        with self._lock:
+            return [self._containers[container_id] for container_id in self._container_index.search(query)]
+
+    def _reload_images(self):
+        rows = [image_row(summary) for summary in self.client.api.images()]
+        with self._lock:
+            # Keyed by the bare hex digest so id prefixes can be searched directly
+            self._images = {_hex_id(row["id"]): row for row in rows}
+            self._image_index.clear()
+            for row in rows:
+                self._index_image(row)
+        self._notify("images")
+
+    def _reload_containers(self):
+        rows = [container_row(summary) for summary in self.client.api.containers(all=True)]
+        with self._lock:
+            self._containers = {row["id"]: row for row in rows}
+            self._container_index.clear()
+            for row in rows:
+                self._index_container(row)
+        self._notify("containers")
+
+    def _index_image(self, row):
+        self._image_index.add(_hex_id(row["id"]), row["tags"] + [row["short_id"]])
+
+    def _index_container(self, row):
+        self._container_index.add(row["id"], [row["name"], row["short_id"], row["image"]])
+
+    def _refresh_container(self, container_id):
+        summaries = self.client.api.containers(all=True, filters={"id": container_id})
+        with self._lock:
+            if summaries:
+                row = container_row(summaries[0])
+                self._containers[row["id"]] = row
+                self._index_container(row)
+            else:
+                self._remove_container(container_id)
+        self._notify("containers")
+
+    def _remove_container(self, container_id):
+        with self._lock:
+            self._containers.pop(container_id, None)
+            self._container_index.remove(container_id)
+
+    def _handle_event(self, event):
+        event_type = event.get("Type")
+        action = event.get("Action", "")
+        actor_id = event.get("Actor", {}).get("ID") or event.get("id")
+        if event_type == "container" and actor_id:
+            # exec and health events don't change anything we show
+            if action.startswith(("exec_", "health_status")):
+                return
+            if action == "destroy":
+                self._remove_container(actor_id)
+                self._notify("containers")
+            else:
+                self._refresh_container(actor_id)
+        elif event_type == "image":
+            # Image events are comparatively rare; one list call keeps tags consistent
+            self._reload_images()
+
+    def _follow_events(self):
+        backoff = 1
+        while not self._stopped.is_set():
+            try:
+                self._events = self.client.events(
+                    decode=True, filters={"type": ["container", "image"]}, since=self._since
+                )
+                backoff = 1
+                for event in self._events:
+                    self._handle_event(event)
+                    self._since = max(self._since, event.get("time", 0) - EVENT_OVERLAP)
+            except Exception as e:
+                if self._stopped.is_set():
+                    return
+                print(f"Inventory event stream error: {e}")
+            if self._stopped.is_set():
+                return
+            # The daemon only keeps recent events, so resync as well as replaying from since
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+            try:
+                since = int(time.time()) - EVENT_OVERLAP
+                self.reload()
+                self._since = since
+            except Exception as e:
+                print(f"Inventory reload failed: {e}")
+
+    def _notify(self, kind):
+        for listener in list(self._listeners):
+            try:
+                listener(kind)
+            except Exception as e:
+                print(f"Error in inventory listener: {e}")
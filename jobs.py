@@ -0,0 +1,228 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from telemetry import span
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when the user cancels the job."""
+
+
+class Job:
+    """A single background operation (pull, build, VM, ...) tracked by the executor."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name, executor):
+        self.id = next(Job._ids)
+        self.name = name
+        self.status = QUEUED
+        self.progress = None  # None = indeterminate, otherwise 0.0 - 1.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.dedicated = False
+        self._executor = executor
+        self._cancel_event = threading.Event()
+        self._cancel_callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def cancel(self):
+        # Mark the job as cancelled and run any hooks (e.g. killing a subprocess)
+        with self._lock:
+            if self.finished or self._cancel_event.is_set():
+                return
+            self._cancel_event.set()
+            callbacks = list(self._cancel_callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error cancelling job {self.name}: {e}")
+        self._executor._notify(self)
+
+    def on_cancel(self, callback):
+        """Register a callback that is run when the job is cancelled."""
+        with self._lock:
+            if not self._cancel_event.is_set():
+                self._cancel_callbacks.append(callback)
+                return
+        callback()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the user asked to stop this job."""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def wait_cancelled(self, timeout=None):
+        return self._cancel_event.wait(timeout)
+
+    def set_progress(self, progress=None, message=None):
+        """Update progress (0.0 - 1.0, or None for indeterminate) from the worker thread."""
+        self.progress = progress
+        if message is not None:
+            self.message = message
+        self._executor._notify(self)
+
+
+class JobExecutor:
+    """
+    Run blocking Docker/QEMU work off the Tk thread.
+
+    Worker threads never touch Tk widgets. Completion callbacks and job updates are
+    pushed onto a queue which is drained on the Tk thread with root.after().
+    """
+
+    def __init__(self, max_workers=8, poll_interval=50):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._ui_queue = queue.Queue()
+        self._poll_interval = poll_interval
+        self._root = None
+        self._listeners = []
+        self._pending_updates = set()
+        self._updates_lock = threading.Lock()
+        self.jobs = []
+
+    def attach(self, root):
+        """Start draining the UI queue on the given Tk root."""
+        self._root = root
+        root.after(self._poll_interval, self._drain)
+
+    def add_listener(self, callback):
+        """Call callback(job) on the Tk thread whenever a job changes state or progress."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def submit(self, name, fn, *args, on_done=None, on_error=None, dedicated=False, **kwargs):
+        """
+        Run fn(job, *args, **kwargs) in the background and return the Job.
+
+        on_done(result) and on_error(exception) run on the Tk thread. Long-lived work
+        such as a running VM should pass dedicated=True so it gets its own thread
+        instead of holding a pool slot.
+        """
+        job = Job(name, self)
+        job.dedicated = dedicated
+        self.jobs.append(job)
+        self._notify(job)
+        if dedicated:
+            threading.Thread(
+                target=self._run, args=(job, fn, args, kwargs, on_done, on_error),
+                name=f"job-{job.id}", daemon=True,
+            ).start()
+        else:
+            self._pool.submit(self._run, job, fn, args, kwargs, on_done, on_error)
+        return job
+
+    def call_in_ui(self, fn, *args):
+        """Schedule fn(*args) to run on the Tk thread."""
+        self._ui_queue.put((fn, args))
+
+    def active_jobs(self):
+        return [job for job in self.jobs if not job.finished]
+
+    def clear_finished(self):
+        self.jobs = [job for job in self.jobs if not job.finished]
+
+    def shutdown(self, cancel=True):
+        """
+        Stop the pool, cancelling pooled jobs. Dedicated jobs run on daemon threads
+        and are left alone, so e.g. VMs outlive the window.
+        """
+        if cancel:
+            for job in self.active_jobs():
+                if not job.dedicated:
+                    job.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, fn, args, kwargs, on_done, on_error):
+        if job.cancelled:
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._notify(job)
+        try:
+            # Jobs are grouped by the first word of their name: "Pull", "Build", ...
+            with span(job.name.split(" ", 1)[0].lower(), "job", queued=job.started_at - job.submitted_at):
+                job.result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+            return
+        except Exception as e:
+            job.error = e
+            job.message = str(e)
+            # A job whose process was killed on cancel usually fails; report it as cancelled
+            self._finish(job, CANCELLED if job.cancelled else FAILED)
+            if on_error and not job.cancelled:
+                self.call_in_ui(on_error, e)
+            return
+        self._finish(job, CANCELLED if job.cancelled else DONE)
+        if on_done and not job.cancelled:
+            self.call_in_ui(on_done, job.result)
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        if status == DONE and job.progress is not None:
+            job.progress = 1.0
+        self._notify(job)
+
+    def _notify(self, job):
+        # Coalesce bursts of progress updates into one UI notification per job per tick
+        with self._updates_lock:
+            if job.id in self._pending_updates:
+                return
+            self._pending_updates.add(job.id)
+        self._ui_queue.put((self._fire_listeners, (job,)))
+
+    def _fire_listeners(self, job):
+        with self._updates_lock:
+            self._pending_updates.discard(job.id)
+        for listener in list(self._listeners):
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"Error in job listener: {e}")
+
+    def _drain(self):
+        try:
+            while True:
+                fn, args = self._ui_queue.get_nowait()
+                try:
+                    fn(*args)
+                except Exception as e:
+                    print(f"Error in UI callback: {e}")
+        except queue.Empty:
+            pass
+        if self._root is not None:
+            try:
+                self._root.after(self._poll_interval, self._drain)
+            except Exception:
+                # The window has been destroyed
+                pass
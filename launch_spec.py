@@ -0,0 +1,184 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+
+
+TEMPLATES_PATH = os.path.join(os.path.expanduser("~"), ".vmms", "templates.json")
+RESTART_POLICIES = ("no", "on-failure", "always", "unless-stopped")
+
+
+@dataclass
+class LaunchSpec:
+    """Everything needed to run a container, with resource limits. Saved as a template."""
+
+    image: str
+    name: str = ""
+    command: str = ""
+    cpu_period: int = 100000
+    cpu_quota: int = 0  # microseconds per cpu_period; 50000 = half a CPU
+    cpuset_cpus: str = ""  # e.g. "0-3" or "2,4"
+    mem_limit: str = ""  # e.g. "512m", "2g"
+    memswap_limit: str = ""
+    shm_size: str = ""
+    ulimits: dict = field(default_factory=dict)  # name -> [soft, hard]
+    tmpfs: dict = field(default_factory=dict)  # container path -> mount options
+    network_mode: str = ""
+    volumes: list = field(default_factory=list)  # "host:container[:ro|rw]"
+    restart_policy: str = "no"
+    restart_max_retries: int = 0
+    environment: dict = field(default_factory=dict)
+    labels: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown launch spec fields: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def to_dict(self):
+        return asdict(self)
+
+    def validate(self):
+        if not self.image:
+            raise ValueError("A launch spec needs an image")
+        if self.restart_policy not in RESTART_POLICIES:
+            raise ValueError(f"restart_policy must be one of {', '.join(RESTART_POLICIES)}")
+        if self.cpu_quota and self.cpu_quota < 1000:
+            raise ValueError("cpu_quota must be at least 1000 microseconds")
+        if self.cpuset_cpus and not re.fullmatch(r"\d+(-\d+)?(,\d+(-\d+)?)*", self.cpuset_cpus):
+            raise ValueError(f"Invalid cpuset: {self.cpuset_cpus}")
+        for limit in (self.mem_limit, self.memswap_limit, self.shm_size):
+            if limit and not re.fullmatch(r"\d+[bkmg]?", limit.lower()):
+                raise ValueError(f"Invalid size: {limit} (use e.g. 512m or 2g)")
+        for volume in self.volumes:
+            if len(volume.split(":")) < 2:
+                raise ValueError(f"Volume must be host:container[:mode], got {volume}")
+        return self
+
+    def run_kwargs(self, name=None):
+        """Keyword arguments for client.containers.run()."""
+        from docker.types import Ulimit
+
+        self.validate()
+        kwargs = {"detach": True}
+        if name or self.name:
+            kwargs["name"] = name or self.name
+        if self.command:
+            kwargs["command"] = self.command
+        if self.cpu_quota:
+            kwargs["cpu_period"] = self.cpu_period
+            kwargs["cpu_quota"] = self.cpu_quota
+        if self.cpuset_cpus:
+            kwargs["cpuset_cpus"] = self.cpuset_cpus
+        if self.mem_limit:
+            kwargs["mem_limit"] = self.mem_limit
+        if self.memswap_limit:
+            kwargs["memswap_limit"] = self.memswap_limit
+        if self.shm_size:
+            kwargs["shm_size"] = self.shm_size
+        if self.ulimits:
+            kwargs["ulimits"] = [Ulimit(name=n, soft=int(soft), hard=int(hard)) for n, (soft, hard) in self.ulimits.items()]
+        if self.tmpfs:
+            kwargs["tmpfs"] = dict(self.tmpfs)
+        if self.network_mode:
+            kwargs["network_mode"] = self.network_mode
+        if self.volumes:
+            kwargs["volumes"] = list(self.volumes)
+        if self.restart_policy != "no":
+            policy = {"Name": self.restart_policy}
+            if self.restart_policy == "on-failure" and self.restart_max_retries:
+                policy["MaximumRetryCount"] = self.restart_max_retries
+            kwargs["restart_policy"] = policy
+        if self.environment:
+            kwargs["environment"] = dict(self.environment)
+        if self.labels:
+            kwargs["labels"] = dict(self.labels)
+        return kwargs
+
+
+def parse_ulimits(text):
+    """'nofile=1024:4096, nproc=512' -> {'nofile': [1024, 4096], 'nproc': [512, 512]}"""
+    ulimits = {}
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        name, _, values = part.partition("=")
+        soft, _, hard = values.partition(":")
+        ulimits[name.strip()] = [int(soft), int(hard or soft)]
+    return ulimits
+
+
+def parse_mapping(text, separator="="):
+    """'a=1, b=2' -> {'a': '1', 'b': '2'}; used for tmpfs, env and labels fields."""
+    mapping = {}
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        key, _, value = part.partition(separator)
+        mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def load_templates(path=TEMPLATES_PATH):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {name: LaunchSpec.from_dict(spec) for name, spec in data.items()}
+
+
+def save_template(name, spec, path=TEMPLATES_PATH):
+    spec.validate()
+    templates = load_templates(path)
+    templates[name] = spec
+    _write_templates(templates, path)
+
+
+def delete_template(name, path=TEMPLATES_PATH):
+    templates = load_templates(path)
+    if templates.pop(name, None) is not None:
+        _write_templates(templates, path)
+
+
+def _write_templates(templates, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump({name: spec.to_dict() for name, spec in templates.items()}, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def replica_names(spec, replicas):
+    if not spec.name:
+        return [None] * replicas
+    if replicas == 1:
+        return [spec.name]
+    return [f"{spec.name}-{index}" for index in range(1, replicas + 1)]
+
+
+def launch(client, spec, replicas=1, max_workers=8, on_result=None, job=None):
+    """
+    Run `replicas` containers from spec concurrently; named name-1..name-N.
+    Returns one result dict per replica; failures are reported, not raised.
+    """
+    spec.validate()
+
+    def run_one(name):
+        result = {"name": name, "id": None, "status": "started", "error": None}
+        try:
+            if job:
+                job.check_cancelled()
+            container = client.containers.run(spec.image, **spec.run_kwargs(name))
+            result["id"], result["name"] = container.id, container.name
+        except Exception as e:
+            if job and job.cancelled:
+                result["status"], result["error"] = "skipped", "cancelled"
+            else:
+                result["status"], result["error"] = "failed", str(e)
+        if on_result:
+            on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, replicas))) as pool:
+        return list(pool.map(run_one, replica_names(spec, replicas)))
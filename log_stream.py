@@ -0,0 +1,122 @@
+import collections
+import os
+import subprocess
+import threading
+
+from telemetry import span
+
+
+class LogPipeline:
+    """
+    Thread-safe, batched writer for a Tk Text log widget.
+
+    Any thread may call write(). Lines are buffered and flushed to the widget once
+    per frame in a single insert, and the widget is trimmed to the last max_lines
+    lines so long build logs stay cheap to render.
+    """
+
+    def __init__(self, widget, max_lines=5000, frame_ms=50):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.frame_ms = frame_ms
+        # Lines older than max_lines would be trimmed anyway, so the pending buffer is bounded too
+        self._pending = collections.deque(maxlen=max_lines)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        widget.after(frame_ms, self._flush)
+
+    def write(self, message):
+        """Queue a message (possibly several lines) for display."""
+        self.write_lines(str(message).split("\n"))
+
+    def write_lines(self, lines):
+        with self._lock:
+            for line in lines:
+                if len(self._pending) == self._pending.maxlen:
+                    self._dropped += 1
+                self._pending.append(line)
+
+    def close(self):
+        self._closed = True
+
+    def clear(self):
+        """Drop pending lines and empty the widget. Call on the Tk thread."""
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+        self.widget.config(state="normal")
+        self.widget.delete("1.0", "end")
+        self.widget.config(state="disabled")
+
+    def _flush(self):
+        if self._closed:
+            return
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+        if lines:
+            if dropped:
+                lines.insert(0, f"... {dropped} lines skipped ...")
+            try:
+                self._insert(lines)
+            except Exception:
+                # The widget has been destroyed
+                self._closed = True
+                return
+        try:
+            self.widget.after(self.frame_ms, self._flush)
+        except Exception:
+            self._closed = True
+
+    def _insert(self, lines):
+        widget = self.widget
+        # Only follow the output if the user hasn't scrolled up to read something
+        at_bottom = widget.yview()[1] >= 0.999
+        widget.config(state="normal")
+        widget.insert("end", "\n".join(lines) + "\n")
+        line_count = int(widget.index("end-1c").split(".")[0]) - 1
+        if line_count > self.max_lines:
+            widget.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+        if at_bottom:
+            widget.yview("end")
+        widget.config(state="disabled")
+
+
+_pipelines = {}
+
+
+def get_log_pipeline(widget, **kwargs):
+    """Return the pipeline for a log widget, creating it (on the Tk thread) if needed."""
+    pipeline = _pipelines.get(widget)
+    if pipeline is None:
+        pipeline = _pipelines[widget] = LogPipeline(widget, **kwargs)
+    return pipeline
+
+
+def stream_process(cmd, on_line, job=None, tail_lines=50, **popen_kwargs):
+    """
+    Run cmd and call on_line(line) for each line of combined stdout/stderr as it arrives.
+
+    Returns (returncode, tail) where tail holds the last tail_lines lines, which is
+    enough to report an error without keeping the whole output in memory.
+    """
+    op = " ".join([os.path.basename(cmd[0])] + [arg for arg in cmd[1:3] if not arg.startswith("-")])
+    with span(op, "subprocess") as process_span:
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, bufsize=1, errors="replace", **popen_kwargs
+        )
+        if job:
+            job.on_cancel(process.terminate)
+        tail = collections.deque(maxlen=tail_lines)
+        for line in process.stdout:
+            process_span.add_bytes(len(line))
+            line = line.rstrip("\r\n")
+            tail.append(line)
+            on_line(line)
+        process.stdout.close()
+        returncode = process.wait()
+        process_span.set(returncode=returncode)
+    return returncode, "\n".join(tail)
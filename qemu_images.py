@@ -0,0 +1,235 @@
+import json
+import os
+import re
+import subprocess
+
+from telemetry import span
+
+
+PREALLOCATION_MODES = ("off", "metadata", "falloc", "full")
+# Snapshot names end up on a monitor command line, so keep them to one plain word
+SNAPSHOT_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class QemuImgError(Exception):
+    """A qemu-img command failed; the message carries its stderr."""
+
+
+def run_qemu_img(args):
+    cmd = ["qemu-img"] + [str(arg) for arg in args]
+    try:
+        with span(f"qemu-img {cmd[1]}", "qemu"):
+            result = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    except FileNotFoundError:
+        raise QemuImgError("qemu-img was not found on PATH")
+    except subprocess.CalledProcessError as e:
+        raise QemuImgError(f"{' '.join(cmd)} failed: {e.stderr.strip() or e.stdout.strip()}")
+    return result.stdout
+
+
+def info(path, backing_chain=False, force_share=False):
+    """
+    qemu-img info as a dict (or a list of dicts, image first, with backing_chain).
+    force_share reads an image a running VM holds locked; the result may be slightly stale.
+    """
+    args = ["info", "--output=json"]
+    if backing_chain:
+        args.append("--backing-chain")
+    if force_share:
+        args.append("-U")
+    return json.loads(run_qemu_img(args + [path]))
+
+
+def backing_path(path, details):
+    """Absolute path of the image's backing file, or None for a standalone image."""
+    backing = details.get("full-backing-filename") or details.get("backing-filename")
+    if not backing:
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)), backing))
+
+
+def measure(path, output_format="qcow2"):
+    """Bytes a fresh copy of path would need: {"required": ..., "fully-allocated": ...}."""
+    return json.loads(run_qemu_img(["measure", "--output=json", "-O", output_format, path]))
+
+
+def allocated_size(path):
+    """Bytes the file actually occupies on disk, which is less than its length when sparse."""
+    return os.stat(path).st_blocks * 512
+
+
+def create_image(name, size, location, preallocation="off", cluster_size=None,
+                 backing_file=None, backing_format="qcow2"):
+    """
+    Create a qcow2 image of `size` MB in location and return its path.
+
+    With backing_file the image is a thin overlay that only stores blocks written
+    after creation; size may then be None to inherit the base image's size.
+    """
+    if preallocation not in PREALLOCATION_MODES:
+        raise ValueError(f"preallocation must be one of {', '.join(PREALLOCATION_MODES)}")
+    if backing_file and preallocation not in ("off", "metadata"):
+        # Fully allocating an overlay would defeat the point of sharing the base
+        raise ValueError("Overlays only support preallocation=off or metadata")
+    os.makedirs(location, exist_ok=True)
+
+    image_path = os.path.join(location, f"{name}.img")
+    options = [f"preallocation={preallocation}"]
+    if cluster_size:
+        options.append(f"cluster_size={cluster_size}")
+    args = ["create", "-f", "qcow2", "-o", ",".join(options)]
+    if backing_file:
+        args += ["-b", os.path.abspath(backing_file), "-F", backing_format]
+    args.append(image_path)
+    if size:
+        args.append(f"{size}M")
+    run_qemu_img(args)
+    return image_path
+
+
+def create_overlay(base_image, name, location=None):
+    location = location or os.path.dirname(os.path.abspath(base_image))
+    base_format = info(base_image).get("format", "qcow2")
+    return create_image(name, None, location, backing_file=base_image, backing_format=base_format)
+
+
+def clone_image(base_image, name, location=None, count=1):
+    """
+    Clone a VM disk as overlays on base_image, which stays read-only and shared.
+    Returns the new image paths (name, name-2, ... when count > 1).
+    """
+    location = location or os.path.dirname(os.path.abspath(base_image))
+    base_format = info(base_image).get("format", "qcow2")
+    names = [name] if count == 1 else [f"{name}-{index}" for index in range(1, count + 1)]
+    return [
+        create_image(clone_name, None, location, backing_file=base_image, backing_format=base_format)
+        for clone_name in names
+    ]
+
+
+def commit(overlay):
+    """Merge an overlay's changes down into its backing file."""
+    run_qemu_img(["commit", overlay])
+
+
+def rebase(image, new_backing, backing_format="qcow2", unsafe=False):
+    """Point image at a new backing file; safe mode copies any differing data."""
+    args = ["rebase", "-f", "qcow2"]
+    if unsafe:
+        args.append("-u")
+    if new_backing:
+        args += ["-b", os.path.abspath(new_backing), "-F", backing_format]
+    else:
+        # An empty backing file flattens the image into a standalone one
+        args += ["-b", ""]
+    run_qemu_img(args + [image])
+
+
+def check_snapshot_name(name):
+    if not SNAPSHOT_NAME.match(name or ""):
+        raise ValueError(f"Invalid snapshot name {name!r}: use letters, digits, '.', '_' and '-'")
+
+
+def snapshots(path, force_share=False):
+    """Internal snapshots stored in the image, oldest first."""
+    return info(path, force_share=force_share).get("snapshots", [])
+
+
+def create_snapshot(path, name):
+    """Save the image's current disk state as an internal snapshot. No VM may be using it."""
+    check_snapshot_name(name)
+    if any(snapshot["name"] == name for snapshot in snapshots(path)):
+        raise QemuImgError(f"{path} already has a snapshot named {name}")
+    run_qemu_img(["snapshot", "-c", name, path])
+
+
+def apply_snapshot(path, name):
+    """Revert the image's disk to an internal snapshot. Only unallocated clusters are touched, so it is fast."""
+    run_qemu_img(["snapshot", "-a", name, path])
+
+
+def delete_snapshot(path, name):
+    run_qemu_img(["snapshot", "-d", name, path])
+
+
+def reset_overlay(path):
+    """
+    Discard everything written to an overlay by replacing it with an empty one on
+    the same backing file. Takes milliseconds whatever the overlay's size.
+    Returns the backing file.
+    """
+    details = info(path)
+    backing = backing_path(path, details)
+    if not backing:
+        raise QemuImgError(f"{path} is not an overlay; restore an internal snapshot instead")
+    backing_format = details.get("backing-filename-format", "qcow2")
+    temp_path = path + ".reset"
+    try:
+        run_qemu_img(["create", "-f", "qcow2", "-b", backing, "-F", backing_format, temp_path])
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return backing
+
+
+def snapshot_tree(paths):
+    """
+    Images as a forest linked by backing file, each node
+    {"path", "format", "virtual-size", "actual-size", "snapshots", "children", "error"}.
+    Backing files outside paths are added as roots so every chain is complete.
+    """
+    nodes = {}
+    pending = [os.path.abspath(path) for path in paths]
+    while pending:
+        path = pending.pop()
+        if path in nodes:
+            continue
+        node = {"path": path, "format": None, "virtual-size": 0, "actual-size": 0, "snapshots": [],
+                "backing": None, "children": [], "error": None}
+        try:
+            # Images of running VMs are locked; a shared read is fine for listing
+            details = info(path, force_share=True)
+            node.update({key: details.get(key, node[key])
+                         for key in ("format", "virtual-size", "actual-size", "snapshots")})
+            node["backing"] = backing_path(path, details)
+        except (OSError, QemuImgError) as e:
+            node["error"] = str(e)
+        nodes[path] = node
+        if node["backing"] and os.path.exists(node["backing"]):
+            pending.append(node["backing"])
+    roots = []
+    for path in sorted(nodes):
+        node = nodes[path]
+        parent = nodes.get(node["backing"])
+        (parent["children"] if parent else roots).append(node)
+    return roots
+
+
+def convert(source, destination, output_format="qcow2", compress=False, preallocation=None):
+    args = ["convert", "-p", "-O", output_format]
+    if compress:
+        args.append("-c")
+    if preallocation:
+        args += ["-o", f"preallocation={preallocation}"]
+    run_qemu_img(args + [source, destination])
+    return destination
+
+
+def compact(image, compress=False):
+    """
+    Rewrite a standalone qcow2 image without its unused clusters.
+    Returns the number of bytes saved on disk.
+    """
+    details = info(image)
+    if details.get("backing-filename"):
+        raise QemuImgError(f"{image} is an overlay; commit or flatten it before compacting")
+    before = allocated_size(image)
+    temp_path = image + ".compact"
+    try:
+        convert(image, temp_path, "qcow2", compress=compress)
+        os.replace(temp_path, image)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return before - allocated_size(image)
@@ -0,0 +1,143 @@
+import os
+from dataclasses import asdict, dataclass, field, replace
+
+
+@dataclass
+class BootProfile:
+    """How a VM's display, disk, network, memory and CPUs are set up."""
+
+    name: str
+    display: str = "sdl"  # sdl | vnc | none
+    vnc_display: int = 0  # first display to try; QEMU takes the next free one up to :99
+    disk_bus: str = "ide"  # ide | virtio-blk | virtio-scsi
+    cache: str = "writeback"  # writeback | none | directsync | unsafe
+    aio: str = "threads"  # threads | native | io_uring
+    iothreads: int = 0
+    net: str = "default"  # default (QEMU's emulated NIC) | user | tap
+    tap_ifname: str = ""
+    vhost: bool = False
+    hugepages: bool = False
+    hugepage_path: str = "/dev/hugepages"
+    cpu_pinning: list = field(default_factory=list)  # host CPUs for vCPU threads
+
+    def validate(self):
+        if self.display not in ("sdl", "vnc", "none"):
+            raise ValueError(f"Unknown display: {self.display}")
+        if self.disk_bus not in ("ide", "virtio-blk", "virtio-scsi"):
+            raise ValueError(f"Unknown disk bus: {self.disk_bus}")
+        if self.aio not in ("threads", "native", "io_uring"):
+            raise ValueError(f"Unknown aio mode: {self.aio}")
+        if self.aio == "native" and self.cache not in ("none", "directsync"):
+            raise ValueError("aio=native needs O_DIRECT: use cache=none or cache=directsync")
+        if self.iothreads and self.disk_bus == "ide":
+            raise ValueError("iothreads need a virtio-blk or virtio-scsi disk")
+        if self.net not in ("default", "user", "tap"):
+            raise ValueError(f"Unknown network mode: {self.net}")
+        if self.vhost and self.net != "tap":
+            raise ValueError("vhost-net needs a tap network (net='tap')")
+        if self.hugepages and not os.path.isdir(self.hugepage_path):
+            raise ValueError(f"Hugepage mount {self.hugepage_path} not found")
+        return self
+
+    def to_dict(self):
+        return asdict(self)
+
+
+PROFILES = {
+    # The original interactive setup: SDL window, IDE disk, default NIC
+    "desktop": BootProfile("desktop"),
+    "headless": BootProfile(
+        "headless", display="none", disk_bus="virtio-blk", cache="none", aio="io_uring",
+        iothreads=1, net="user",
+    ),
+    "headless-vnc": BootProfile(
+        "headless-vnc", display="vnc", disk_bus="virtio-blk", cache="none", aio="io_uring",
+        iothreads=1, net="user",
+    ),
+    "server-virtio-blk": BootProfile(
+        "server-virtio-blk", display="none", disk_bus="virtio-blk", cache="none", aio="native",
+        iothreads=1, net="tap", tap_ifname="tap0", vhost=True, hugepages=True,
+    ),
+    "server-virtio-scsi": BootProfile(
+        "server-virtio-scsi", display="none", disk_bus="virtio-scsi", cache="none", aio="native",
+        iothreads=1, net="tap", tap_ifname="tap0", vhost=True, hugepages=True,
+    ),
+}
+
+
+def get_profile(name_or_dict, **overrides):
+    """Look up a built-in profile by name (or rebuild one from a saved dict) with overrides."""
+    if isinstance(name_or_dict, dict):
+        profile = BootProfile(**name_or_dict)
+    elif name_or_dict in PROFILES:
+        profile = PROFILES[name_or_dict]
+    else:
+        raise ValueError(f"Unknown boot profile: {name_or_dict}. Choose one of {', '.join(PROFILES)}")
+    return replace(profile, **overrides) if overrides else profile
+
+
+def parse_cpu_list(text):
+    """Parse a host CPU list like '2-5,8' into [2, 3, 4, 5, 8]."""
+    cpus = []
+    for part in (text or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def build_qemu_command(profile, ram, cores, imagefile, isofile=None, disk_format="qcow2"):
+    profile.validate()
+    cmd = ["qemu-system-x86_64"]
+    machine = "q35,accel=kvm"
+
+    if profile.hugepages:
+        # Guest RAM backed by preallocated hugepages avoids TLB misses and page faults
+        cmd += ["-object", f"memory-backend-file,id=mem0,size={ram}M,"
+                           f"mem-path={profile.hugepage_path},share=on,prealloc=on"]
+        machine += ",memory-backend=mem0"
+
+    if profile.disk_bus == "ide":
+        # Keep the original command line for the default profile
+        cmd += ["-m", str(ram), "-boot", "d", "-enable-kvm", "-smp", str(cores), "-hda", imagefile]
+        if profile.hugepages:
+            cmd += ["-machine", "memory-backend=mem0"]
+    else:
+        cmd += ["-machine", machine, "-m", str(ram), "-smp", str(cores)]
+        for index in range(profile.iothreads):
+            cmd += ["-object", f"iothread,id=io{index}"]
+        iothread = ",iothread=io0" if profile.iothreads else ""
+        cmd += ["-drive", f"file={imagefile},if=none,id=disk0,format={disk_format},"
+                          f"cache={profile.cache},aio={profile.aio},discard=unmap"]
+        if profile.disk_bus == "virtio-blk":
+            cmd += ["-device", f"virtio-blk-pci,drive=disk0{iothread}"]
+        else:
+            cmd += ["-device", f"virtio-scsi-pci,id=scsi0{iothread}",
+                    "-device", "scsi-hd,drive=disk0,bus=scsi0.0"]
+        if isofile:
+            cmd += ["-boot", "order=dc"]
+
+    cmd += ["-cpu", "host"]
+
+    if profile.net == "user":
+        cmd += ["-netdev", "user,id=net0", "-device", "virtio-net-pci,netdev=net0"]
+    elif profile.net == "tap":
+        vhost = ",vhost=on" if profile.vhost else ""
+        cmd += ["-netdev", f"tap,id=net0,ifname={profile.tap_ifname},script=no,downscript=no{vhost}",
+                "-device", "virtio-net-pci,netdev=net0"]
+
+    if profile.display == "sdl":
+        cmd += ["-vga", "virtio", "-display", "sdl,gl=on"]
+    elif profile.display == "vnc":
+        # Several headless VMs can run at once, so each takes the first free display
+        cmd += ["-vga", "virtio", "-display", f"vnc=127.0.0.1:{profile.vnc_display},to=99"]
+    else:
+        cmd += ["-display", "none", "-vga", "none"]
+
+    if isofile:
+        cmd += ["-cdrom", isofile]
+    return cmd
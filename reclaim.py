@@ -0,0 +1,170 @@
+import os
+
+import qemu_images
+from docker_stream import format_bytes
+
+
+TARGETS = ("containers", "images", "volumes", "build_cache", "qcow2")
+# Volumes hold data, so like `docker system prune` they are only pruned when asked for
+DEFAULT_TARGETS = tuple(target for target in TARGETS if target != "volumes")
+
+
+def _is_dangling(image):
+    tags = image.get("RepoTags") or []
+    return not tags or tags == ["<none>:<none>"]
+
+
+def docker_usage(client, all_images=False):
+    """
+    Reclaimable space per Docker target from one `docker system df` call.
+
+    Images count when dangling (or, with all_images, when no container uses
+    them); containers when not running; volumes when unreferenced; build cache
+    when not in use. Shared image layers are not counted, since pruning one image
+    does not free them.
+    """
+    df = client.df()
+    usage = {}
+
+    images = df.get("Images") or []
+    prunable = [i for i in images if (all_images and not i.get("Containers")) or _is_dangling(i)]
+    usage["images"] = {
+        "count": len(images),
+        "size": sum(i.get("Size", 0) for i in images),
+        "reclaimable_count": len(prunable),
+        "reclaimable": sum(max(i.get("Size", 0) - max(i.get("SharedSize", 0), 0), 0) for i in prunable),
+    }
+
+    containers = df.get("Containers") or []
+    stopped = [c for c in containers if c.get("State") != "running"]
+    usage["containers"] = {
+        "count": len(containers),
+        "size": sum(c.get("SizeRw", 0) or 0 for c in containers),
+        "reclaimable_count": len(stopped),
+        "reclaimable": sum(c.get("SizeRw", 0) or 0 for c in stopped),
+    }
+
+    volumes = df.get("Volumes") or []
+    unused = [v for v in volumes if (v.get("UsageData") or {}).get("RefCount", 0) == 0]
+    usage["volumes"] = {
+        "count": len(volumes),
+        "size": sum(max((v.get("UsageData") or {}).get("Size", 0), 0) for v in volumes),
+        "reclaimable_count": len(unused),
+        "reclaimable": sum(max((v.get("UsageData") or {}).get("Size", 0), 0) for v in unused),
+    }
+
+    cache = df.get("BuildCache") or []
+    idle = [entry for entry in cache if not entry.get("InUse")]
+    usage["build_cache"] = {
+        "count": len(cache),
+        "size": sum(entry.get("Size", 0) for entry in cache),
+        "reclaimable_count": len(idle),
+        "reclaimable": sum(entry.get("Size", 0) for entry in idle if not entry.get("Shared")),
+    }
+    return usage
+
+
+def qcow2_usage(paths, in_use=()):
+    """
+    For each qcow2 image: bytes on disk, bytes a compacted copy would need
+    (`qemu-img measure`) and the difference. Overlays and images used by a
+    running VM are listed but not counted as reclaimable.
+    """
+    rows = []
+    for path in paths:
+        row = {"path": path, "allocated": 0, "required": 0, "reclaimable": 0, "skip": None, "error": None}
+        try:
+            row["allocated"] = qemu_images.allocated_size(path)
+            details = qemu_images.info(path)
+            if details.get("format") != "qcow2":
+                row["skip"] = f"{details.get('format')} image"
+            elif details.get("backing-filename"):
+                row["skip"] = "overlay"
+            elif path in in_use:
+                row["skip"] = "in use by a running VM"
+            else:
+                row["required"] = qemu_images.measure(path)["required"]
+                row["reclaimable"] = max(row["allocated"] - row["required"], 0)
+        except (OSError, qemu_images.QemuImgError) as e:
+            row["error"] = str(e)
+        rows.append(row)
+    return rows
+
+
+def _filters(until=None, labels=None):
+    filters = {}
+    if until:
+        filters["until"] = until
+    if labels:
+        filters["label"] = list(labels)
+    return filters
+
+
+def reclaim(client, targets=TARGETS, until=None, labels=None, all_images=False, qcow2_paths=(), in_use=(),
+            min_qcow2_savings=64 * 1024 * 1024, on_line=None, job=None):
+    """
+    Prune the selected Docker targets and compact qcow2 images.
+
+    until ("24h", "2024-01-01") and labels ("key" or "key=value") narrow what
+    is pruned; volumes only support labels and the build cache only until.
+    qcow2 images are rewritten only when that would save at least
+    min_qcow2_savings bytes. Returns {"freed": {target: bytes}, "total", "errors"}.
+    """
+    on_line = on_line or (lambda line: None)
+    freed, errors = {}, []
+    steps = [target for target in TARGETS if target in targets]
+
+    for index, target in enumerate(steps):
+        if job:
+            job.check_cancelled()
+            job.set_progress(index / len(steps), f"Reclaiming {target.replace('_', ' ')}")
+        try:
+            if target == "containers":
+                response = client.api.prune_containers(filters=_filters(until, labels))
+            elif target == "images":
+                filters = _filters(until, labels)
+                filters["dangling"] = not all_images
+                response = client.api.prune_images(filters=filters)
+            elif target == "volumes":
+                response = client.api.prune_volumes(filters=_filters(labels=labels))
+            elif target == "build_cache":
+                response = client.api.prune_builds(filters=_filters(until))
+            else:
+                freed["qcow2"] = 0
+                for row in qcow2_usage(qcow2_paths, in_use):
+                    if row["error"] or row["skip"] or row["reclaimable"] < min_qcow2_savings:
+                        continue
+                    if job:
+                        job.check_cancelled()
+                    on_line(f"Compacting {row['path']} ({format_bytes(row['reclaimable'])} reclaimable)")
+                    try:
+                        freed["qcow2"] += qemu_images.compact(row["path"])
+                    except (OSError, qemu_images.QemuImgError) as e:
+                        errors.append({"target": "qcow2", "error": f"{row['path']}: {e}"})
+                on_line(f"qcow2: freed {format_bytes(freed['qcow2'])}")
+                continue
+            freed[target] = (response or {}).get("SpaceReclaimed", 0) or 0
+            on_line(f"{target.replace('_', ' ')}: freed {format_bytes(freed[target])}")
+        except Exception as e:
+            errors.append({"target": target, "error": str(e)})
+            on_line(f"{target.replace('_', ' ')}: {e}")
+    return {"freed": freed, "total": sum(freed.values()), "errors": errors}
+
+
+def format_usage(usage, qcow2_rows=()):
+    lines = [f"{'TYPE':<12} {'TOTAL':>7} {'SIZE':>10} {'RECLAIMABLE':>12}"]
+    for target, row in usage.items():
+        lines.append(
+            f"{target.replace('_', ' '):<12} {row['count']:>7} {format_bytes(row['size']):>10} "
+            f"{format_bytes(row['reclaimable']):>12} ({row['reclaimable_count']})"
+        )
+    if qcow2_rows:
+        reclaimable = [row for row in qcow2_rows if row["reclaimable"]]
+        lines.append(
+            f"{'qcow2':<12} {len(qcow2_rows):>7} {format_bytes(sum(r['allocated'] for r in qcow2_rows)):>10} "
+            f"{format_bytes(sum(r['reclaimable'] for r in reclaimable)):>12} ({len(reclaimable)})"
+        )
+        for row in qcow2_rows:
+            note = row["error"] or row["skip"] or f"{format_bytes(row['reclaimable'])} reclaimable"
+            lines.append(f"    {os.path.basename(row['path'])}: {note}")
+    return "\n".join(lines)
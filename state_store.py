@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+STATE_PATH = os.environ.get("VMMS_STATE_DB", os.path.join(os.path.expanduser("~"), ".vmms", "state.db"))
+KINDS = ("file", "qemu_image", "vm", "container", "image")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    tag TEXT,
+    created REAL NOT NULL,
+    details TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (kind, ref)
+);
+CREATE INDEX IF NOT EXISTS artifacts_kind_created ON artifacts (kind, created);
+CREATE INDEX IF NOT EXISTS artifacts_tag ON artifacts (tag);
+"""
+
+
+class StateStore:
+    """
+    Everything the tool has created (files, qemu images, VMs, containers, built
+    images), kept in SQLite so it survives restarts.
+
+    ref identifies the artifact within its kind: a path for files and images, a
+    VM name, a container id or an image tag. tag is a free-form label used to
+    group artifacts for cleanup. The database runs in WAL mode so readers never
+    wait for the writer.
+    """
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def record(self, kind, ref, tag=None, **details):
+        self.record_many(kind, [ref], tag=tag, **details)
+
+    def record_many(self, kind, refs, tag=None, **details):
+        """Insert or refresh many artifacts of one kind in a single transaction."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}. Choose one of {', '.join(KINDS)}")
+        now = time.time()
+        encoded = json.dumps(details, default=str)
+        with self._lock:
+            with self._transaction():
+                self._db.executemany(
+                    "INSERT INTO artifacts (kind, ref, tag, created, details) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (kind, ref) DO UPDATE SET tag = excluded.tag, details = excluded.details",
+                    [(kind, ref, tag, now, encoded) for ref in refs],
+                )
+
+    def find(self, kind=None, tag=None, older_than=None, limit=None):
+        """
+        Artifacts matching every given filter, oldest first. older_than is an age
+        in seconds.
+        """
+        where, params = self._filters(kind, tag, older_than)
+        sql = f"SELECT * FROM artifacts{where} ORDER BY created"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    def get(self, kind, ref):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM artifacts WHERE kind = ? AND ref = ?", (kind, ref)).fetchone()
+        return self._row(row) if row else None
+
+    def counts(self):
+        """Number of artifacts per kind."""
+        with self._lock:
+            rows = self._db.execute("SELECT kind, COUNT(*) FROM artifacts GROUP BY kind").fetchall()
+        return {kind: count for kind, count in rows}
+
+    def forget(self, kind, refs):
+        """Delete the records (not the artifacts) for refs in one transaction."""
+        with self._lock:
+            with self._transaction():
+                self._db.executemany("DELETE FROM artifacts WHERE kind = ? AND ref = ?", [(kind, ref) for ref in refs])
+
+    def forget_ids(self, ids):
+        with self._lock:
+            with self._transaction():
+                self._db.executemany("DELETE FROM artifacts WHERE id = ?", [(artifact_id,) for artifact_id in ids])
+
+    def _transaction(self):
+        db = self._db
+
+        class Transaction:
+            def __enter__(self):
+                db.execute("BEGIN")
+
+            def __exit__(self, exc_type, exc, tb):
+                db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+        return Transaction()
+
+    @staticmethod
+    def _filters(kind, tag, older_than):
+        clauses, params = [], []
+        if kind:
+            kinds = [kind] if isinstance(kind, str) else list(kind)
+            clauses.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            params += kinds
+        if tag:
+            clauses.append("tag = ?")
+            params.append(tag)
+        if older_than is not None:
+            clauses.append("created < ?")
+            params.append(time.time() - older_than)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _row(row):
+        artifact = dict(row)
+        artifact["details"] = json.loads(artifact["details"])
+        return artifact
+
+
+def remove_files(artifacts):
+    """
+    Unlink every file/qemu_image artifact. A file that is already gone counts as
+    removed; no existence check first. Returns (removed artifacts, errors).
+    """
+    removed, errors = [], []
+    for artifact in artifacts:
+        try:
+            os.remove(artifact["ref"])
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            errors.append({"kind": artifact["kind"], "ref": artifact["ref"], "error": str(e)})
+            continue
+        removed.append(artifact)
+    return removed, errors
@@ -0,0 +1,279 @@
+"""
+Timing spans and latency histograms for Docker, QEMU and job operations.
+
+Every span is recorded into an in-memory histogram keyed by operation and, when
+VMMS_TRACE_FILE is set, appended to that file as one JSON line. The histograms
+can be served in Prometheus text format on localhost (VMMS_METRICS_PORT).
+Recording a span costs a lock and a few additions; trace lines are written by a
+background thread.
+"""
+import bisect
+import json
+import os
+import queue
+import re
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from functools import wraps
+
+
+# Upper bounds in seconds, as in Prometheus' default latency buckets plus slow ops
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+SAMPLES = 1024  # recent samples kept per operation for exact quantiles
+
+_VERSION_PREFIX = re.compile(r"^/v\d+\.\d+")
+# Engine API collections whose second path segment names one object
+_OBJECT_COLLECTIONS = {"images", "containers", "volumes", "networks", "exec", "plugins",
+                       "services", "nodes", "tasks", "secrets", "configs"}
+# ...except for these collection-wide actions
+_COLLECTION_ACTIONS = {"json", "create", "prune", "load", "search", "get"}
+# Image names may contain '/', so only a known trailing action is kept for them
+_IMAGE_ACTIONS = {"json", "history", "push", "tag", "get"}
+
+
+class Histogram:
+    """Bucketed counts for export plus a ring of recent samples for p50/p99."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.bytes = 0
+        self._recent = array("d", [0.0] * SAMPLES)
+        self._next = 0
+
+    def observe(self, seconds, error=False, transferred=0):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.errors += bool(error)
+        self.bytes += transferred
+        self._recent[self._next % SAMPLES] = seconds
+        self._next += 1
+
+    def quantile(self, q):
+        samples = sorted(self._recent[:min(self._next, SAMPLES)])
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Span:
+    __slots__ = ("op", "kind", "attributes", "started", "queued", "bytes", "error")
+
+    def __init__(self, op, kind, attributes):
+        self.op = op
+        self.kind = kind
+        self.attributes = attributes
+        self.started = time.perf_counter()
+        self.queued = None  # seconds spent waiting before the operation started
+        self.bytes = 0
+        self.error = None
+
+    def add_bytes(self, count):
+        self.bytes += count
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class Telemetry:
+    def __init__(self, trace_path=None):
+        self._lock = threading.Lock()
+        self.durations = {}  # (kind, op) -> Histogram
+        self.queue_times = {}  # (kind, op) -> Histogram
+        self._trace_queue = None
+        if trace_path:
+            self.trace_to(trace_path)
+
+    def trace_to(self, path):
+        """Start appending every finished span to path as JSON lines."""
+        self._trace_queue = queue.Queue()
+        threading.Thread(target=self._write_trace, args=(path, self._trace_queue),
+                         name="trace-writer", daemon=True).start()
+
+    @contextmanager
+    def span(self, op, kind="op", queued=None, **attributes):
+        span = Span(op, kind, attributes)
+        span.queued = queued
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.record(span, time.perf_counter() - span.started)
+
+    def record(self, span, seconds):
+        key = (span.kind, span.op)
+        with self._lock:
+            histogram = self.durations.get(key)
+            if histogram is None:
+                histogram = self.durations[key] = Histogram()
+            histogram.observe(seconds, span.error is not None, span.bytes)
+            if span.queued is not None:
+                waits = self.queue_times.get(key)
+                if waits is None:
+                    waits = self.queue_times[key] = Histogram()
+                waits.observe(span.queued)
+        if self._trace_queue is not None:
+            self._trace_queue.put({
+                "time": time.time(), "kind": span.kind, "op": span.op, "seconds": round(seconds, 6),
+                "queued": None if span.queued is None else round(span.queued, 6), "bytes": span.bytes,
+                "error": span.error, **span.attributes,
+            })
+
+    def traced(self, op=None, kind="vmms"):
+        """Decorator: run every call of the function inside a span."""
+        def decorate(fn):
+            name = op or fn.__name__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name, kind):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        """Per-operation latency summary, slowest p99 first."""
+        with self._lock:
+            rows = []
+            for (kind, op), histogram in self.durations.items():
+                waits = self.queue_times.get((kind, op))
+                rows.append({
+                    "kind": kind, "op": op, "count": histogram.count, "errors": histogram.errors,
+                    "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99),
+                    "queue_p50": waits.quantile(0.5) if waits else None, "bytes": histogram.bytes,
+                })
+        return sorted(rows, key=lambda row: row["p99"], reverse=True)
+
+    def prometheus(self):
+        """All histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for metric, histograms in (("vmms_operation_seconds", self.durations),
+                                       ("vmms_queue_seconds", self.queue_times)):
+                lines.append(f"# TYPE {metric} histogram")
+                for (kind, op), histogram in sorted(histograms.items()):
+                    labels = f'kind="{_escape(kind)}",op="{_escape(op)}"'
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, histogram.buckets):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:.6f}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+            for metric, attribute in (("vmms_operation_errors_total", "errors"),
+                                      ("vmms_operation_bytes_total", "bytes")):
+                lines.append(f"# TYPE {metric} counter")
+                for (kind, op), histogram in sorted(self.durations.items()):
+                    lines.append(f'{metric}{{kind="{_escape(kind)}",op="{_escape(op)}"}} {getattr(histogram, attribute)}')
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _write_trace(path, lines):
+        with open(path, "a") as f:
+            while True:
+                f.write(json.dumps(lines.get(), default=str) + "\n")
+                # Write whatever else is already queued before flushing
+                while not lines.empty():
+                    f.write(json.dumps(lines.get_nowait(), default=str) + "\n")
+                f.flush()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def api_operation(method, url):
+    """
+    'GET', 'http://x/v1.43/containers/web/json' -> 'GET /containers/{id}/json'.
+    Names and ids are folded so each endpoint is one metric, not one per object.
+    """
+    path = url.split("://", 1)[-1]
+    path = "/" + path.split("/", 1)[1] if "/" in path else "/"
+    path = _VERSION_PREFIX.sub("", path.split("?", 1)[0])
+    collection, _, rest = path.lstrip("/").partition("/")
+    if collection not in _OBJECT_COLLECTIONS or not rest or rest in _COLLECTION_ACTIONS:
+        return f"{method} {path}"
+    if collection == "images":
+        action = rest.rsplit("/", 1)[-1]
+        suffix = f"/{action}" if "/" in rest and action in _IMAGE_ACTIONS else ""
+        return f"{method} /images/{{name}}{suffix}"
+    remainder = rest.partition("/")[2]
+    return f"{method} /{collection}/{{id}}" + (f"/{remainder}" if remainder else "")
+
+
+def instrument_docker_client(client):
+    """
+    Record every Engine API request the client makes. The response hook fires
+    once headers arrive, so streamed pulls and builds count time to first byte;
+    their totals are recorded by the callers' own spans.
+    """
+    def on_response(response, *args, **kwargs):
+        request = response.request
+        span = Span(api_operation(request.method, request.url), "docker-api", {"status": response.status_code})
+        span.add_bytes(int(response.headers.get("Content-Length") or 0))
+        if response.status_code >= 400:
+            span.error = f"HTTP {response.status_code}"
+        telemetry.record(span, response.elapsed.total_seconds())
+
+    client.api.hooks["response"].append(on_response)
+    return client
+
+
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = telemetry.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """Serve /metrics on localhost in a daemon thread. Returns the server, or None if no port is set."""
+    port = port if port is not None else int(os.environ.get("VMMS_METRICS_PORT", "0") or 0)
+    if not port:
+        return None
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _metrics_handler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+def format_snapshot(rows):
+    lines = [f"{'KIND':<11} {'OPERATION':<40} {'COUNT':>6} {'ERR':>4} {'P50':>9} {'P99':>9} {'QUEUE':>9}"]
+    for row in rows:
+        queue_p50 = "" if row["queue_p50"] is None else f"{row['queue_p50'] * 1000:.1f}ms"
+        lines.append(
+            f"{row['kind']:<11} {row['op'][:40]:<40} {row['count']:>6} {row['errors']:>4} "
+            f"{row['p50'] * 1000:>7.1f}ms {row['p99'] * 1000:>7.1f}ms {queue_p50:>9}"
+        )
+    return "\n".join(lines)
+
+
+telemetry = Telemetry(os.environ.get("VMMS_TRACE_FILE"))
+span = telemetry.span
+traced = telemetry.traced
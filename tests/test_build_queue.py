@@ -0,0 +1,69 @@
+import pytest
+
+from build_queue import BuildTarget, base_images, build_order, dependency_graph, run_queue
+
+
+def write_dockerfile(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def test_base_images_substitutes_global_args_and_skips_stages():
+    content = (
+        "ARG VERSION=3.12\n"
+        "FROM python:${VERSION}-slim AS build\n"
+        "RUN pip install --no-cache-dir app\n"
+        "FROM build AS test\n"
+        "FROM scratch\n"
+        "COPY --from=build /app /app\n"
+    )
+    assert base_images(content) == ["python:3.12-slim"]
+
+
+def test_dependency_graph_links_targets_built_from_each_other(tmp_path):
+    base = BuildTarget(write_dockerfile(tmp_path, "base", "FROM alpine:3.19\n"), "acme/base:1")
+    app = BuildTarget(write_dockerfile(tmp_path, "app", "FROM acme/base:1\n"), "acme/app:1")
+    graph = dependency_graph([base, app])
+    assert graph == {"acme/base:1": set(), "acme/app:1": {"acme/base:1"}}
+
+
+def test_dependency_graph_rejects_duplicate_tags(tmp_path):
+    dockerfile = write_dockerfile(tmp_path, "Dockerfile", "FROM alpine:3.19\n")
+    with pytest.raises(ValueError, match="same tag"):
+        dependency_graph([BuildTarget(dockerfile, "acme/app"), BuildTarget(dockerfile, "acme/app:latest")])
+
+
+def test_build_order_puts_parents_first():
+    graph = {"app": {"base"}, "base": set(), "worker": {"base"}, "tools": set()}
+    order = build_order(graph)
+    assert order.index("base") < order.index("app")
+    assert order.index("base") < order.index("worker")
+    assert sorted(order) == sorted(graph)
+
+
+def test_build_order_detects_cycles():
+    with pytest.raises(ValueError, match="cycle: a, b"):
+        build_order({"a": {"b"}, "b": {"a"}, "c": set()})
+
+
+def test_run_queue_skips_dependents_of_a_failed_build(tmp_path):
+    base = BuildTarget(write_dockerfile(tmp_path, "base", "FROM alpine:3.19\n"), "acme/base:1")
+    app = BuildTarget(write_dockerfile(tmp_path, "app", "FROM acme/base:1\n"), "acme/app:1")
+    other = BuildTarget(write_dockerfile(tmp_path, "other", "FROM alpine:3.19\n"), "acme/other:1")
+
+    def build(target):
+        if target.tag == "acme/base:1":
+            raise RuntimeError("boom")
+        return "sha256:" + target.tag
+
+    results = {result["tag"]: result for result in run_queue(build, [base, app, other])}
+    assert results["acme/base:1"]["status"] == "failed"
+    assert results["acme/app:1"]["status"] == "skipped"
+    assert results["acme/other:1"]["status"] == "built"
+
+
+def test_run_queue_rejects_zero_concurrency(tmp_path):
+    target = BuildTarget(write_dockerfile(tmp_path, "Dockerfile", "FROM alpine:3.19\n"), "acme/app:1")
+    with pytest.raises(ValueError, match="concurrency"):
+        run_queue(lambda target: "sha256:x", [target], concurrency=0)
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from container_logs import (MAX_LINE_LENGTH, LineSplitter, LogBuffer, LogLine, filter_lines, parse_line, parse_log,
+                            parse_time, parse_timestamp)
+
+
+def test_parse_timestamp_keeps_nanoseconds():
+    whole = datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+    assert parse_timestamp("2024-05-01T12:00:00.123456789Z") == pytest.approx(whole + 0.123456789, abs=1e-9)
+    assert parse_timestamp("2024-05-01T12:00:00Z") == whole
+
+
+def test_parse_line_splits_timestamp_and_falls_back_without_one():
+    line = parse_line("web", b"2024-05-01T12:00:00.5Z GET /health 200\r")
+    assert line.container == "web"
+    assert line.text == "GET /health 200"
+    assert line.time == pytest.approx(datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc).timestamp() + 0.5)
+    plain = parse_line("web", b"no timestamp here")
+    assert plain.text == "no timestamp here"
+
+
+def test_splitter_reassembles_lines_split_across_chunks():
+    splitter = LineSplitter()
+    assert splitter.feed(b"first li") == []
+    assert splitter.feed(b"ne\nsecond\nthi") == [b"first line", b"second"]
+    assert splitter.feed(b"rd") == []
+    assert splitter.flush() == [b"third"]
+    assert splitter.flush() == []
+
+
+def test_splitter_cuts_overlong_lines():
+    splitter = LineSplitter()
+    lines = splitter.feed(b"x" * (MAX_LINE_LENGTH + 10))
+    assert lines == [b"x" * MAX_LINE_LENGTH]
+    assert splitter.flush() == []
+    lines = splitter.feed(b"y" * (MAX_LINE_LENGTH * 2) + b"\n")
+    assert lines == [b"y" * MAX_LINE_LENGTH]
+
+
+def test_parse_log_keeps_an_unterminated_last_line():
+    lines = parse_log("db", b"2024-05-01T12:00:00Z one\n2024-05-01T12:00:01Z two")
+    assert [line.text for line in lines] == ["one", "two"]
+
+
+def test_buffer_drops_oldest_lines_and_counts_them():
+    buffer = LogBuffer(maxlen=3)
+    for index in range(5):
+        buffer.append(LogLine("web", index, str(index)))
+    assert [line.text for line in buffer.lines()] == ["2", "3", "4"]
+    assert (len(buffer), buffer.total, buffer.dropped) == (3, 5, 2)
+
+
+def test_filter_lines_by_time_and_pattern():
+    lines = [LogLine("web", 10, "GET /"), LogLine("web", 20, "ERROR timeout"), LogLine("web", 30, "error: disk")]
+    assert [line.time for line in filter_lines(lines, since=15)] == [20, 30]
+    assert [line.time for line in filter_lines(lines, until=20)] == [10, 20]
+    assert [line.time for line in filter_lines(lines, pattern="error")] == [20, 30]
+    assert [line.time for line in filter_lines(lines, since=25, pattern="error|timeout")] == [30]
+
+
+def test_parse_time():
+    assert parse_time("10m", now=1000.0) == 400.0
+    assert parse_time("1.5h", now=10000.0) == 4600.0
+    assert parse_time("1700000000") == 1700000000.0
+    assert parse_time("2024-05-01T12:00:00Z") == datetime(2024, 5, 1, 12, tzinfo=timezone.utc).timestamp()
+    assert parse_time("  ") is None
+    with pytest.raises(ValueError, match="Invalid time"):
+        parse_time("yesterday")
+
+
+def test_follow_survives_a_quiet_stream_longer_than_the_client_timeout(monkeypatch):
+    pytest.importorskip("docker")
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+    from docker_connection import DockerConnection
+    from container_logs import LogFollower
+    from fake_engine import FakeEngine
+
+    # The daemon sends no response headers until the first line, which comes after
+    # the client's 0.5s read timeout
+    with FakeEngine(images=1, containers=2, log_lines=0, log_interval=1.5) as engine:
+        monkeypatch.setenv("DOCKER_HOST", engine.url)
+        connection = DockerConnection(timeout=0.5, retries=1)
+        arrived = threading.Event()
+        ended = []
+        follower = LogFollower(connection.get_streaming(), tail=0, on_line=lambda line: arrived.set(),
+                               on_end=lambda container, error: ended.append(error))
+        follower.follow("bench-1")
+        try:
+            assert arrived.wait(5)
+            assert ended == []
+            assert follower.stats()["bench-1"]["error"] is None
+        finally:
+            follower.stop()
+            connection.reset()
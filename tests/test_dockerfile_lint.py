@@ -0,0 +1,105 @@
+from dockerfile_lint import estimate_layers, lint, parse_dockerfile
+
+
+def codes(content):
+    return [finding.code for finding in lint(content)]
+
+
+def test_parse_joins_continuations_and_skips_comments():
+    instructions = parse_dockerfile(
+        "# syntax comment\n"
+        "FROM alpine:3.19\n"
+        "RUN apk add --no-cache curl \\\n"
+        "    # inline comment\n"
+        "    && echo done\n"
+    )
+    assert [(i.line, i.keyword) for i in instructions] == [(2, "FROM"), (3, "RUN")]
+    assert instructions[1].arguments == "apk add --no-cache curl && echo done"
+
+
+def test_empty_dockerfile():
+    assert codes("# only a comment\n") == ["empty"]
+
+
+def test_missing_from_is_an_error():
+    findings = lint("ARG VERSION=1\nRUN echo hi\n")
+    assert findings[0].code == "from-first"
+    assert findings[0].severity == "error"
+    assert findings[0].line == 2
+
+
+def test_from_without_image_and_placeholder_image():
+    assert "from-missing-image" in codes("FROM --platform=linux/amd64\nCMD [\"sh\"]\n")
+    assert "placeholder-image" in codes("FROM <your-image>\nCMD [\"sh\"]\n")
+
+
+def test_unpinned_base_but_not_stages_digests_or_scratch():
+    assert "unpinned-base" in codes("FROM ubuntu\nCMD [\"sh\"]\n")
+    assert "unpinned-base" in codes("FROM ubuntu:latest\nCMD [\"sh\"]\n")
+    pinned = (
+        "FROM golang:1.22 AS build\n"
+        "FROM build\n"
+        "FROM alpine@sha256:abc\n"
+        "FROM scratch\n"
+        "CMD [\"/app\"]\n"
+    )
+    assert "unpinned-base" not in codes(pinned)
+
+
+def test_run_rules():
+    found = codes(
+        "FROM debian:12\n"
+        "RUN apt-get install -y curl\n"
+        "RUN pip install flask\n"
+        "RUN apk add git\n"
+        "CMD [\"flask\"]\n"
+    )
+    for code in ("apt-update-separate", "apt-cleanup", "apt-recommends", "pip-cache", "apk-cache", "merge-run"):
+        assert code in found
+
+
+def test_clean_apt_install_has_no_apt_findings():
+    found = codes(
+        "FROM debian:12\n"
+        "RUN apt-get update && apt-get install -y --no-install-recommends curl && rm -rf /var/lib/apt/lists/*\n"
+        "CMD [\"curl\"]\n"
+    )
+    assert not [code for code in found if code.startswith("apt")]
+
+
+def test_cache_busting_copy_and_multi_stage_hint():
+    found = codes(
+        "FROM node:20\n"
+        "COPY . .\n"
+        "RUN npm ci && npm run build\n"
+        "CMD [\"node\", \"dist/index.js\"]\n"
+    )
+    assert "cache-busting-copy" in found
+    assert "multi-stage" in found
+
+
+def test_shell_form_command_unknown_instruction_and_missing_command():
+    assert "exec-form" in codes("FROM alpine:3.19\nCMD sh -c 'echo hi'\n")
+    assert "unknown-instruction" in codes("FROM alpine:3.19\nRUNN echo hi\nCMD [\"sh\"]\n")
+    assert "no-command" in codes("FROM alpine:3.19\nRUN echo hi\n")
+
+
+def test_findings_are_ordered_by_line_then_severity():
+    findings = lint("FROM ubuntu\nRUN apt-get install curl\n")
+    keys = [(finding.line, finding.severity) for finding in findings]
+    order = {"error": 0, "warning": 1, "hint": 2}
+    assert keys == sorted(keys, key=lambda key: (key[0], order[key[1]]))
+
+
+def test_layer_count_only_counts_the_final_stage():
+    instructions = parse_dockerfile(
+        "FROM golang:1.22 AS build\n"
+        "RUN go build\n"
+        "RUN go test\n"
+        "FROM alpine:3.19\n"
+        "COPY --from=build /app /app\n"
+        "CMD [\"/app\"]\n"
+    )
+    assert estimate_layers(instructions) == 1
+    many_runs = "FROM alpine:3.19\n" + "RUN echo x\n" * 21 + "CMD [\"sh\"]\n"
+    assert "layer-count" in codes(many_runs)
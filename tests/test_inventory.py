@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+import pytest
+
+from inventory import Inventory, SubstringIndex
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+
+def test_substring_index_finds_short_and_long_queries_and_id_prefixes():
+    index = SubstringIndex()
+    index.add("aaa111", ["web-frontend", "nginx:1.25"])
+    index.add("bbb222", ["worker", "python:3.12"])
+    assert index.search("front") == {"aaa111"}
+    assert index.search("w") == {"aaa111", "bbb222"}
+    assert index.search("bbb2") == {"bbb222"}
+    index.remove("aaa111")
+    assert index.search("front") == set()
+
+
+def test_changes_made_while_loading_are_not_lost():
+    docker = pytest.importorskip("docker")
+    from fake_engine import FakeEngine
+
+    with FakeEngine(images=2, containers=2) as engine:
+        client = docker.DockerClient(base_url=engine.url)
+        inventory = Inventory(client)
+        reload = inventory.reload
+
+        def reload_then_create():
+            reload()
+            # Created after the list calls but before the event stream is subscribed
+            client.api.create_container("bench/app1:1.1", name="created-during-load")
+
+        inventory.reload = reload_then_create
+        inventory.start()
+        try:
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if any(row["name"] == "created-during-load" for row in inventory.containers()):
+                    break
+                time.sleep(0.05)
+            assert any(row["name"] == "created-during-load" for row in inventory.containers())
+        finally:
+            inventory.stop()
+            client.close()
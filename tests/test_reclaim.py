@@ -0,0 +1,41 @@
+import os
+import signal
+
+import pytest
+
+import vmms
+from state_store import StateStore
+from vm_supervisor import VMSupervisor
+
+
+STUBS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "stubs")
+
+
+@pytest.fixture
+def stub_qemu(tmp_path, monkeypatch):
+    """vmms with stub qemu-img/qemu-system binaries and its state kept in tmp_path."""
+    if os.name == "nt":
+        pytest.skip("the stub QEMU binaries are POSIX scripts")
+    monkeypatch.setenv("PATH", STUBS + os.pathsep + os.environ.get("PATH", ""))
+    monkeypatch.setattr(vmms, "_state", StateStore(str(tmp_path / "state.db")))
+    supervisor = VMSupervisor(state_dir=str(tmp_path / "vms"))
+    monkeypatch.setattr(vmms, "_supervisor", supervisor)
+    yield supervisor
+    for name in list(supervisor.vms):
+        supervisor.stop(name, force=True)
+
+
+def test_running_vm_disk_is_in_use_until_the_vm_stops(stub_qemu, tmp_path):
+    image = vmms.create_image("disk", 64, str(tmp_path / "images"))
+    vm = vmms.boot(256, 1, image, name="disk-vm", profile="headless")
+    paths, running = vmms._qcow2_candidates(None)
+    assert paths == [os.path.abspath(image)]
+    assert running == {os.path.abspath(image)}
+
+    # The VM exits on its own; its record stays until someone waits on it
+    os.kill(vm["pid"], signal.SIGKILL)
+    stub_qemu._processes["disk-vm"].wait()
+    assert "disk-vm" in stub_qemu.vms
+    assert stub_qemu.status("disk-vm") == "stopped"
+    _, running = vmms._qcow2_candidates(None)
+    assert running == set()
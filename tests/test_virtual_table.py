@@ -0,0 +1,82 @@
+from virtual_table import Column, TableModel
+
+
+COLUMNS = (Column("name", "Name"), Column("size", "Size", format=lambda value: "" if value is None else str(value)))
+
+
+def model_with(rows):
+    model = TableModel(COLUMNS, key=lambda row: row["name"])
+    model.set_rows(rows)
+    return model
+
+
+ROWS = [
+    {"name": "web-frontend", "size": 300},
+    {"name": "web-backend", "size": 100},
+    {"name": "db", "size": 200},
+]
+
+
+def test_unsorted_view_follows_input_order():
+    model = model_with(ROWS)
+    assert model.view == ["web-frontend", "web-backend", "db"]
+    model.set_rows(list(reversed(ROWS)))
+    assert model.view == ["db", "web-backend", "web-frontend"]
+
+
+def test_set_rows_reports_added_removed_and_changed():
+    model = model_with(ROWS)
+    added, removed, changed = model.set_rows([
+        {"name": "web-frontend", "size": 300},
+        {"name": "web-backend", "size": 150},
+        {"name": "cache", "size": 50},
+    ])
+    assert (added, removed, changed) == (["cache"], ["db"], ["web-backend"])
+    assert model.cells("web-backend") == ("web-backend", "150")
+
+
+def test_filter_narrowing_only_rechecks_current_matches():
+    model = model_with(ROWS)
+    model.set_filter("web")
+    assert model.view == ["web-frontend", "web-backend"]
+    # A row that would match "web back" but was not in the "web" view stays out when narrowing
+    model._text["db"] = "web back"
+    model.set_filter("web back")
+    assert model.view == ["web-backend"]
+
+
+def test_filter_widening_rechecks_every_row():
+    model = model_with(ROWS)
+    model.set_filter("web back")
+    assert model.view == ["web-backend"]
+    model.set_filter("web")
+    assert model.view == ["web-frontend", "web-backend"]
+    model.set_filter("")
+    assert sorted(model.view) == ["db", "web-backend", "web-frontend"]
+
+
+def test_filter_matches_every_word_in_any_column():
+    model = model_with(ROWS)
+    model.set_filter("WEB 100")
+    assert model.view == ["web-backend"]
+
+
+def test_sort_and_keep_sorted_on_update():
+    model = model_with(ROWS)
+    model.sort("size")
+    assert model.view == ["web-backend", "db", "web-frontend"]
+    model.set_rows(ROWS + [{"name": "cache", "size": 150}])
+    assert model.view == ["web-backend", "cache", "db", "web-frontend"]
+    model.sort("size", descending=True)
+    assert model.view == ["web-frontend", "db", "cache", "web-backend"]
+
+
+def test_sort_mixed_numbers_text_and_none():
+    model = model_with([
+        {"name": "a", "size": "N/A"},
+        {"name": "b", "size": None},
+        {"name": "c", "size": 5},
+        {"name": "d", "size": 2.5},
+    ])
+    model.sort("size")
+    assert model.view == ["d", "c", "a", "b"]
@@ -0,0 +1,306 @@
+"""
+A ttk.Treeview that only materializes the rows on screen.
+
+TableModel keeps every row (keyed, filtered and sorted) in plain Python;
+VirtualTable shows a window of it through a fixed set of Treeview items whose
+values are rewritten as the user scrolls. Updates are diffed by key, and only
+items whose text actually changed are touched, so a refresh of 5,000 rows
+costs a few dozen Tk calls.
+"""
+from collections import namedtuple
+from tkinter import ttk
+
+
+Column = namedtuple("Column", "name heading width format anchor", defaults=(120, str, "w"))
+
+DEFAULT_ROW_HEIGHT = 20
+
+
+def _terms(text):
+    return (text or "").lower().split()
+
+
+def _sort_value(value):
+    # Numbers sort before text (e.g. "N/A" in a size column) and None after both
+    if value is None:
+        return (2, "")
+    if isinstance(value, (int, float)):
+        return (0, value)
+    return (1, str(value).lower())
+
+
+class TableModel:
+    """
+    Rows keyed by key(row), with their formatted cells cached, plus the ordered
+    list of keys that pass the current filter.
+
+    The filter matches rows whose formatted cells contain every word of the
+    query. Narrowing a query (adding words or characters) only re-checks the rows
+    that matched before.
+    """
+
+    def __init__(self, columns, key):
+        self.columns = columns
+        self.key = key
+        self.sort_column = None
+        self.descending = False
+        self.view = []  # keys of matching rows, in display order
+        self._rows = {}
+        self._cells = {}  # key -> tuple of formatted values
+        self._text = {}  # key -> lowercased cells joined for filtering
+        self._terms = []
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def row(self, key):
+        return self._rows[key]
+
+    def cells(self, key):
+        return self._cells[key]
+
+    def set_rows(self, rows):
+        """Replace the rows, re-formatting only new or changed ones. Returns (added, removed, changed)."""
+        incoming = {self.key(row): row for row in rows}
+        removed = [key for key in self._rows if key not in incoming]
+        added, changed = [], []
+        for key, row in incoming.items():
+            old = self._rows.get(key)
+            if old is None:
+                added.append(key)
+            elif old != row:
+                changed.append(key)
+            else:
+                continue
+            self._cells[key] = tuple(column.format(row.get(column.name)) for column in self.columns)
+            self._text[key] = "\t".join(self._cells[key]).lower()
+        for key in removed:
+            del self._cells[key], self._text[key]
+        self._rows = incoming
+
+        if self.sort_column is None:
+            # Unsorted tables show rows in the order they were given
+            self.view = [key for key in incoming if self._matches(key)]
+        elif removed or added or changed:
+            gone = set(removed)
+            fresh = set(added) | set(changed)
+            view = [key for key in self.view if key not in gone and key not in fresh]
+            view += [key for key in added + changed if self._matches(key)]
+            self.view = self._sorted(view)
+        return added, removed, changed
+
+    def set_filter(self, text):
+        terms = _terms(text)
+        # Every old word is inside a new word, so matches can only shrink
+        narrowing = all(any(old in new for new in terms) for old in self._terms)
+        candidates = self.view if narrowing else self._rows
+        self._terms = terms
+        view = [key for key in candidates if self._matches(key)]
+        self.view = view if narrowing else self._sorted(view)
+
+    def sort(self, column, descending=False):
+        self.sort_column, self.descending = column, descending
+        self.view = self._sorted(self.view)
+
+    def _matches(self, key):
+        text = self._text[key]
+        return all(term in text for term in self._terms)
+
+    def _sorted(self, keys):
+        if self.sort_column is None:
+            return list(keys)
+        name = self.sort_column
+        rows = self._rows
+        return sorted(keys, key=lambda key: _sort_value(rows[key].get(name)), reverse=self.descending)
+
+
+class VirtualTable(ttk.Frame):
+    """
+    Sortable, filterable table for large row sets. Rows are dicts; columns are
+    Column tuples whose name is the dict key and whose format turns the value
+    into cell text. Sorting uses the raw values.
+    """
+
+    def __init__(self, master, columns, key, on_activate=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = TableModel(columns, key)
+        self.on_activate = on_activate
+        self.offset = 0
+        self._slots = []  # keys shown in Treeview items "0", "1", ... (None for blank)
+        self._slot_cells = []
+        self._selected = set()
+        self._anchor = None  # index in the view of the keyboard focus
+        self._rendering = False
+
+        self.tree = ttk.Treeview(self, columns=[column.name for column in columns], show="headings",
+                                 selectmode="extended")
+        for column in columns:
+            self.tree.heading(column.name, text=column.heading, command=lambda c=column.name: self.toggle_sort(c))
+            self.tree.column(column.name, width=column.width, anchor=column.anchor)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.bind("<Configure>", lambda event: self.render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self._move_focus(-1, event))
+        self.tree.bind("<Down>", lambda event: self._move_focus(1, event))
+        self.tree.bind("<Prior>", lambda event: self._move_focus(-self.page_size(), event))
+        self.tree.bind("<Next>", lambda event: self._move_focus(self.page_size(), event))
+        self.tree.bind("<Home>", lambda event: self._move_focus(-len(self.model.view), event))
+        self.tree.bind("<End>", lambda event: self._move_focus(len(self.model.view), event))
+        self.tree.bind("<Double-1>", self._on_activate)
+        self.tree.bind("<Return>", self._on_activate)
+
+    # Data
+
+    def set_rows(self, rows):
+        """Diff rows against what is shown and redraw only the cells that changed."""
+        changes = self.model.set_rows(rows)
+        self._selected = {key for key in self._selected if key in self.model}
+        self.render()
+        return changes
+
+    def set_filter(self, text):
+        self.model.set_filter(text)
+        self.offset = 0
+        self._anchor = None
+        self.render()
+
+    def toggle_sort(self, name):
+        descending = not self.model.descending if self.model.sort_column == name else False
+        self.sort(name, descending)
+
+    def sort(self, name, descending=False):
+        self.model.sort(name, descending)
+        for column in self.model.columns:
+            arrow = (" ▼" if descending else " ▲") if column.name == name else ""
+            self.tree.heading(column.name, text=column.heading + arrow)
+        self._anchor = None
+        self.render()
+
+    def selected_rows(self):
+        """Selected rows in display order, including ones scrolled out of view."""
+        return [self.model.row(key) for key in self.model.view if key in self._selected]
+
+    def visible_range(self):
+        """(first, last, total) row numbers of the current window, 1-based."""
+        total = len(self.model.view)
+        shown = sum(key is not None for key in self._slots)
+        return (self.offset + 1 if shown else 0), self.offset + shown, total
+
+    # Scrolling
+
+    def page_size(self):
+        """How many rows fit in the Treeview at its current height."""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return int(self.tree.cget("height")) or 10
+        row_height, heading_height = DEFAULT_ROW_HEIGHT, DEFAULT_ROW_HEIGHT + 4
+        if self._slots:
+            box = self.tree.bbox("0")
+            if box:
+                heading_height, row_height = box[1], box[3]
+        return max(1, (height - heading_height) // row_height)
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.model.view))
+        elif unit == "pages":
+            self.offset += int(amount) * self.page_size()
+        else:
+            self.offset += int(amount)
+        self.render()
+
+    def _move_focus(self, step, event):
+        view = self.model.view
+        if not view:
+            return "break"
+        if self._anchor is None:
+            self._anchor = self.offset
+        else:
+            self._anchor = min(max(self._anchor + step, 0), len(view) - 1)
+        if self._anchor < self.offset:
+            self.offset = self._anchor
+        elif self._anchor >= self.offset + self.page_size():
+            self.offset = self._anchor - self.page_size() + 1
+        if event.state & 0x1 and self._selected:  # Shift extends the selection
+            self._selected.add(view[self._anchor])
+        else:
+            self._selected = {view[self._anchor]}
+        self.render()
+        return "break"
+
+    # Rendering
+
+    def render(self):
+        """Show rows offset..offset+page_size, rewriting only items whose cells changed."""
+        view = self.model.view
+        page = self.page_size()
+        self.offset = max(0, min(self.offset, len(view) - page))
+        window = view[self.offset:self.offset + page]
+        self._rendering = True
+        try:
+            # Grow or shrink the pool of items to the page size
+            while len(self._slots) < page:
+                self.tree.insert("", "end", iid=str(len(self._slots)), values=())
+                self._slots.append(None)
+                self._slot_cells.append(None)
+            while len(self._slots) > page:
+                self.tree.delete(str(len(self._slots) - 1))
+                self._slots.pop()
+                self._slot_cells.pop()
+
+            selection = []
+            for index in range(page):
+                key = window[index] if index < len(window) else None
+                cells = self.model.cells(key) if key is not None else ()
+                if cells != self._slot_cells[index]:
+                    self.tree.item(str(index), values=cells)
+                    self._slot_cells[index] = cells
+                self._slots[index] = key
+                if key is not None and key in self._selected:
+                    selection.append(str(index))
+            if tuple(selection) != self.tree.selection():
+                self.tree.selection_set(selection)
+            if self._anchor is not None and 0 <= self._anchor - self.offset < page:
+                self.tree.focus(str(self._anchor - self.offset))
+            # Never let the Treeview scroll itself; the offset is the only scroll position
+            self.tree.yview_moveto(0)
+        finally:
+            self._rendering = False
+
+        total = len(view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + page) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        self.event_generate("<<VirtualTableChanged>>")
+
+    def _on_select(self, event):
+        if self._rendering:
+            return
+        visible = {key for key in self._slots if key is not None}
+        chosen = {self._slots[int(iid)] for iid in self.tree.selection() if self._slots[int(iid)] is not None}
+        self._selected = (self._selected - visible) | chosen
+        focus = self.tree.focus()
+        if focus and self._slots[int(focus)] is not None:
+            self._anchor = self.offset + int(focus)
+
+    def _on_activate(self, event):
+        focus = self.tree.focus()
+        if self.on_activate and focus and self._slots[int(focus)] is not None:
+            self.on_activate(self.model.row(self._slots[int(focus)]))
+        return "break"
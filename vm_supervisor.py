@@ -0,0 +1,357 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+
+from telemetry import span
+
+
+class QMPError(Exception):
+    """Raised when QEMU rejects a QMP command or the monitor is unreachable."""
+
+
+class QMPClient:
+    """Minimal QEMU Machine Protocol client (one JSON object per line)."""
+
+    def __init__(self, address, timeout=5.0):
+        self.address = address
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+
+    def connect(self):
+        kind, _, target = self.address.partition(":")
+        try:
+            if kind == "unix":
+                self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._sock.settimeout(self.timeout)
+                self._sock.connect(target)
+            else:
+                host, _, port = target.rpartition(":")
+                self._sock = socket.create_connection((host, int(port)), timeout=self.timeout)
+        except OSError as e:
+            raise QMPError(f"Could not connect to QMP monitor at {self.address}: {e}")
+        self._reader = self._sock.makefile("r", encoding="utf-8")
+        greeting = self._read()
+        if "QMP" not in greeting:
+            raise QMPError(f"Unexpected QMP greeting: {greeting}")
+        self.execute("qmp_capabilities")
+        return self
+
+    def execute(self, command, arguments=None):
+        message = {"execute": command}
+        if arguments:
+            message["arguments"] = arguments
+        with span(command, "qmp"):
+            self._sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+            while True:
+                reply = self._read()
+                # Asynchronous events (SHUTDOWN, STOP, ...) can arrive before the reply
+                if "event" in reply:
+                    continue
+                if "error" in reply:
+                    raise QMPError(f"{command}: {reply['error'].get('desc', reply['error'])}")
+                return reply.get("return")
+
+    def close(self):
+        if self._reader:
+            self._reader.close()
+        if self._sock:
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def _read(self):
+        try:
+            line = self._reader.readline()
+        except OSError as e:
+            raise QMPError(f"QMP connection error: {e}")
+        if not line:
+            raise QMPError("QMP connection closed")
+        return json.loads(line)
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pid_alive(pid):
+    if not pid:
+        return False
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        output = subprocess.run(
+            ["tasklist", "/FI", f"PID eq {pid}", "/NH"], stdout=subprocess.PIPE, text=True
+        ).stdout
+        return str(pid) in output
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class VMSupervisor:
+    """
+    Launches and tracks QEMU VMs, each with its own QMP control socket.
+
+    VM records are persisted to vms.json in state_dir, and the VMs are started in
+    their own session, so after an app restart reattach() picks them up again.
+    """
+
+    def __init__(self, state_dir=None):
+        self.state_dir = state_dir or os.path.join(os.path.expanduser("~"), ".vmms", "vms")
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.state_file = os.path.join(self.state_dir, "vms.json")
+        self.vms = {}
+        self._processes = {}
+        self._lock = threading.RLock()
+        self.reattach()
+
+    def reattach(self):
+        """Reload persisted VMs and drop any whose QEMU process has exited."""
+        with self._lock:
+            try:
+                with open(self.state_file, "r") as f:
+                    records = json.load(f)
+            except (OSError, ValueError):
+                records = {}
+            self.vms = {name: vm for name, vm in records.items() if pid_alive(vm.get("pid"))}
+            self._save()
+        return list(self.vms.values())
+
+    def start(self, name, cmd, image=None, iso=None, **details):
+        """Launch cmd (a qemu-system argument list) with a QMP monitor attached."""
+        with self._lock:
+            if name in self.vms and self.alive(name):
+                raise ValueError(f"A VM named {name} is already running")
+            if hasattr(socket, "AF_UNIX") and os.name != "nt":
+                qmp = f"unix:{os.path.join(self.state_dir, name + '.qmp')}"
+                if os.path.exists(qmp[5:]):
+                    os.remove(qmp[5:])
+            else:
+                qmp = f"tcp:127.0.0.1:{_free_port()}"
+            full_cmd = list(cmd) + ["-qmp", f"{qmp},server=on,wait=off", "-name", name]
+
+            log_path = os.path.join(self.state_dir, name + ".log")
+            popen_kwargs = {}
+            if os.name == "nt":
+                popen_kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                popen_kwargs["start_new_session"] = True
+            with open(log_path, "ab") as log_file, span("launch", "qemu", vm=name):
+                process = subprocess.Popen(full_cmd, stdout=log_file, stderr=subprocess.STDOUT, **popen_kwargs)
+
+            vm = {
+                "name": name,
+                "pid": process.pid,
+                "qmp": qmp,
+                "cmd": full_cmd,
+                "image": image,
+                "iso": iso,
+                "log": log_path,
+                "started_at": time.time(),
+            }
+            vm.update(details)
+            self.vms[name] = vm
+            self._processes[name] = process
+            self._save()
+        return vm
+
+    def alive(self, name):
+        process = self._processes.get(name)
+        if process is not None:
+            # Our own children stay visible to os.kill as zombies until reaped
+            return process.poll() is None
+        vm = self.vms.get(name)
+        return vm is not None and pid_alive(vm["pid"])
+
+    def qmp(self, name, command, arguments=None):
+        vm = self._get(name)
+        deadline = time.monotonic() + 5
+        # The monitor socket appears shortly after QEMU starts
+        while True:
+            try:
+                with QMPClient(vm["qmp"]) as client:
+                    return client.execute(command, arguments)
+            except QMPError:
+                if time.monotonic() > deadline or not self.alive(name):
+                    raise
+                time.sleep(0.2)
+
+    def pause(self, name):
+        self.qmp(name, "stop")
+
+    def resume(self, name):
+        self.qmp(name, "cont")
+
+    def hmp(self, name, command_line):
+        """Run a human monitor command, for savevm/loadvm/delvm which QMP only wraps as jobs."""
+        output = self.qmp(name, "human-monitor-command", {"command-line": command_line})
+        # HMP reports failures as text rather than as a QMP error
+        if output and output.strip():
+            raise QMPError(f"{command_line}: {output.strip()}")
+
+    def savevm(self, name, tag):
+        """Snapshot disk and RAM into the VM's qcow2 image while it runs."""
+        self.hmp(name, f"savevm {tag}")
+
+    def loadvm(self, name, tag):
+        """Revert the running VM, RAM included, to a savevm snapshot."""
+        self.hmp(name, f"loadvm {tag}")
+
+    def delvm(self, name, tag):
+        self.hmp(name, f"delvm {tag}")
+
+    def live_snapshot(self, name, overlay, image=None):
+        """
+        Take an external snapshot of a running VM: QEMU creates overlay on top of
+        image and writes there from now on, leaving image as the frozen snapshot.
+        Returns the block device that was switched.
+        """
+        image = os.path.abspath(image or self._get(name)["image"])
+        device = None
+        for block in self.qmp(name, "query-block"):
+            inserted = block.get("inserted") or {}
+            if inserted.get("file") and os.path.abspath(inserted["file"]) == image:
+                device = block.get("device") or block.get("qdev")
+                break
+        if not device:
+            raise QMPError(f"No disk of VM {name} uses {image}")
+        self.qmp(name, "blockdev-snapshot-sync",
+                 {"device": device, "snapshot-file": os.path.abspath(overlay), "format": "qcow2"})
+        with self._lock:
+            self.vms[name]["image"] = os.path.abspath(overlay)
+            self._save()
+        return device
+
+    def vnc_address(self, name):
+        """'host:port' the VM's VNC server listens on, or None without VNC. Saved in the VM's record."""
+        vnc = self.qmp(name, "query-vnc")
+        address = f"{vnc['host']}:{vnc['service']}" if vnc.get("enabled") else None
+        with self._lock:
+            self.vms[name]["vnc"] = address
+            self._save()
+        return address
+
+    def pin_cpus(self, name, cpus):
+        """
+        Pin each vCPU thread to one host CPU (round-robin over cpus). Linux only.
+        Returns {vcpu index: host cpu}.
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            raise OSError("CPU pinning needs os.sched_setaffinity (Linux)")
+        pinned = {}
+        for vcpu in self.qmp(name, "query-cpus-fast"):
+            host_cpu = cpus[vcpu["cpu-index"] % len(cpus)]
+            os.sched_setaffinity(vcpu["thread-id"], {host_cpu})
+            pinned[vcpu["cpu-index"]] = host_cpu
+        return pinned
+
+    def status(self, name):
+        if not self.alive(name):
+            return "stopped"
+        try:
+            return self.qmp(name, "query-status")["status"]
+        except QMPError:
+            return "unknown"
+
+    def stop(self, name, timeout=30, force=False):
+        """
+        Shut a VM down: ACPI powerdown first, then QMP quit, then kill the process.
+        Returns how it was stopped.
+        """
+        vm = self._get(name)
+        how = "killed"
+        if not force and self.alive(name):
+            for command, how_now in (("system_powerdown", "shutdown"), ("quit", "quit")):
+                try:
+                    self.qmp(name, command)
+                except QMPError:
+                    continue
+                if self._wait_exit(name, timeout if command == "system_powerdown" else 5):
+                    how = how_now
+                    break
+        if self.alive(name):
+            self._kill(vm["pid"])
+            self._wait_exit(name, 5)
+            how = "killed"
+        self._forget(name, vm["pid"])
+        return how
+
+    def wait(self, name, poll_interval=1.0):
+        """Block until the VM exits. Returns QEMU's exit code when it is our child."""
+        with self._lock:
+            vm = self.vms.get(name)
+            process = self._processes.get(name)
+        if vm is None:
+            return None
+        # Track this process, not the name: the VM may be rebooted under the same name meanwhile
+        if process is not None:
+            code = process.wait()
+        else:
+            while pid_alive(vm["pid"]):
+                time.sleep(poll_interval)
+            code = None
+        self._forget(name, vm["pid"])
+        return code
+
+    def list(self):
+        with self._lock:
+            vms = [dict(vm) for vm in self.vms.values()]
+        for vm in vms:
+            vm["status"] = self.status(vm["name"])
+        return vms
+
+    def _get(self, name):
+        with self._lock:
+            if name not in self.vms:
+                raise KeyError(f"No VM named {name}")
+            return self.vms[name]
+
+    def _wait_exit(self, name, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.alive(name):
+                return True
+            time.sleep(0.2)
+        return False
+
+    def _kill(self, pid):
+        try:
+            if os.name == "nt":
+                subprocess.run(["taskkill", "/F", "/PID", str(pid)], stdout=subprocess.DEVNULL)
+            else:
+                os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def _forget(self, name, pid):
+        """Drop the record of name, unless it now belongs to a newer process than pid."""
+        with self._lock:
+            vm = self.vms.get(name)
+            if vm is None or vm["pid"] != pid:
+                return
+            del self.vms[name]
+            self._processes.pop(name, None)
+            self._save()
+        if vm and vm["qmp"].startswith("unix:") and os.path.exists(vm["qmp"][5:]):
+            os.remove(vm["qmp"][5:])
+
+    def _save(self):
+        temp_path = self.state_file + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.vms, f, indent=2)
+        os.replace(temp_path, self.state_file)
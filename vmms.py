@@ -0,0 +1,815 @@
+"""
+Non-interactive API for the VM Management System.
+
+Every operation the GUI offers is available here as a plain function that takes
+arguments and returns JSON-friendly data, so scripts and the CLI can drive it
+without Tk. Nothing connects to Docker until an operation needs it.
+"""
+import os
+import threading
+import time
+
+import qemu_images
+from build_queue import BuildTarget, dependency_graph, run_queue
+from bulk_pull import bulk_pull
+from container_batch import run_batch, select_containers
+from container_logs import DEFAULT_BUFFER_LINES, LogFollower, export_logs, filter_lines, parse_log, parse_time
+from docker_build import BuildTimer, buildkit_available, buildkit_build, context_size, ensure_dockerignore
+from docker_connection import DockerConnection, DockerUnavailable
+from docker_stream import build_image, format_bytes, pull_image
+from dockerfile_lint import estimate_layers, lint, parse_dockerfile
+from hub_search import HubSearchClient, sort_results
+from image_query import image_rows, query_images
+from inventory import Inventory, container_row, image_row
+from launch_spec import LaunchSpec, launch, load_templates
+from qemu_profiles import build_qemu_command, get_profile
+from reclaim import (DEFAULT_TARGETS as RECLAIM_DEFAULT_TARGETS, TARGETS as RECLAIM_TARGETS, docker_usage,
+                     qcow2_usage, reclaim)
+from state_store import KINDS, StateStore, remove_files
+from telemetry import telemetry, traced
+from vm_supervisor import VMSupervisor
+
+
+connection = DockerConnection()
+_inventory = None
+_supervisor = None
+_hub_search = None
+_state = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared Docker client, connecting on first use (raises DockerUnavailable)."""
+    return connection.get()
+
+
+def get_inventory():
+    """Return the shared event-driven inventory, loading it on first use."""
+    global _inventory
+    client = get_client()
+    with _lock:
+        if _inventory is None:
+            _inventory = Inventory(client)
+            _inventory.start()
+    return _inventory
+
+
+def get_supervisor():
+    """Return the VM supervisor, reattaching to VMs left running by a previous session."""
+    global _supervisor
+    with _lock:
+        if _supervisor is None:
+            _supervisor = VMSupervisor()
+    return _supervisor
+
+
+def get_state():
+    """Return the persistent record of everything this tool has created."""
+    global _state
+    with _lock:
+        if _state is None:
+            _state = StateStore()
+    return _state
+
+
+def get_hub_search():
+    """Return the shared Docker Hub search client (cached, rate-limited)."""
+    global _hub_search
+    with _lock:
+        if _hub_search is None:
+            _hub_search = HubSearchClient()
+    return _hub_search
+
+
+def shutdown():
+    if _inventory is not None:
+        _inventory.stop()
+
+
+def _cached_inventory():
+    # One-shot callers (CLI, scripts) query the daemon directly instead of
+    # paying for an inventory load and an events connection
+    if _inventory is not None and _inventory.loaded.is_set():
+        return _inventory
+    return None
+
+
+# QEMU
+
+@traced()
+def create_image(name, size, location, preallocation="off", cluster_size=None, backing_file=None, tag=None):
+    path = qemu_images.create_image(
+        name, size, location,
+        preallocation=preallocation, cluster_size=cluster_size, backing_file=backing_file,
+    )
+    get_state().record("qemu_image", os.path.abspath(path), tag=tag, size_mb=size, backing_file=backing_file)
+    return path
+
+
+@traced()
+def clone_image(base_image, name, location=None, count=1, tag=None):
+    paths = qemu_images.clone_image(base_image, name, location, count=count)
+    get_state().record_many("qemu_image", [os.path.abspath(path) for path in paths], tag=tag,
+                            backing_file=base_image)
+    return paths
+
+
+@traced()
+def commit_image(image):
+    """
+    Merge an overlay's changes down into its backing file. Refused while a
+    running VM uses the overlay, its base or another overlay of that base, and
+    while other overlays are based on it: they would see the base change
+    under them.
+    """
+    image = os.path.abspath(image)
+    backing = qemu_images.backing_path(image, qemu_images.info(image, force_share=True))
+    if not backing:
+        raise ValueError(f"{image} is not an overlay; there is no base image to commit into")
+    vms = get_supervisor()
+    for vm in list(vms.vms.values()):
+        disk = vm.get("image")
+        if not disk or not vms.alive(vm["name"]):
+            continue
+        disk = os.path.abspath(disk)
+        if disk in (image, backing) or qemu_images.backing_path(
+                disk, qemu_images.info(disk, force_share=True)) == backing:
+            raise ValueError(f"VM {vm['name']} is running on {disk}; stop it before committing into {backing}")
+    others = [path for path in _dependents(backing) if os.path.abspath(path) != image]
+    if others:
+        raise ValueError(f"{backing} is also the backing file of {', '.join(others)}; committing would corrupt them")
+    qemu_images.commit(image)
+    return {"image": image, "backing_file": backing}
+
+
+@traced()
+def boot(ram, cores, imagefile, isofile=None, name=None, profile="desktop", cpu_pinning=None):
+    """Start a VM in the background and return its record. Use wait_vm() to block on it."""
+    boot_profile = get_profile(profile, cpu_pinning=list(cpu_pinning or []))
+    vms = get_supervisor()
+    name = name or os.path.splitext(os.path.basename(imagefile))[0]
+    base_name, suffix = name, 2
+    while name in vms.vms:
+        name = f"{base_name}-{suffix}"
+        suffix += 1
+
+    # -drive needs the format spelled out; -hda (the ide bus) still probes it itself
+    disk_format = qemu_images.info(imagefile)["format"] if boot_profile.disk_bus != "ide" else "qcow2"
+    cmd = build_qemu_command(boot_profile, ram, cores, imagefile, isofile, disk_format=disk_format)
+    vm = vms.start(name, cmd, image=imagefile, iso=isofile, ram=ram, cores=cores,
+                   profile=boot_profile.to_dict())
+    if boot_profile.display == "vnc":
+        vm["vnc"] = vms.vnc_address(name)
+    if boot_profile.cpu_pinning:
+        vm["pinned"] = vms.pin_cpus(name, boot_profile.cpu_pinning)
+    get_state().record("vm", name, image=imagefile, iso=isofile, ram=ram, cores=cores, profile=boot_profile.name)
+    return vm
+
+
+def wait_vm(name):
+    return get_supervisor().wait(name)
+
+
+@traced()
+def list_vms():
+    return get_supervisor().list()
+
+
+@traced()
+def stop_vm(name, force=False, timeout=30):
+    return {"name": name, "stopped": get_supervisor().stop(name, timeout=timeout, force=force)}
+
+
+@traced()
+def pause_vm(name):
+    get_supervisor().pause(name)
+    return {"name": name, "status": "paused"}
+
+
+@traced()
+def resume_vm(name):
+    get_supervisor().resume(name)
+    return {"name": name, "status": "running"}
+
+
+# QEMU snapshots
+
+def _running_vm(image):
+    """Name of the running VM whose disk is image, or None."""
+    image = os.path.abspath(image)
+    vms = get_supervisor()
+    for vm in list(vms.vms.values()):
+        if vm.get("image") and os.path.abspath(vm["image"]) == image and vms.alive(vm["name"]):
+            return vm["name"]
+    return None
+
+
+def _dependents(image):
+    """Existing images this tool created with image as their backing file."""
+    image = os.path.abspath(image)
+    return [artifact["ref"] for artifact in get_state().find(kind="qemu_image")
+            if artifact["details"].get("backing_file")
+            and os.path.abspath(artifact["details"]["backing_file"]) == image
+            and os.path.exists(artifact["ref"])]
+
+
+def _check_no_dependents(image):
+    dependents = _dependents(image)
+    if dependents:
+        raise ValueError(f"{image} is the backing file of {', '.join(dependents)}; resetting it would corrupt them")
+
+
+@traced()
+def list_snapshots(image):
+    return qemu_images.snapshots(image, force_share=_running_vm(image) is not None)
+
+
+@traced()
+def snapshot_tree(paths=None, location=None):
+    """
+    Images and their internal snapshots as a forest linked by backing file, with
+    "vm" set on images a running VM uses. Defaults to the qemu images this tool
+    created; location lists every .img/.qcow2 file in a directory instead.
+    """
+    if location:
+        paths = [os.path.join(location, entry) for entry in sorted(os.listdir(location))
+                 if entry.endswith((".img", ".qcow2"))]
+    elif paths is None:
+        paths = [artifact["ref"] for artifact in get_state().find(kind="qemu_image") if os.path.exists(artifact["ref"])]
+    in_use = {os.path.abspath(vm["image"]): vm["name"] for vm in list_vms()
+              if vm.get("image") and vm["status"] != "stopped"}
+    roots = qemu_images.snapshot_tree(paths)
+    pending = list(roots)
+    while pending:
+        node = pending.pop()
+        node["vm"] = in_use.get(node["path"])
+        pending += node["children"]
+    return roots
+
+
+@traced()
+def create_snapshot(image, name, external=False):
+    """
+    Snapshot a qcow2 disk. Internal snapshots are stored inside the image; with a
+    VM running on it they are taken live with savevm and include RAM, so a restore
+    resumes exactly where the VM was. External snapshots freeze the image and carry
+    on in a new overlay, <image>-<name>.img (live with blockdev-snapshot-sync),
+    which becomes the disk to use from then on.
+    """
+    qemu_images.check_snapshot_name(name)
+    image = os.path.abspath(image)
+    vm = _running_vm(image)
+    if not external:
+        if vm:
+            get_supervisor().savevm(vm, name)
+        else:
+            qemu_images.create_snapshot(image, name)
+        return {"image": image, "snapshot": name, "type": "internal", "vm": vm}
+
+    stem = os.path.splitext(os.path.basename(image))[0]
+    overlay = os.path.join(os.path.dirname(image), f"{stem}-{name}.img")
+    if os.path.exists(overlay):
+        raise ValueError(f"{overlay} already exists")
+    if vm:
+        get_supervisor().live_snapshot(vm, overlay, image)
+    else:
+        qemu_images.create_overlay(image, f"{stem}-{name}")
+    get_state().record("qemu_image", overlay, tag="snapshot", backing_file=image, snapshot=name)
+    return {"image": image, "snapshot": name, "type": "external", "vm": vm, "active": overlay}
+
+
+@traced()
+def restore_snapshot(image, name):
+    """
+    Revert image to an internal snapshot. With a VM running on it this is loadvm,
+    which needs a snapshot taken live (it restores RAM too); otherwise only the
+    disk is reverted, with qemu-img.
+    """
+    started = time.perf_counter()
+    image = os.path.abspath(image)
+    vm = _running_vm(image)
+    snapshot = next((s for s in qemu_images.snapshots(image, force_share=vm is not None) if s["name"] == name), None)
+    if snapshot is None:
+        raise ValueError(f"{image} has no snapshot named {name}")
+    _check_no_dependents(image)
+    if vm:
+        if not snapshot.get("vm-state-size"):
+            raise ValueError(f"Snapshot {name} holds no VM state; stop VM {vm} to restore its disk")
+        get_supervisor().loadvm(vm, name)
+    else:
+        qemu_images.apply_snapshot(image, name)
+    return {"image": image, "snapshot": name, "vm": vm, "method": "loadvm" if vm else "qemu-img",
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+@traced()
+def delete_snapshot(image, name):
+    image = os.path.abspath(image)
+    vm = _running_vm(image)
+    if vm:
+        get_supervisor().delvm(vm, name)
+    else:
+        qemu_images.delete_snapshot(image, name)
+    return {"image": image, "snapshot": name, "deleted": True}
+
+
+@traced()
+def reset_image(image):
+    """
+    Discard everything written to an overlay since it was created, including any
+    internal snapshots in it. Refused while the overlay is a VM's disk or the
+    backing file of another image this tool created.
+    """
+    started = time.perf_counter()
+    vm = _running_vm(image)
+    if vm:
+        raise ValueError(f"{image} is in use by running VM {vm}; use reset_vm or stop it first")
+    _check_no_dependents(image)
+    backing = qemu_images.reset_overlay(image)
+    return {"image": os.path.abspath(image), "backing_file": backing,
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+@traced()
+def reset_vm(name, snapshot=None):
+    """
+    Put a VM back to a known-good state. With snapshot, revert to that internal
+    snapshot (loadvm while it runs). Without, power it off, replace its overlay
+    disk with an empty one on the same base and boot it again with the same
+    settings: a clean machine in seconds instead of a reinstall.
+    """
+    vms = get_supervisor()
+    if name not in vms.vms:
+        raise KeyError(f"No VM named {name}")
+    vm = dict(vms.vms[name])
+    if snapshot:
+        return restore_snapshot(vm["image"], snapshot)
+    _check_no_dependents(vm["image"])
+    # Refuse before stopping anything: a standalone image has no clean base to go back to
+    if not qemu_images.backing_path(vm["image"], qemu_images.info(vm["image"], force_share=True)):
+        raise ValueError(f"{vm['image']} is not an overlay; give a snapshot to restore instead")
+    started = time.perf_counter()
+    vms.stop(name, force=True)
+    qemu_images.reset_overlay(vm["image"])
+    profile = vm.get("profile") or {}
+    booted = boot(vm["ram"], vm["cores"], vm["image"], vm.get("iso"), name=name,
+                  profile=profile.get("name", "desktop"), cpu_pinning=profile.get("cpu_pinning"))
+    return {"name": booted["name"], "image": vm["image"], "method": "reset overlay",
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+# Docker images
+
+@traced()
+def build_docker_image(dockerfile_path, tag, context_dir=None, buildkit=None, cache_dir=None, no_cache=False,
+                       on_line=None, job=None):
+    """
+    Build tag from dockerfile_path. A .dockerignore is generated for the context
+    if it has none, and the context size is reported before anything is sent.
+
+    buildkit=None uses `docker buildx` with a local layer cache when the CLI is
+    installed and falls back to the Engine API builder otherwise.
+    """
+    context_dir = context_dir or os.path.dirname(os.path.abspath(dockerfile_path))
+    on_line = on_line or (lambda line: None)
+    if ensure_dockerignore(context_dir):
+        get_state().record("file", os.path.join(context_dir, ".dockerignore"), tag="build")
+        on_line(f"Generated {os.path.join(context_dir, '.dockerignore')}")
+    files, size = context_size(context_dir, os.path.relpath(dockerfile_path, context_dir))
+    on_line(f"Build context: {files} files, {format_bytes(size)}")
+
+    if buildkit is None:
+        buildkit = buildkit_available()
+    timer = BuildTimer()
+    started = time.monotonic()
+    if buildkit:
+        image_id = buildkit_build(context_dir, dockerfile_path, tag, cache_dir=cache_dir, no_cache=no_cache,
+                                  on_line=on_line, job=job, timer=timer)
+    else:
+        image_id = build_image(get_client(), context_dir, dockerfile_path, tag, on_line=on_line, job=job,
+                               nocache=no_cache, timer=timer)
+    on_line(timer.summary())
+    get_state().record("image", tag, id=image_id, dockerfile=os.path.abspath(dockerfile_path))
+    return {
+        "tag": tag,
+        "id": image_id,
+        "builder": "buildkit" if buildkit else "classic",
+        "context_files": files,
+        "context_bytes": size,
+        "seconds": round(time.monotonic() - started, 2),
+        "steps": [
+            {"name": step["name"], "seconds": step["seconds"], "cached": step["cached"]}
+            for step in timer.steps.values()
+        ],
+    }
+
+
+@traced()
+def lint_dockerfile(dockerfile_path):
+    with open(dockerfile_path, "r") as f:
+        content = f.read()
+    return {
+        "dockerfile": dockerfile_path,
+        "layers": estimate_layers(parse_dockerfile(content)),
+        "findings": [finding._asdict() for finding in lint(content)],
+    }
+
+
+@traced()
+def build_docker_images(targets, concurrency=2, buildkit=None, no_cache=False, on_line=None, on_result=None,
+                        job=None):
+    """
+    Build many images at once. targets are dicts with dockerfile, tag and an
+    optional context; images that build FROM another target wait for it.
+
+    Those dependent images use the Engine API builder: the buildx builder runs in
+    its own container and would look for the freshly built parent in a registry
+    instead of the local image store.
+    """
+    targets = [
+        target if isinstance(target, BuildTarget) else
+        BuildTarget(target["dockerfile"], target["tag"], target.get("context") or "")
+        for target in targets
+    ]
+    graph = dependency_graph(targets)
+
+    def build(target):
+        prefix_line = (lambda line: on_line(f"[{target.tag}] {line}")) if on_line else None
+        result = build_docker_image(target.dockerfile, target.tag, context_dir=target.context_dir,
+                                    buildkit=False if graph[target.tag] else buildkit, no_cache=no_cache,
+                                    on_line=prefix_line, job=job)
+        return result["id"]
+
+    return run_queue(build, targets, concurrency=concurrency, on_result=on_result, job=job)
+
+
+@traced()
+def pull_docker_image(image_name, on_line=None, job=None):
+    image = pull_image(get_client(), image_name, on_line=on_line, job=job)
+    return {"image": image_name, "id": image.id, "size": image.attrs.get("Size", 0)}
+
+
+@traced()
+def bulk_pull_images(refs, concurrency=4, on_line=None, job=None):
+    return bulk_pull(get_client(), refs, concurrency=concurrency, on_line=on_line, job=job)
+
+
+@traced()
+def list_docker_images():
+    inventory = _cached_inventory()
+    if inventory:
+        images = inventory.images()
+    else:
+        images = [image_row(s) for s in connection.call(lambda client: client.api.images())]
+    return sorted(images, key=lambda image: image["created"], reverse=True)
+
+
+@traced()
+def search_local_images(pattern=None, **filters):
+    """Filter local images; see image_query.query_images for the filters."""
+    rows = query_images(image_rows(list_docker_images()), pattern=pattern, **filters)
+    return [row._asdict() for row in rows]
+
+
+@traced()
+def search_dockerhub_images(term, limit=25, sort_by=None, descending=True):
+    """Search Docker Hub directly (no daemon needed); follows pages up to limit results."""
+    rows = get_hub_search().search_all(term, limit=limit)
+    return sort_results(rows, sort_by, descending) if sort_by else rows
+
+
+@traced()
+def search_dockerhub_page(term, page=1, page_size=25):
+    return get_hub_search().search(term, page=page, page_size=page_size)
+
+
+# Docker containers
+
+@traced()
+def list_containers(all=True):
+    inventory = _cached_inventory()
+    if inventory:
+        return inventory.containers(running_only=not all)
+    return [container_row(s) for s in connection.call(lambda client: client.api.containers(all=all))]
+
+
+@traced()
+def list_running_containers():
+    return list_containers(all=False)
+
+
+@traced()
+def search_docker_containers(query):
+    inventory = _cached_inventory()
+    if inventory:
+        matches = inventory.search_containers(query)
+    else:
+        query_lower = query.lower()
+        matches = [
+            row for row in list_containers(all=True)
+            if query_lower in row["name"].lower() or row["id"].startswith(query_lower)
+        ]
+    return sorted(matches, key=lambda row: row["name"])
+
+
+@traced()
+def start_container(image_name, container_name=None):
+    container = connection.call(
+        lambda client: client.containers.run(image_name, name=container_name, detach=True)
+    )
+    get_state().record("container", container.id, name=container.name, image=image_name)
+    return {"id": container.id, "name": container.name, "image": image_name, "status": container.status}
+
+
+@traced()
+def stop_container(container_name, timeout=10):
+    container = connection.call(lambda client: client.containers.get(container_name))
+    container.stop(timeout=timeout)
+    container.reload()
+    return {"id": container.id, "name": container.name, "status": container.status}
+
+
+@traced()
+def container_logs(names, tail=100, since=None, until=None, pattern=None):
+    """
+    The last tail lines of one or more containers, merged in time order, as
+    {"container", "time", "line"} dicts. since/until take '10m', '2h', ISO times or
+    epoch seconds; pattern is a case-insensitive regex.
+    """
+    names = [names] if isinstance(names, str) else list(names)
+    since, until = parse_time(since), parse_time(until)
+    lines = []
+    for name in names:
+        data = connection.call(lambda client, n=name: client.api.logs(
+            n, timestamps=True, tail=tail if tail is not None else "all", since=since, until=until))
+        lines += parse_log(name, data)
+    lines.sort(key=lambda line: line.time)
+    return [{"container": line.container, "time": line.time, "line": line.text}
+            for line in filter_lines(lines, pattern=pattern)]
+
+
+@traced()
+def export_container_logs(name, path, since=None, until=None, timestamps=True, job=None):
+    """
+    Stream a container's whole log, or the since..until part of it, straight to
+    path. The export is the user's file, so it is not recorded for cleanup.
+    """
+    started = time.time()
+    written = export_logs(get_client(), name, path, since=parse_time(since), until=parse_time(until),
+                          timestamps=timestamps, job=job)
+    return {"container": name, "path": os.path.abspath(path), "bytes": written,
+            "seconds": round(time.time() - started, 3)}
+
+
+def follow_container_logs(names, tail=100, buffer_lines=DEFAULT_BUFFER_LINES, on_line=None, on_end=None):
+    """
+    Follow one or more containers' logs in the background, keeping at most
+    buffer_lines lines per container. Returns the LogFollower; call stop() on it.
+    """
+    follower = LogFollower(connection.get_streaming(), tail=tail, buffer_lines=buffer_lines, on_line=on_line, on_end=on_end)
+    for name in ([names] if isinstance(names, str) else names):
+        follower.follow(name)
+    return follower
+
+
+@traced()
+def batch_containers(action, names=None, labels=None, pattern=None, max_workers=16, timeout=10,
+                     force=False, on_result=None, job=None):
+    """Start/stop/restart/remove every container matching names, labels and pattern, concurrently."""
+    if not (names or labels or pattern):
+        raise ValueError("Select containers by names, labels or pattern")
+    client = get_client()
+    containers = select_containers(client, names=names, labels=labels, pattern=pattern)
+    return run_batch(client, action, containers, max_workers=max_workers, timeout=timeout, force=force,
+                     on_result=on_result, job=job)
+
+
+@traced()
+def list_templates():
+    return {name: spec.to_dict() for name, spec in load_templates().items()}
+
+
+@traced()
+def launch_containers(spec=None, template=None, replicas=1, max_workers=8, on_result=None, job=None, **overrides):
+    """
+    Run replicas of a launch spec (a dict or LaunchSpec) or of a saved template,
+    with any spec field overridden by keyword, e.g. image="nginx:1.25".
+    """
+    if template:
+        templates = load_templates()
+        if template not in templates:
+            raise ValueError(f"No launch template named {template}")
+        spec = templates[template].to_dict()
+    elif isinstance(spec, LaunchSpec):
+        spec = spec.to_dict()
+    spec = LaunchSpec.from_dict({**(spec or {}), **overrides})
+    results = launch(get_client(), spec, replicas=replicas, max_workers=max_workers, on_result=on_result, job=job)
+    for result in results:
+        if result["status"] == "started":
+            get_state().record("container", result["id"], tag=template, name=result["name"], image=spec.image)
+    return results
+
+
+# Created artifacts
+
+def record_file(path, tag=None):
+    """Remember a file the GUI wrote so cleanup can remove it later."""
+    get_state().record("file", os.path.abspath(path), tag=tag)
+
+
+@traced()
+def list_artifacts(kind=None, tag=None, older_than_days=None, limit=None):
+    older_than = older_than_days * 86400 if older_than_days is not None else None
+    return get_state().find(kind=kind, tag=tag, older_than=older_than, limit=limit)
+
+
+@traced()
+def artifact_counts():
+    return get_state().counts()
+
+
+@traced()
+def cleanup_artifacts(kind=None, tag=None, older_than_days=None, job=None):
+    """
+    Remove every recorded artifact matching kind (one kind or a list), tag and
+    age, then drop their records in one transaction. VMs are stopped first, then
+    files unlinked, containers force-removed and built images deleted.
+
+    Disk images still in use by a running VM, or backing an overlay that is not
+    removed too, are kept and reported as errors.
+    """
+    kinds = [kind] if isinstance(kind, str) else list(kind or KINDS)
+    artifacts = list_artifacts(kind=kinds, tag=tag, older_than_days=older_than_days)
+    by_kind = {}
+    for artifact in artifacts:
+        by_kind.setdefault(artifact["kind"], []).append(artifact)
+
+    removed, errors = [], []
+    if by_kind.get("vm"):
+        vms = get_supervisor()
+        for artifact in by_kind["vm"]:
+            try:
+                if artifact["ref"] in vms.vms:
+                    vms.stop(artifact["ref"], force=True)
+                removed.append(artifact)
+            except Exception as e:
+                errors.append({"kind": "vm", "ref": artifact["ref"], "error": str(e)})
+    kept = {}  # path -> why it must stay
+    for artifact in by_kind.get("file", []) + by_kind.get("qemu_image", []):
+        vm = _running_vm(artifact["ref"])
+        if vm:
+            kept[os.path.abspath(artifact["ref"])] = f"in use by VM {vm}"
+    # A backing file may only go if every overlay on it goes too; keeping one can keep its base
+    removing = {os.path.abspath(artifact["ref"]) for artifact in by_kind.get("qemu_image", [])}
+    changed = True
+    while changed:
+        changed = False
+        for path in removing - set(kept):
+            dependents = [dependent for dependent in _dependents(path)
+                          if os.path.abspath(dependent) not in removing or os.path.abspath(dependent) in kept]
+            if dependents:
+                kept[path] = f"backing file of {', '.join(dependents)}"
+                changed = True
+    for files_kind in ("file", "qemu_image"):
+        deletable = []
+        for artifact in by_kind.get(files_kind, []):
+            reason = kept.get(os.path.abspath(artifact["ref"]))
+            if reason:
+                errors.append({"kind": files_kind, "ref": artifact["ref"], "error": reason})
+            else:
+                deletable.append(artifact)
+        done, failed = remove_files(deletable)
+        removed += done
+        errors += failed
+    if by_kind.get("container"):
+        containers = [{"id": a["ref"], "name": a["details"].get("name", a["ref"])} for a in by_kind["container"]]
+        results = run_batch(get_client(), "remove", containers, force=True, job=job)
+        outcome = {result["id"]: result for result in results}
+        for artifact in by_kind["container"]:
+            error = outcome[artifact["ref"]]["error"]
+            if error and "No such container" not in error:
+                errors.append({"kind": "container", "ref": artifact["ref"], "error": error})
+            else:
+                removed.append(artifact)
+    if by_kind.get("image"):
+        from docker.errors import ImageNotFound
+
+        client = get_client()
+        for artifact in by_kind["image"]:
+            try:
+                client.api.remove_image(artifact["ref"])
+            except ImageNotFound:
+                pass
+            except Exception as e:
+                errors.append({"kind": "image", "ref": artifact["ref"], "error": str(e)})
+                continue
+            removed.append(artifact)
+
+    get_state().forget_ids([artifact["id"] for artifact in removed])
+    counts = {}
+    for artifact in removed:
+        counts[artifact["kind"]] = counts.get(artifact["kind"], 0) + 1
+    return {"removed": len(removed), "by_kind": counts, "errors": errors}
+
+
+# Disk space
+
+def _qcow2_candidates(paths):
+    if paths is None:
+        paths = [artifact["ref"] for artifact in get_state().find(kind="qemu_image")]
+    paths = [os.path.abspath(path) for path in paths if os.path.exists(path)]
+    vms = get_supervisor()
+    running = {os.path.abspath(vm["image"]) for vm in list(vms.vms.values())
+               if vm.get("image") and vms.alive(vm["name"])}
+    return paths, running
+
+
+@traced()
+def disk_usage(qcow2_paths=None, all_images=False):
+    """
+    Reclaimable space before anything is deleted. qcow2_paths defaults to every
+    qcow2 image this tool created.
+    """
+    paths, running = _qcow2_candidates(qcow2_paths)
+    result = {"docker": None, "qcow2": qcow2_usage(paths, running), "errors": []}
+    try:
+        result["docker"] = docker_usage(get_client(), all_images=all_images)
+    except DockerUnavailable as e:
+        result["errors"].append({"target": "docker", "error": str(e)})
+    return result
+
+
+@traced()
+def reclaim_space(targets=RECLAIM_DEFAULT_TARGETS, until=None, labels=None, all_images=False, qcow2_paths=None,
+                  on_line=None, job=None):
+    """
+    Prune Docker images/containers/build cache and compact qcow2 images; reports
+    bytes freed. Volumes are only pruned when listed in targets.
+    """
+    unknown = set(targets) - set(RECLAIM_TARGETS)
+    if unknown:
+        raise ValueError(f"Unknown reclaim target: {', '.join(sorted(unknown))}")
+    paths, running = _qcow2_candidates(qcow2_paths)
+    errors, client = [], None
+    if any(target != "qcow2" for target in targets):
+        try:
+            client = get_client()
+        except DockerUnavailable as e:
+            errors.append({"target": "docker", "error": str(e)})
+            targets = [target for target in targets if target == "qcow2"]
+    result = reclaim(client, targets=targets, until=until, labels=labels, all_images=all_images,
+                     qcow2_paths=paths, in_use=running, on_line=on_line, job=job)
+    result["errors"] = errors + result["errors"]
+    return result
+
+
+# Telemetry
+
+def metrics():
+    """p50/p99 latency, error count and bytes per traced operation so far."""
+    return telemetry.snapshot()
+
+
+# Operation names accepted by the CLI's batch mode
+OPERATIONS = {
+    "create_image": create_image,
+    "clone_image": clone_image,
+    "commit_image": commit_image,
+    "boot": boot,
+    "list_vms": list_vms,
+    "stop_vm": stop_vm,
+    "pause_vm": pause_vm,
+    "resume_vm": resume_vm,
+    "list_snapshots": list_snapshots,
+    "snapshot_tree": snapshot_tree,
+    "create_snapshot": create_snapshot,
+    "restore_snapshot": restore_snapshot,
+    "delete_snapshot": delete_snapshot,
+    "reset_image": reset_image,
+    "reset_vm": reset_vm,
+    "build_docker_image": build_docker_image,
+    "build_docker_images": build_docker_images,
+    "lint_dockerfile": lint_dockerfile,
+    "pull_docker_image": pull_docker_image,
+    "bulk_pull_images": bulk_pull_images,
+    "list_docker_images": list_docker_images,
+    "search_local_images": search_local_images,
+    "search_dockerhub_images": search_dockerhub_images,
+    "search_dockerhub_page": search_dockerhub_page,
+    "list_containers": list_containers,
+    "list_running_containers": list_running_containers,
+    "search_docker_containers": search_docker_containers,
+    "start_container": start_container,
+    "stop_container": stop_container,
+    "batch_containers": batch_containers,
+    "container_logs": container_logs,
+    "export_container_logs": export_container_logs,
+    "list_templates": list_templates,
+    "launch_containers": launch_containers,
+    "list_artifacts": list_artifacts,
+    "artifact_counts": artifact_counts,
+    "cleanup_artifacts": cleanup_artifacts,
+    "disk_usage": disk_usage,
+    "reclaim_space": reclaim_space,
+    "metrics": metrics,
+}